@@ -0,0 +1,113 @@
+"""baseline schema
+
+The six tables of the first release, as Base.metadata.create_all created them before the
+schema was managed by migrations. Databases created that way are stamped at this revision by
+app.db.migrate instead of running it; the revisions after it add everything since.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 08:14:06.897332
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('parties',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('abbreviation', sa.String(), nullable=True),
+    sa.Column('ideology', sa.String(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_parties_abbreviation'), 'parties', ['abbreviation'], unique=True)
+    op.create_index(op.f('ix_parties_id'), 'parties', ['id'], unique=False)
+    op.create_index(op.f('ix_parties_ideology'), 'parties', ['ideology'], unique=False)
+    op.create_index(op.f('ix_parties_name'), 'parties', ['name'], unique=True)
+    op.create_table('members',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('party_id', sa.Integer(), nullable=True),
+    sa.Column('role', sa.String(), nullable=True),
+    sa.Column('economic_leaning', sa.Float(), nullable=True),
+    sa.Column('social_leaning', sa.Float(), nullable=True),
+    sa.Column('eu_stance', sa.Float(), nullable=True),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['party_id'], ['parties.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_members_id'), 'members', ['id'], unique=False)
+    op.create_index(op.f('ix_members_name'), 'members', ['name'], unique=False)
+    op.create_index(op.f('ix_members_role'), 'members', ['role'], unique=False)
+    op.create_table('proposals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('proposer_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.Enum('DRAFT', 'SUBMITTED', 'DEBATING', 'VOTING', 'PASSED', 'REJECTED', name='proposalstatus'), nullable=True),
+    sa.Column('submitted_date', sa.DateTime(), nullable=True),
+    sa.Column('vote_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['proposer_id'], ['members.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_proposals_id'), 'proposals', ['id'], unique=False)
+    op.create_index(op.f('ix_proposals_title'), 'proposals', ['title'], unique=False)
+    op.create_table('debates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proposal_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['proposal_id'], ['proposals.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_debates_id'), 'debates', ['id'], unique=False)
+    op.create_index(op.f('ix_debates_title'), 'debates', ['title'], unique=False)
+    op.create_table('votes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proposal_id', sa.Integer(), nullable=True),
+    sa.Column('member_id', sa.Integer(), nullable=True),
+    sa.Column('vote', sa.Enum('FOR', 'AGAINST', 'ABSTAIN', 'ABSENT', name='votetype'), nullable=True),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.ForeignKeyConstraint(['proposal_id'], ['proposals.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_votes_id'), 'votes', ['id'], unique=False)
+    op.create_table('debate_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('debate_id', sa.Integer(), nullable=True),
+    sa.Column('member_id', sa.Integer(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['debate_id'], ['debates.id'], ),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_debate_entries_id'), 'debate_entries', ['id'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_debate_entries_id'), table_name='debate_entries')
+    op.drop_table('debate_entries')
+    op.drop_index(op.f('ix_votes_id'), table_name='votes')
+    op.drop_table('votes')
+    op.drop_index(op.f('ix_debates_title'), table_name='debates')
+    op.drop_index(op.f('ix_debates_id'), table_name='debates')
+    op.drop_table('debates')
+    op.drop_index(op.f('ix_proposals_title'), table_name='proposals')
+    op.drop_index(op.f('ix_proposals_id'), table_name='proposals')
+    op.drop_table('proposals')
+    op.drop_index(op.f('ix_members_role'), table_name='members')
+    op.drop_index(op.f('ix_members_name'), table_name='members')
+    op.drop_index(op.f('ix_members_id'), table_name='members')
+    op.drop_table('members')
+    op.drop_index(op.f('ix_parties_name'), table_name='parties')
+    op.drop_index(op.f('ix_parties_ideology'), table_name='parties')
+    op.drop_index(op.f('ix_parties_id'), table_name='parties')
+    op.drop_index(op.f('ix_parties_abbreviation'), table_name='parties')
+    op.drop_table('parties')
+    for enum_name in ('votetype', 'proposalstatus'):
+        sa.Enum(name=enum_name).drop(op.get_bind())
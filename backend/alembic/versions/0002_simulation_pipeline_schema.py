@@ -0,0 +1,106 @@
+"""simulation pipeline schema
+
+Everything added to the first release's schema before it was managed by migrations:
+debates.summary, vote_tallies, simulation_batches, simulation_jobs, simulation_checkpoints
+and monte_carlo_runs. Databases that create_all built at some point in between already have
+part of it, so only what is missing is created.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 08:14:15.104318
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def _create_or_complete(name, columns, indexes=()):
+    """
+    Create a table, or add the columns and indexes an earlier version of it lacks
+    """
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(name):
+        op.create_table(name, *columns)
+    else:
+        existing = {column['name'] for column in inspector.get_columns(name)}
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(name, column)
+    existing_indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(name)}
+    for column in indexes:
+        index_name = f'ix_{name}_{column}'
+        if index_name not in existing_indexes:
+            op.create_index(index_name, name, [column], unique=False)
+
+def upgrade():
+    _create_or_complete('debates', [
+        sa.Column('summary', sa.Text(), nullable=True),
+    ])
+    _create_or_complete('vote_tallies', [
+        sa.Column('proposal_id', sa.Integer(), sa.ForeignKey('proposals.id'), primary_key=True),
+        sa.Column('for_votes', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('against_votes', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('abstain_votes', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('absent_votes', sa.Integer(), server_default='0', nullable=False),
+    ])
+    _create_or_complete('simulation_batches', [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('options', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    ], indexes=['id'])
+    _create_or_complete('simulation_jobs', [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('proposal_id', sa.Integer(), sa.ForeignKey('proposals.id'), nullable=True),
+        sa.Column('batch_id', sa.Integer(), sa.ForeignKey('simulation_batches.id'), nullable=True),
+        sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus'), nullable=True),
+        sa.Column('options', sa.JSON(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('max_attempts', sa.Integer(), nullable=True),
+        sa.Column('stage', sa.String(), nullable=True),
+        sa.Column('progress', sa.Float(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('llm_calls', sa.Integer(), nullable=True),
+        sa.Column('worker_id', sa.String(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('run_after', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    ], indexes=['batch_id', 'id', 'proposal_id', 'status'])
+    _create_or_complete('simulation_checkpoints', [
+        sa.Column('proposal_id', sa.Integer(), sa.ForeignKey('proposals.id'), primary_key=True),
+        sa.Column('stage', sa.Enum('DEBATE', 'SUMMARY', 'VOTING', 'COMPLETED', name='simulationstage'), nullable=True),
+        sa.Column('debate_id', sa.Integer(), sa.ForeignKey('debates.id'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ])
+    _create_or_complete('monte_carlo_runs', [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('proposal_id', sa.Integer(), sa.ForeignKey('proposals.id'), nullable=True),
+        sa.Column('debate_id', sa.Integer(), sa.ForeignKey('debates.id'), nullable=True),
+        sa.Column('method', sa.String(), nullable=True),
+        sa.Column('rounds', sa.Integer(), nullable=True),
+        sa.Column('pass_count', sa.Integer(), nullable=True),
+        sa.Column('pass_probability', sa.Float(), nullable=True),
+        sa.Column('ci_low', sa.Float(), nullable=True),
+        sa.Column('ci_high', sa.Float(), nullable=True),
+        sa.Column('mean_for', sa.Float(), nullable=True),
+        sa.Column('mean_against', sa.Float(), nullable=True),
+        sa.Column('mean_abstain', sa.Float(), nullable=True),
+        sa.Column('mean_absent', sa.Float(), nullable=True),
+        sa.Column('tallies', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    ], indexes=['id', 'proposal_id'])
+
+def downgrade():
+    op.drop_table('monte_carlo_runs')
+    op.drop_table('simulation_checkpoints')
+    op.drop_table('simulation_jobs')
+    op.drop_table('simulation_batches')
+    op.drop_table('vote_tallies')
+    op.drop_column('debates', 'summary')
+    for enum_name in ('simulationstage', 'jobstatus'):
+        sa.Enum(name=enum_name).drop(op.get_bind())
@@ -0,0 +1,36 @@
+"""vote and debate lookup indexes
+
+Votes are looked up by (proposal_id, member_id) and listed by proposal_id, both served by the
+unique index of uq_votes_proposal_member (proposal_id leads). Debate entries are read per debate
+in speaking order, and debates per proposal.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 08:14:23.883267
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Databases adopted from create_all may predate the unique vote constraint; keep each
+    # member's latest vote per proposal before adding it
+    constraints = sa.inspect(op.get_bind()).get_unique_constraints('votes')
+    if not any(constraint['name'] == 'uq_votes_proposal_member' for constraint in constraints):
+        op.execute(
+            "DELETE FROM votes older USING votes newer "
+            "WHERE older.proposal_id = newer.proposal_id AND older.member_id = newer.member_id "
+            "AND older.id < newer.id"
+        )
+        op.create_unique_constraint('uq_votes_proposal_member', 'votes', ['proposal_id', 'member_id'])
+
+    op.create_index('ix_debate_entries_debate_id_timestamp', 'debate_entries', ['debate_id', 'timestamp'], unique=False)
+    op.create_index(op.f('ix_debates_proposal_id'), 'debates', ['proposal_id'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_debates_proposal_id'), table_name='debates')
+    op.drop_index('ix_debate_entries_debate_id_timestamp', table_name='debate_entries')
@@ -0,0 +1,40 @@
+"""token usage
+
+LLM tokens spent per proposal, debate and simulation stage, one row per stage of a run.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 08:23:15.546399
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('token_usage',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proposal_id', sa.Integer(), nullable=True),
+    sa.Column('debate_id', sa.Integer(), nullable=True),
+    sa.Column('stage', sa.String(), nullable=True),
+    sa.Column('requests', sa.Integer(), nullable=True),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('completion_tokens', sa.Integer(), nullable=True),
+    sa.Column('cached_tokens', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['debate_id'], ['debates.id'], ),
+    sa.ForeignKeyConstraint(['proposal_id'], ['proposals.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_token_usage_debate_id'), 'token_usage', ['debate_id'], unique=False)
+    op.create_index(op.f('ix_token_usage_id'), 'token_usage', ['id'], unique=False)
+    op.create_index(op.f('ix_token_usage_proposal_id'), 'token_usage', ['proposal_id'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_token_usage_proposal_id'), table_name='token_usage')
+    op.drop_index(op.f('ix_token_usage_id'), table_name='token_usage')
+    op.drop_index(op.f('ix_token_usage_debate_id'), table_name='token_usage')
+    op.drop_table('token_usage')
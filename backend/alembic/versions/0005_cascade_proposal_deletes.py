@@ -0,0 +1,31 @@
+"""cascade proposal deletes
+
+Tallies, checkpoints, jobs, Monte Carlo runs and token usage belong to their proposal and
+are deleted with it, instead of making the delete fail on their foreign keys.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:02:41.318207
+"""
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+TABLES = ['vote_tallies', 'simulation_checkpoints', 'simulation_jobs', 'monte_carlo_runs', 'token_usage']
+
+def _replace_proposal_fk(table, ondelete):
+    # Postgres' default name, as neither create_all nor the earlier revisions named it
+    name = f'{table}_proposal_id_fkey'
+    op.drop_constraint(name, table, type_='foreignkey')
+    op.create_foreign_key(name, table, 'proposals', ['proposal_id'], ['id'], ondelete=ondelete)
+
+def upgrade():
+    for table in TABLES:
+        _replace_proposal_fk(table, 'CASCADE')
+
+def downgrade():
+    for table in TABLES:
+        _replace_proposal_fk(table, None)
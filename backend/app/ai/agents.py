@@ -1,27 +1,68 @@
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import json
 import random
+import re
 from app.models.vote import VoteType
-from app.ai.client import MistralClient
-from app.ai.prompts import get_debate_prompt, get_voting_prompt, get_debate_summary_prompt
+from app.ai.client import LLMClient, get_default_client
+from app.config import settings
+from app.ai.ideology import ProposalPosition, parse_proposal_position
+from app.ai.prompts import (
+    get_debate_prompt, get_voting_prompt, get_batch_voting_prompt, get_debate_summary_prompt,
+    get_proposal_classification_prompt, get_partial_summary_prompt, get_summary_merge_prompt
+)
+
+# Output tokens reserved per member in a batched voting response
+BATCH_VOTE_TOKENS_PER_MEMBER = 25
+
+def default_task_models() -> Dict[str, Optional[str]]:
+    """
+    Model configured per task; None leaves the choice to the client (LLM_MODEL)
+    """
+    return {
+        "debate": settings.LLM_DEBATE_MODEL or None,
+        "vote": settings.LLM_VOTE_MODEL or None,
+        "summary": settings.LLM_SUMMARY_MODEL or None,
+        "classify": settings.LLM_CLASSIFY_MODEL or None,
+    }
 
 class ParliamentaryAgent:
-    def __init__(self, client: MistralClient = None):
-        self.client = client or MistralClient()
+    def __init__(self, client: LLMClient = None, use_cache: bool = True,
+                 models: Dict[str, Optional[str]] = None):
+        self.client = client or get_default_client()
+        # Set to False to bypass the response cache and always sample fresh responses
+        self.use_cache = use_cache
+        # E.g. a small model for the many vote requests and a larger one for summaries
+        self.models = {**default_task_models(), **(models or {})}
 
-    async def generate_debate_entry(self, member_data: Dict[Any, Any], proposal_data: Dict[Any, Any]) -> str:
+    async def generate_debate_entry(self, member_data: Dict[Any, Any], proposal_data: Dict[Any, Any],
+                                    max_tokens: int = None) -> str:
         """
-        Generate a debate entry for a parliament member
+        Generate a debate entry for a parliament member, of at most `max_tokens` (DEBATE_MAX_TOKENS)
         """
         prompt = get_debate_prompt(member_data, proposal_data)
-        response = await self.client.generate_response(prompt, temperature=0.8)
+        response = await self.client.generate_response(prompt, temperature=0.8,
+                                                       max_tokens=max_tokens or settings.DEBATE_MAX_TOKENS,
+                                                       use_cache=self.use_cache, model=self.models["debate"])
         return response
 
+    async def stream_debate_entry(self, member_data: Dict[Any, Any], proposal_data: Dict[Any, Any],
+                                  max_tokens: int = None) -> AsyncIterator[str]:
+        """
+        Generate a debate entry for a parliament member, yielding the text as it is produced
+        """
+        prompt = get_debate_prompt(member_data, proposal_data)
+        async for text in self.client.stream_response(prompt, temperature=0.8,
+                                                      max_tokens=max_tokens or settings.DEBATE_MAX_TOKENS,
+                                                      use_cache=self.use_cache, model=self.models["debate"]):
+            yield text
+
     async def generate_vote(self, member_data: Dict[Any, Any], proposal_data: Dict[Any, Any], debate_summary: str) -> VoteType:
         """
         Generate a vote for a parliament member
         """
         prompt = get_voting_prompt(member_data, proposal_data, debate_summary)
-        response = await self.client.generate_response(prompt, temperature=0.5)
+        response = await self.client.generate_response(prompt, temperature=0.5, use_cache=self.use_cache,
+                                                       model=self.models["vote"])
 
         # Parse the response to get the vote
         response_clean = response.strip().upper()
@@ -36,10 +77,98 @@ class ParliamentaryAgent:
             # Default to a random vote if the response is unclear
             return random.choice([VoteType.FOR, VoteType.AGAINST, VoteType.ABSTAIN])
 
-    async def generate_debate_summary(self, debate_entries: List[Dict[Any, Any]]) -> str:
+    async def generate_votes_batch(self, members: List[Dict[Any, Any]], proposal_data: Dict[Any, Any],
+                                   debate_summary: str) -> Dict[int, VoteType]:
+        """
+        Generate the votes of several parliament members with a single request
+
+        Returns the votes that could be parsed, keyed by member id; members missing
+        from the result should be asked individually.
+        """
+        prompt = get_batch_voting_prompt(members, proposal_data, debate_summary)
+        response = await self.client.generate_response(
+            prompt,
+            temperature=0.5,
+            max_tokens=50 + BATCH_VOTE_TOKENS_PER_MEMBER * len(members),
+            use_cache=self.use_cache,
+            model=self.models["vote"]
+        )
+        return parse_batch_votes(response, {member["id"] for member in members})
+
+    async def classify_proposal(self, proposal_data: Dict[Any, Any]) -> Optional[ProposalPosition]:
+        """
+        Place a proposal on the members' ideology axes
+
+        The classification is sampled at temperature 0 and always goes through the
+        response cache, so each proposal is classified only once.
         """
-        Generate a summary of a debate
+        prompt = get_proposal_classification_prompt(proposal_data)
+        response = await self.client.generate_response(prompt, temperature=0.0, max_tokens=100,
+                                                       model=self.models["classify"])
+        return parse_proposal_position(response)
+
+    async def generate_debate_summary(self, debate_entries: List[Dict[Any, Any]], max_tokens: int = None) -> str:
+        """
+        Generate a summary of a debate, of at most `max_tokens` (SUMMARY_MAX_TOKENS)
         """
         prompt = get_debate_summary_prompt(debate_entries)
-        response = await self.client.generate_response(prompt, temperature=0.5, max_tokens=1000)
+        response = await self.client.generate_response(prompt, temperature=0.5,
+                                                       max_tokens=max_tokens or settings.SUMMARY_MAX_TOKENS,
+                                                       use_cache=self.use_cache, model=self.models["summary"])
         return response
+
+    async def summarize_debate_part(self, debate_entries: List[Dict[Any, Any]], label: str,
+                                    max_tokens: int = 300) -> str:
+        """
+        Summarize one part of a long debate (see app.ai.summarizer)
+        """
+        prompt = get_partial_summary_prompt(debate_entries, label)
+        return await self.client.generate_response(prompt, temperature=0.3, max_tokens=max_tokens,
+                                                   use_cache=self.use_cache, model=self.models["summary"])
+
+    async def merge_debate_summaries(self, partial_summaries: List[Tuple[str, str]], final: bool = True,
+                                     max_tokens: int = None) -> str:
+        """
+        Combine (label, summary) pairs of parts of a debate into one summary
+
+        The final summary gets at most `max_tokens` (SUMMARY_MAX_TOKENS), intermediate ones half that.
+        """
+        prompt = get_summary_merge_prompt(partial_summaries, final)
+        max_tokens = max_tokens or settings.SUMMARY_MAX_TOKENS
+        return await self.client.generate_response(prompt, temperature=0.3,
+                                                   max_tokens=max_tokens if final else max_tokens // 2,
+                                                   use_cache=self.use_cache, model=self.models["summary"])
+
+
+def parse_batch_votes(response: str, member_ids) -> Dict[int, VoteType]:
+    """
+    Parse a JSON list of {"member_id": ..., "vote": ...} objects, ignoring anything malformed
+
+    Members answered twice with different votes are left out, like members not answered at all,
+    so their vote is asked for again.
+    """
+    # Models sometimes wrap the list in prose or a code fence
+    match = re.search(r"\[.*\]", response, re.DOTALL)
+    if not match:
+        return {}
+    try:
+        items = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    
+    vote_types = {"FOR": VoteType.FOR, "AGAINST": VoteType.AGAINST, "ABSTAIN": VoteType.ABSTAIN}
+    votes = {}
+    conflicting = set()
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            member_id = int(item.get("member_id"))
+        except (TypeError, ValueError):
+            continue
+        vote = vote_types.get(str(item.get("vote", "")).strip().upper())
+        if member_id not in member_ids or vote is None:
+            continue
+        if votes.setdefault(member_id, vote) != vote:
+            conflicting.add(member_id)
+    return {member_id: vote for member_id, vote in votes.items() if member_id not in conflicting}
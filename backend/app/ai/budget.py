@@ -0,0 +1,75 @@
+from typing import Any, Dict, List
+
+from app.ai.agents import BATCH_VOTE_TOKENS_PER_MEMBER
+from app.ai.prompts import (
+    get_debate_prompt, get_voting_prompt, get_batch_voting_prompt, get_debate_summary_prompt,
+    get_proposal_classification_prompt
+)
+from app.ai.usage import TokenUsage, estimate_tokens
+
+# Completion tokens expected of a single member's vote ("FOR", "AGAINST" or "ABSTAIN")
+VOTE_COMPLETION_TOKENS = 10
+# Completion tokens of a proposal classification (its max_tokens)
+CLASSIFICATION_COMPLETION_TOKENS = 100
+
+class TokenBudget:
+    """
+    Tokens (prompt and completion) a simulation run may spend, checked against its TokenUsage
+
+    Requests reserve their estimated cost before they are sent, so requests running at the
+    same time cannot overrun the budget together. `spent` holds the tokens of earlier attempts
+    of a resumed run. A limit of 0 allows everything.
+    """
+    def __init__(self, limit: int, usage: TokenUsage, spent: int = 0):
+        self.limit = max(0, limit)
+        self.usage = usage
+        self.spent = spent
+        self.reserved = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    @property
+    def remaining(self) -> int:
+        """
+        Tokens not yet spent, nor reserved by requests in flight
+        """
+        return self.limit - self.spent - self.usage.total_tokens - self.reserved
+
+    def reserve(self, tokens: int, keep: int = 0) -> bool:
+        """
+        Reserve `tokens` for a request, if that still leaves `keep` tokens for later stages
+        """
+        if not self.enabled:
+            return True
+        if self.remaining - tokens < keep:
+            return False
+        self.reserved += tokens
+        return True
+
+    def release(self, tokens: int):
+        """
+        Give back a reservation once its request is done (and counted in the usage) or skipped
+        """
+        if self.enabled:
+            self.reserved -= tokens
+
+def debate_entry_cost(member: Dict[Any, Any], proposal: Dict[Any, Any], speech_tokens: int) -> int:
+    return estimate_tokens(get_debate_prompt(member, proposal)) + speech_tokens
+
+def summary_cost(speakers: int, speech_tokens: int, summary_tokens: int) -> int:
+    """
+    A debate summary of `speakers` speeches, read in full whether summarized in one request or in parts
+    """
+    return estimate_tokens(get_debate_summary_prompt([])) + speakers * speech_tokens + summary_tokens
+
+def vote_cost(member: Dict[Any, Any], proposal: Dict[Any, Any], debate_summary: str) -> int:
+    return estimate_tokens(get_voting_prompt(member, proposal, debate_summary)) + VOTE_COMPLETION_TOKENS
+
+def batch_vote_cost(batch: List[Dict[Any, Any]], proposal: Dict[Any, Any], debate_summary: str) -> int:
+    return (estimate_tokens(get_batch_voting_prompt(batch, proposal, debate_summary))
+            + 50 + BATCH_VOTE_TOKENS_PER_MEMBER * len(batch))
+
+def classification_cost(proposal: Dict[Any, Any]) -> int:
+    return estimate_tokens(get_proposal_classification_prompt(proposal)) + CLASSIFICATION_COMPLETION_TOKENS
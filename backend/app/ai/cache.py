@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+def make_cache_key(model: str, prompt: str, temperature: float, max_tokens: int) -> str:
+    """
+    Build a content-addressed cache key for a completion request
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{model}:{prompt_hash}:{temperature}:{max_tokens}"
+
+class ResponseCache(ABC):
+    """
+    Base class for LLM response caches; subclasses implement `_get`, `_set` and `_clear`
+    """
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        await self._set(key, value)
+
+    async def clear(self):
+        await self._clear()
+        self.hits = 0
+        self.misses = 0
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[str]:
+        """
+        The cached value of `key`, or None if it is missing or expired
+        """
+
+    @abstractmethod
+    async def _set(self, key: str, value: str):
+        pass
+
+    @abstractmethod
+    async def _clear(self):
+        pass
+
+class MemoryCache(ResponseCache):
+    """
+    In-process LRU cache with TTL, bounded by entry count and total response size
+    """
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 10000, max_bytes: int = 50_000_000):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._size = 0
+
+    async def _get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, created_at = entry
+        if self._is_expired(created_at):
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def _set(self, key: str, value: str):
+        if key in self._entries:
+            self._remove(key)
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, time.time())
+        self._size += size
+        # Evict least recently used entries until both limits hold again
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    async def _clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._size -= len(value.encode("utf-8"))
+
+    def stats(self) -> Dict[str, float]:
+        stats = super().stats()
+        stats.update(entries=len(self._entries), bytes=self._size)
+        return stats
+
+class SQLiteCache(ResponseCache):
+    """
+    On-disk cache backed by a SQLite table, shared by every process using the same file
+    """
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: int = 100000):
+        super().__init__(ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_responses_created_at ON llm_responses (created_at)"
+            )
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._is_expired(row[1]):
+                with self._conn:
+                    self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                return None
+            return row[0]
+
+    def _set_sync(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+            # Drop the oldest entries beyond the size limit
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN ("
+                "SELECT key FROM llm_responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def _clear_sync(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_responses")
+
+    async def _get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def _set(self, key: str, value: str):
+        await asyncio.to_thread(self._set_sync, key, value)
+
+    async def _clear(self):
+        await asyncio.to_thread(self._clear_sync)
+
+    async def close(self):
+        self._conn.close()
+
+    def stats(self) -> Dict[str, float]:
+        stats = super().stats()
+        with self._lock:
+            stats["entries"] = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        return stats
+
+def create_cache(backend: str = None) -> Optional[ResponseCache]:
+    """
+    Create the response cache configured by LLM_CACHE_BACKEND ("memory", "sqlite" or "none")
+    """
+    backend = (backend or settings.LLM_CACHE_BACKEND).lower()
+    ttl = settings.LLM_CACHE_TTL or None
+    if backend == "memory":
+        return MemoryCache(ttl=ttl, max_entries=settings.LLM_CACHE_MAX_ENTRIES, max_bytes=settings.LLM_CACHE_MAX_BYTES)
+    if backend == "sqlite":
+        return SQLiteCache(settings.LLM_CACHE_PATH, ttl=ttl, max_entries=settings.LLM_CACHE_MAX_ENTRIES)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown LLM cache backend: {backend}")
@@ -1,40 +1,331 @@
+import asyncio
 import httpx
-import os
-from typing import Dict, List, Any, Optional
+import json
+import random
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
 from app.config import settings
+from app.ai.cache import ResponseCache, create_cache, make_cache_key
+from app.ai.rate_limit import AdaptiveConcurrencyLimiter, current_scheduler, rate_limit_delay
+from app.ai.usage import TokenUsage, record_usage
 
-class MistralClient:
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or settings.MISTRAL_API_KEY
-        self.api_url = settings.MISTRAL_API_URL
-        self.model = "mistral-small-latest"  # Default model
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class LLMError(Exception):
+    """
+    A request to the LLM API that did not produce a response
+    """
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class LLMRequestError(LLMError):
+    """
+    The API rejected the request itself (4xx); sending it again will not help
+    """
+
+class LLMUnavailableError(LLMError):
+    """
+    The API could not serve the request right now (5xx, timeout, dropped connection)
+
+    Raised once retries are exhausted. Callers should fail the run rather than
+    record a made-up answer, so it can be resumed later.
+    """
+
+class LLMRateLimitError(LLMUnavailableError):
+    """
+    The API throttled the request (429)
+    """
+
+# Statuses worth retrying besides 429 and 5xx
+RETRYABLE_STATUS_CODES = {408, 409}
+
+# Providers that `create_client` can build
+LLM_PROVIDERS = ("mistral", "openai", "fake")
+
+class LLMClient:
+    """
+    Client for an OpenAI-compatible chat completions API
+
+    Mistral, OpenAI and self-hosted servers (vLLM, llama.cpp, Ollama) all speak this format;
+    providers differ only in URL, key and model names. `transport` replaces the network, e.g.
+    with a FakeLLMTransport for offline runs.
+    """
+    def __init__(self, api_url: str, api_key: str = "", model: str = None,
+                 cache: Optional[ResponseCache] = None, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 limiter: Optional[AdaptiveConcurrencyLimiter] = None, max_retries: int = None,
+                 retry_base_delay: float = None, retry_max_delay: float = None):
+        self.api_url = api_url
+        self.api_key = api_key
+        # Model used by requests that do not name one
+        self.model = model or settings.LLM_MODEL
+        self.cache = cache
+        self.transport = transport
+        self.limiter = limiter or AdaptiveConcurrencyLimiter(
+            max_limit=settings.LLM_MAX_IN_FLIGHT,
+            min_limit=settings.LLM_ADAPTIVE_MIN_CONCURRENCY
+        )
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_delay = settings.LLM_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+        self.retry_max_delay = settings.LLM_RETRY_MAX_DELAY if retry_max_delay is None else retry_max_delay
+        self.retries = 0
+        self.failures = 0
+        # Tokens of every request this client completed
+        self.usage = TokenUsage()
+        self._http: Optional[httpx.AsyncClient] = None
     
-    async def generate_response(self, prompt: str, temperature: float = 0.7, max_tokens: int = 500) -> str:
+    def _create_http_client(self) -> httpx.AsyncClient:
         """
-        Generate a response from the Mistral AI API
+        Create the long-lived HTTP client that pools connections to the API
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": self.model,
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            # Local OpenAI-compatible servers usually run without a key
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return httpx.AsyncClient(
+            base_url=self.api_url,
+            headers=headers,
+            http2=settings.LLM_HTTP2 and HTTP2_AVAILABLE,
+            transport=self.transport,
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(settings.LLM_READ_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT)
+        )
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # Created on first use for clients that are not started explicitly
+        if self._http is None or self._http.is_closed:
+            self._http = self._create_http_client()
+        return self._http
+    
+    async def startup(self):
+        """
+        Open the connection pool
+        """
+        self.http
+    
+    async def aclose(self):
+        """
+        Close the connection pool and any idle connections
+        """
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self.cache is not None:
+            await self.cache.close()
+    
+    def _payload(self, model: str, prompt: str, temperature: float, max_tokens: int) -> dict:
+        return {
+            "model": model,
             "messages": [{"role": "user", "content": prompt}],
             "temperature": temperature,
             "max_tokens": max_tokens
         }
+    
+    def _check_response(self, response: httpx.Response, started_at: float) -> Optional[LLMError]:
+        """
+        Feed a response's status and rate-limit headers to the limiter; the error to raise, if any
+        """
+        delay = rate_limit_delay(response.headers)
+        if response.status_code == 200:
+            self.limiter.record_success()
+            if delay:
+                # The window is used up; hold back further requests until it resets
+                self.limiter.pause(delay)
+            return None
+        
+        message = f"API request failed with status code {response.status_code}: {response.text}"
+        if response.status_code == 429:
+            self.limiter.record_throttle(delay, started_at)
+            return LLMRateLimitError(message, response.status_code, delay)
+        if response.status_code >= 500 or response.status_code in RETRYABLE_STATUS_CODES:
+            return LLMUnavailableError(message, response.status_code, delay)
+        return LLMRequestError(message, response.status_code)
+    
+    def _backoff(self, attempt: int, error: LLMError) -> float:
+        """
+        Seconds to wait before retry number `attempt` (0-based)
+
+        Honours Retry-After when given, otherwise exponential backoff with "equal jitter"
+        so clients throttled at the same moment do not retry in lockstep.
+        """
+        if error.retry_after is not None:
+            return error.retry_after + random.uniform(0, self.retry_base_delay)
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    async def _retry_or_raise(self, attempt: int, error: LLMError):
+        if not isinstance(error, LLMUnavailableError) or attempt >= self.max_retries:
+            self.failures += 1
+            raise error
+        self.retries += 1
+        await asyncio.sleep(self._backoff(attempt, error))
+    
+    @asynccontextmanager
+    async def _attempt(self):
+        """
+        Hold the slots of a single attempt: the caller's scheduler (a slot and a rate-limit
+        token), if any, then the adaptive limiter; yields the time the attempt started
+        """
+        scheduler = current_scheduler()
+        if scheduler is None:
+            async with self.limiter.slot() as started_at:
+                yield started_at
+            return
+        async with scheduler.attempt(), self.limiter.slot() as started_at:
+            yield started_at
+    
+    async def _post(self, payload: dict) -> httpx.Response:
+        """
+        POST a completion request, retrying throttled and failed attempts
+        """
+        attempt = 0
+        while True:
+            async with self._attempt() as started_at:
+                try:
+                    response = await self.http.post("/chat/completions", json=payload)
+                except httpx.TransportError as e:
+                    error = LLMUnavailableError(f"API request failed: {type(e).__name__}: {str(e)}")
+                else:
+                    error = self._check_response(response, started_at)
+                    if error is None:
+                        return response
+            # Backoff happens outside the slots so it does not hold back other requests
+            await self._retry_or_raise(attempt, error)
+            attempt += 1
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Current adaptive concurrency and throttling figures
+        """
+        return {**self.limiter.stats(), "retries": self.retries, "failures": self.failures,
+                "usage": self.usage.as_dict()}
+    
+    async def generate_response(self, prompt: str, temperature: float = 0.7, max_tokens: int = 500,
+                                use_cache: bool = True, model: Optional[str] = None) -> str:
+        """
+        Generate a response from the LLM API, with `model` or else the client's model
+
+        Identical requests are answered from the response cache, if one is configured,
+        unless `use_cache` is False (e.g. when a run needs fresh sampling).
+        """
+        model = model or self.model
+        cache_key = None
+        if use_cache and self.cache is not None:
+            cache_key = make_cache_key(model, prompt, temperature, max_tokens)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30.0
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"API request failed with status code {response.status_code}: {response.text}")
-            
-            response_data = response.json()
-            return response_data["choices"][0]["message"]["content"]
+        payload = self._payload(model, prompt, temperature, max_tokens)
+        response = await self._post(payload)
+        
+        response_data = response.json()
+        content = response_data["choices"][0]["message"]["content"]
+        record_usage(prompt, content, response_data.get("usage"), self.usage)
+        if cache_key is not None:
+            await self.cache.set(cache_key, content)
+        return content
+
+    async def stream_response(self, prompt: str, temperature: float = 0.7, max_tokens: int = 500,
+                              use_cache: bool = True, model: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Generate a response from the LLM API, yielding the text as it is produced
+
+        Shares the response cache with `generate_response`; a cached response is yielded in one piece.
+        Failed requests are retried like in `generate_response`, but only until the first text arrives.
+        """
+        model = model or self.model
+        cache_key = None
+        if use_cache and self.cache is not None:
+            cache_key = make_cache_key(model, prompt, temperature, max_tokens)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        payload = self._payload(model, prompt, temperature, max_tokens)
+        payload["stream"] = True
+        
+        parts = []
+        usage = {}
+        attempt = 0
+        while True:
+            async with self._attempt() as started_at:
+                try:
+                    async with self.http.stream("POST", "/chat/completions", json=payload) as response:
+                        if response.status_code != 200:
+                            await response.aread()
+                        error = self._check_response(response, started_at)
+                        if error is None:
+                            async for text in self._iter_stream(response, usage):
+                                parts.append(text)
+                                yield text
+                            break
+                except httpx.TransportError as e:
+                    # Text already handed out cannot be taken back, so only retry before the first chunk
+                    error = LLMUnavailableError(f"API request failed: {type(e).__name__}: {str(e)}")
+                    if parts:
+                        self.failures += 1
+                        raise error
+            await self._retry_or_raise(attempt, error)
+            attempt += 1
+        
+        record_usage(prompt, "".join(parts), usage, self.usage)
+        if cache_key is not None:
+            await self.cache.set(cache_key, "".join(parts))
+
+    @staticmethod
+    async def _iter_stream(response: httpx.Response, usage: Dict[str, Any]) -> AsyncIterator[str]:
+        # Server-sent events: one "data: {json}" line per chunk, ending with "data: [DONE]";
+        # the last chunk may carry the request's token usage, which is copied into `usage`
+        async for line in response.aiter_lines():
+            line = line.strip()
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            usage.update(chunk.get("usage") or {})
+            choices = chunk.get("choices") or [{}]
+            text = (choices[0].get("delta") or {}).get("content")
+            if text:
+                yield text
+
+class MistralClient(LLMClient):
+    def __init__(self, api_key: Optional[str] = None, **kwargs):
+        super().__init__(settings.MISTRAL_API_URL, api_key or settings.MISTRAL_API_KEY, **kwargs)
+
+def create_client(provider: str = None, **kwargs) -> LLMClient:
+    """
+    Build the client for an LLM provider ("mistral", "openai" or "fake"), by default LLM_PROVIDER
+    """
+    provider = (provider or settings.LLM_PROVIDER).lower()
+    if provider == "mistral":
+        return MistralClient(**kwargs)
+    if provider == "openai":
+        return LLMClient(settings.OPENAI_API_URL, settings.OPENAI_API_KEY, **kwargs)
+    if provider == "fake":
+        from app.ai.fake_llm import FakeLLMTransport
+        kwargs.setdefault("transport", FakeLLMTransport())
+        return LLMClient("http://fake-llm/v1", **kwargs)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+# Shared client used by the application so all simulations reuse one connection pool
+_default_client: Optional[LLMClient] = None
+
+def get_default_client() -> LLMClient:
+    global _default_client
+    if _default_client is None:
+        _default_client = create_client(cache=create_cache())
+    return _default_client
@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from app.ai.usage import estimate_tokens as count_tokens
+from app.config import settings
+
+VOTE_OPTIONS = ("FOR", "AGAINST", "ABSTAIN")
+
+WORDS = (
+    "the proposal government chamber members budget citizens policy reform law support "
+    "oppose amendment committee minister coalition opposition costs benefits europe climate "
+    "housing healthcare education security economy future responsibility majority vote"
+).split()
+
+def _prompt_seed(prompt: str) -> int:
+    return int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "little")
+
+class FakeLLM:
+    """
+    Deterministic in-process stand-in for an OpenAI-compatible chat completions API
+
+    Answers are derived from a hash of the prompt, so the same prompt always gets the same
+    answer: votes for voting prompts, JSON for batched votes and classifications, and filler
+    text of about `max_tokens` for speeches and summaries. Latency follows a log-normal
+    distribution around `latency` seconds, and a share of requests fails with 503 or 429, drawn
+    from a random generator seeded with `seed`.
+
+    Like providers with prompt caching, it reports the leading blocks of `PREFIX_BLOCK_TOKENS`
+    tokens it has seen in an earlier prompt as cached tokens.
+    """
+    PREFIX_BLOCK_TOKENS = 128
+    # Cached prefix blocks kept before the cache starts over
+    PREFIX_CACHE_SIZE = 100_000
+
+    def __init__(self, latency: float = None, latency_sigma: float = None, tokens_per_second: float = None,
+                 error_rate: float = None, rate_limit_rate: float = None, seed: int = None):
+        self.latency = settings.FAKE_LLM_LATENCY if latency is None else latency
+        self.latency_sigma = settings.FAKE_LLM_LATENCY_SIGMA if latency_sigma is None else latency_sigma
+        self.tokens_per_second = settings.FAKE_LLM_TOKENS_PER_SECOND if tokens_per_second is None else tokens_per_second
+        self.error_rate = settings.FAKE_LLM_ERROR_RATE if error_rate is None else error_rate
+        self.rate_limit_rate = settings.FAKE_LLM_RATE_LIMIT_RATE if rate_limit_rate is None else rate_limit_rate
+        self.rng = random.Random(settings.FAKE_LLM_SEED if seed is None else seed)
+        self.requests = 0
+        self._prefix_blocks = set()
+
+    def _sample_latency(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        # Log-normal with mean `latency`: mostly fast responses with a long tail
+        mu = math.log(self.latency) - self.latency_sigma ** 2 / 2
+        return self.rng.lognormvariate(mu, self.latency_sigma)
+
+    def complete(self, prompt: str, max_tokens: int = 500) -> str:
+        """
+        The answer to a prompt, recognised by the instructions of the prompts in app.ai.prompts
+        """
+        rng = random.Random(_prompt_seed(prompt))
+        if "JSON list" in prompt:
+            member_ids = [int(member_id) for member_id in re.findall(r"Member ID (\d+)", prompt)]
+            return json.dumps([
+                {"member_id": member_id, "vote": rng.choice(VOTE_OPTIONS)} for member_id in member_ids
+            ])
+        if "JSON object" in prompt:
+            return json.dumps({
+                "economic": rng.randint(0, 100), "social": rng.randint(0, 100), "eu": rng.randint(0, 100),
+                "economic_weight": round(rng.random(), 2), "social_weight": round(rng.random(), 2),
+                "eu_weight": round(rng.random(), 2)
+            })
+        if "Reply with ONLY ONE" in prompt:
+            return rng.choice(VOTE_OPTIONS)
+
+        words = min(max_tokens, 200) * 3 // 4
+        text = " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+        # Like a real API, never answer with more than `max_tokens` tokens
+        if count_tokens(text) >= max_tokens:
+            text = text[:max_tokens * 4 - 4].rsplit(" ", 1)[0]
+        return text + "."
+
+    def _cached_tokens(self, prompt: str) -> int:
+        """
+        Tokens in the leading blocks of `prompt` seen before; remembers the prompt's blocks
+        """
+        if len(self._prefix_blocks) > self.PREFIX_CACHE_SIZE:
+            self._prefix_blocks.clear()
+        block_chars = self.PREFIX_BLOCK_TOKENS * 4
+        digest = hashlib.sha256()
+        cached, hit = 0, True
+        for start in range(0, len(prompt) - block_chars + 1, block_chars):
+            # A block is identified by everything before it too, as with real prefix caches
+            digest.update(prompt[start:start + block_chars].encode("utf-8"))
+            block = digest.digest()
+            hit = hit and block in self._prefix_blocks
+            if hit:
+                cached += self.PREFIX_BLOCK_TOKENS
+            self._prefix_blocks.add(block)
+        return cached
+
+    def _usage(self, prompt: str, content: str) -> Dict[str, Any]:
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": min(prompt_tokens, self._cached_tokens(prompt))}
+        }
+
+    async def _stream(self, model: str, chunks: List[str], usage: Dict[str, int]) -> AsyncIterator[bytes]:
+        for chunk in chunks:
+            if self.tokens_per_second > 0:
+                await asyncio.sleep(count_tokens(chunk) / self.tokens_per_second)
+            data = {"model": model, "choices": [{"index": 0, "delta": {"content": chunk}}]}
+            yield f"data: {json.dumps(data)}\n\n".encode()
+        data = {"model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage}
+        yield f"data: {json.dumps(data)}\n\ndata: [DONE]\n\n".encode()
+
+    async def respond(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, str], Union[bytes, AsyncIterator[bytes]]]:
+        """
+        Status, headers and body (bytes, or an async iterator of bytes when streaming) for a request
+        """
+        self.requests += 1
+        await asyncio.sleep(self._sample_latency())
+
+        draw = self.rng.random()
+        if draw < self.rate_limit_rate:
+            return 429, {"content-type": "application/json"}, b'{"message": "Requests rate limit exceeded"}'
+        if draw < self.rate_limit_rate + self.error_rate:
+            return 503, {"content-type": "application/json"}, b'{"message": "Service unavailable"}'
+
+        model = payload.get("model", "fake")
+        prompt = "\n".join(message.get("content", "") for message in payload.get("messages", []))
+        content = self.complete(prompt, payload.get("max_tokens", 500))
+        usage = self._usage(prompt, content)
+
+        if payload.get("stream"):
+            chunks = re.findall(r"\S+\s*", content) or [content]
+            return 200, {"content-type": "text/event-stream"}, self._stream(model, chunks, usage)
+
+        if self.tokens_per_second > 0:
+            await asyncio.sleep(usage["completion_tokens"] / self.tokens_per_second)
+        body = {
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage
+        }
+        return 200, {"content-type": "application/json"}, json.dumps(body).encode()
+
+class FakeLLMTransport(httpx.MockTransport):
+    """
+    httpx transport answering chat completion requests from a FakeLLM, without any network
+    """
+    def __init__(self, fake: Optional[FakeLLM] = None):
+        super().__init__(self._handle)
+        self.fake = fake or FakeLLM()
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        if not request.url.path.endswith("/chat/completions"):
+            return httpx.Response(404, json={"message": "Not found"})
+        status_code, headers, body = await self.fake.respond(json.loads(request.content))
+        return httpx.Response(status_code, headers=headers, content=body)
+
+def create_app(fake: Optional[FakeLLM] = None):
+    """
+    FastAPI app serving a FakeLLM, to load test over real connections
+
+    Point the simulation at it with LLM_PROVIDER=openai and OPENAI_API_URL=http://host:port/v1.
+    """
+    from fastapi import FastAPI, Request
+    from fastapi.responses import Response, StreamingResponse
+
+    fake = fake or FakeLLM()
+    app = FastAPI(title="Fake LLM")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        status_code, headers, body = await fake.respond(await request.json())
+        if isinstance(body, bytes):
+            return Response(body, status_code=status_code, headers=headers)
+        return StreamingResponse(body, status_code=status_code, headers=headers)
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI-compatible LLM API for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    uvicorn.run(create_app(), host=args.host, port=args.port)
@@ -0,0 +1,126 @@
+import json
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.models.vote import VoteType
+
+# Order of the ideology axes in member and proposal vectors
+AXES = ("economic", "social", "eu")
+MEMBER_AXIS_FIELDS = ("economic_leaning", "social_leaning", "eu_stance")
+
+# Vote codes used in the vote matrices, indexing into VOTE_TYPES
+FOR, AGAINST, ABSTAIN = 0, 1, 2
+VOTE_TYPES = (VoteType.FOR, VoteType.AGAINST, VoteType.ABSTAIN)
+
+class ProposalPosition(NamedTuple):
+    """
+    A proposal's ideal point on the ideology axes and how much each axis matters
+    """
+    position: np.ndarray  # shape (3,), 0-100 per axis
+    weights: np.ndarray   # shape (3,), 0-1 per axis
+
+def parse_proposal_position(response: str) -> Optional[ProposalPosition]:
+    """
+    Parse the JSON classification returned for `get_proposal_classification_prompt`
+    """
+    match = re.search(r"\{.*\}", response, re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+        position = np.array([float(data[axis]) for axis in AXES])
+        weights = np.array([float(data.get(f"{axis}_weight", 1.0)) for axis in AXES])
+    except (ValueError, KeyError, TypeError):
+        return None
+    
+    position = np.clip(position, 0, 100)
+    weights = np.clip(weights, 0, 1)
+    if not weights.any():
+        weights = np.ones(len(AXES))
+    return ProposalPosition(position=position, weights=weights)
+
+def member_matrix(members: List[Dict[Any, Any]]) -> np.ndarray:
+    """
+    Stack the members' ideology scores into an (n_members, 3) array
+    """
+    return np.array([[member[field] for field in MEMBER_AXIS_FIELDS] for member in members], dtype=float)
+
+class IdeologyVoteModel:
+    """
+    Deterministic vote model based on the weighted distance between member and proposal
+
+    Members within `for_threshold` of the proposal's ideal point vote FOR, members further
+    away than `against_threshold` vote AGAINST and everyone in between abstains.
+
+    For sampling, the thresholds are softened into logistic curves of width `noise`, so
+    members near a threshold vote either way with some probability.
+    """
+    def __init__(self, for_threshold: float = 20.0, against_threshold: float = 30.0, noise: float = 5.0):
+        if for_threshold > against_threshold:
+            raise ValueError("for_threshold must not exceed against_threshold")
+        if noise <= 0:
+            raise ValueError("noise must be positive")
+        self.for_threshold = for_threshold
+        self.against_threshold = against_threshold
+        self.noise = noise
+
+    def distances(self, members: np.ndarray, positions: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        Weighted distance of every member to every proposal
+
+        `members` is (n_members, 3); `positions` and `weights` are (n_proposals, 3).
+        Returns an (n_proposals, n_members) array.
+        """
+        diff = members[np.newaxis, :, :] - positions[:, np.newaxis, :]
+        weighted = (diff ** 2 * weights[:, np.newaxis, :]).sum(axis=2) / weights.sum(axis=1)[:, np.newaxis]
+        return np.sqrt(weighted)
+
+    def vote_codes(self, distances: np.ndarray) -> np.ndarray:
+        """
+        Map distances to vote codes (FOR, AGAINST, ABSTAIN)
+        """
+        codes = np.full(distances.shape, ABSTAIN, dtype=np.int8)
+        codes[distances <= self.for_threshold] = FOR
+        codes[distances > self.against_threshold] = AGAINST
+        return codes
+
+    def compute_votes(self, members: List[Dict[Any, Any]], proposal: ProposalPosition) -> List[VoteType]:
+        """
+        Compute every member's vote on a single proposal, in member order
+        """
+        distances = self.distances(
+            member_matrix(members), proposal.position[np.newaxis, :], proposal.weights[np.newaxis, :]
+        )
+        return [VOTE_TYPES[code] for code in self.vote_codes(distances[0])]
+
+    def vote_probabilities(self, distances: np.ndarray) -> np.ndarray:
+        """
+        Probability of each vote code for every distance, as an array of shape distances.shape + (3,)
+        """
+        p_for = 1.0 / (1.0 + np.exp((distances - self.for_threshold) / self.noise))
+        p_against = 1.0 / (1.0 + np.exp((self.against_threshold - distances) / self.noise))
+        # Where the curves overlap (thresholds closer than the noise) scale them down to sum to 1
+        total = np.maximum(p_for + p_against, 1.0)
+        p_for, p_against = p_for / total, p_against / total
+        return np.stack([p_for, p_against, 1.0 - p_for - p_against], axis=-1)
+
+    def sample_vote_codes(self, distances: np.ndarray, rounds: int,
+                          rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Draw `rounds` independent votes for each member of one proposal
+
+        `distances` is (n_members,); returns a (rounds, n_members) array of vote codes.
+        """
+        rng = rng or np.random.default_rng()
+        cumulative = np.cumsum(self.vote_probabilities(distances), axis=-1)
+        draws = rng.random((rounds, distances.shape[0]))
+        # Index of the first cumulative probability above the draw
+        return (draws[:, :, np.newaxis] >= cumulative[np.newaxis, :, :2]).sum(axis=2).astype(np.int8)
+
+def tally_vote_codes(codes: np.ndarray) -> np.ndarray:
+    """
+    Count FOR, AGAINST and ABSTAIN per row of a (rounds, n_members) vote code array
+    """
+    return np.stack([(codes == code).sum(axis=1) for code in (FOR, AGAINST, ABSTAIN)], axis=1)
@@ -0,0 +1,210 @@
+import asyncio
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app.ai.agents import ParliamentaryAgent
+from app.ai.client import LLMUnavailableError
+from app.ai.ideology import IdeologyVoteModel, member_matrix, tally_vote_codes
+from app.ai.rate_limit import LLMScheduler
+from app.ai.simulation import split_vote_batches
+from app.ai.usage import track_usage, usage_stage
+from app.config import settings
+from app.models.vote import VoteType
+
+# "local" samples the ideology model; "batch" asks the LLM for every round in batched requests
+MONTE_CARLO_METHODS = ("local", "batch")
+
+# Columns of a (rounds, 4) tally array
+TALLY_COLUMNS = {VoteType.FOR: 0, VoteType.AGAINST: 1, VoteType.ABSTAIN: 2, VoteType.ABSENT: 3}
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion (95% for the default z)
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def encode_tallies(tallies: np.ndarray) -> bytes:
+    """
+    Pack per-round tallies as little-endian uint16, 8 bytes per round
+    """
+    return tallies.astype("<u2").tobytes()
+
+def decode_tallies(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u2").reshape(-1, len(TALLY_COLUMNS)).astype(np.int64)
+
+def summarize_tallies(tallies: np.ndarray) -> Dict[str, Any]:
+    """
+    Pass probability (simple majority of FOR over AGAINST) with its interval, and mean tallies
+    """
+    rounds = tallies.shape[0]
+    pass_count = int((tallies[:, 0] > tallies[:, 1]).sum())
+    ci_low, ci_high = wilson_interval(pass_count, rounds)
+    means = tallies.mean(axis=0) if rounds else np.zeros(len(TALLY_COLUMNS))
+    return {
+        "rounds": rounds,
+        "pass_count": pass_count,
+        "pass_probability": pass_count / rounds if rounds else 0.0,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "mean_for": float(means[0]),
+        "mean_against": float(means[1]),
+        "mean_abstain": float(means[2]),
+        "mean_absent": float(means[3]),
+    }
+
+class MonteCarloEstimator:
+    """
+    Estimates a proposal's chance of passing from many sampled vote rounds
+    """
+    def __init__(self, agent: ParliamentaryAgent = None, scheduler: LLMScheduler = None,
+                 vote_model: IdeologyVoteModel = None, concurrency: int = None,
+                 vote_batch_size: int = None, rng: np.random.Generator = None,
+                 on_progress: Callable[[str, float], Awaitable[None]] = None):
+        # Every round must be a fresh sample, so responses are never served from the cache
+        self.agent = agent or ParliamentaryAgent(use_cache=False)
+        self.scheduler = scheduler or LLMScheduler()
+        self.vote_model = vote_model or IdeologyVoteModel(
+            for_threshold=settings.LOCAL_VOTE_FOR_THRESHOLD,
+            against_threshold=settings.LOCAL_VOTE_AGAINST_THRESHOLD,
+            noise=settings.LOCAL_VOTE_NOISE
+        )
+        self.concurrency = max(1, concurrency or settings.SIMULATION_CONCURRENCY)
+        self.vote_batch_size = settings.VOTING_BATCH_SIZE if vote_batch_size is None else vote_batch_size
+        self.rng = rng or np.random.default_rng()
+        self.on_progress = on_progress
+        # LLM requests made by this estimator
+        self.llm_calls = 0
+        # Batch requests that failed, and members whose vote was then asked for individually
+        self.failed_batches = 0
+        self.member_fallbacks = 0
+
+    async def _report_progress(self, fraction: float):
+        if self.on_progress is None:
+            return
+        try:
+            await self.on_progress("monte_carlo", fraction)
+        except Exception as e:
+            print(f"Error reporting Monte Carlo progress: {str(e)}")
+
+    async def sample_local(self, members: List[Dict[Any, Any]], proposal_data: Dict[Any, Any],
+                           rounds: int) -> np.ndarray:
+        """
+        Sample `rounds` votes from the ideology model after one (cached) classification request
+        """
+        async with self.scheduler.slot():
+            self.llm_calls += 1
+            position = await self.agent.classify_proposal(proposal_data)
+        if position is None:
+            raise ValueError(f"Could not classify proposal {proposal_data['title']}")
+
+        distances = self.vote_model.distances(
+            member_matrix(members), position.position[np.newaxis, :], position.weights[np.newaxis, :]
+        )[0]
+        codes = self.vote_model.sample_vote_codes(distances, rounds, self.rng)
+        tallies = np.zeros((rounds, len(TALLY_COLUMNS)), dtype=np.int64)
+        tallies[:, :3] = tally_vote_codes(codes)
+        await self._report_progress(1.0)
+        return tallies
+
+    async def sample_batch(self, members: List[Dict[Any, Any]], proposal_data: Dict[Any, Any],
+                           debate_summary: str, rounds: int) -> np.ndarray:
+        """
+        Sample `rounds` votes from the LLM, one batched request per batch of members per round
+
+        Every request of a batch repeats the same prompt, so providers that cache prompt
+        prefixes can reuse it across rounds. Members a response leaves out (or all members of
+        a failed batch) are asked individually, like in ParliamentSimulation._generate_votes;
+        counting them as absent would skew the estimate.
+        """
+        batches = split_vote_batches(members, self.vote_batch_size)
+        tallies = np.zeros((rounds, len(TALLY_COLUMNS)), dtype=np.int64)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        total = rounds * len(batches)
+        done = 0
+
+        async def sample_member(member: Dict[Any, Any]) -> VoteType:
+            # Errors, throttling included, fail the run rather than leave a member out of the round
+            async with semaphore, self.scheduler.slot():
+                self.llm_calls += 1
+                return await self.agent.generate_vote(member, proposal_data, debate_summary)
+
+        async def sample(round_index: int, batch: List[Dict[Any, Any]]):
+            nonlocal done
+            async with semaphore, self.scheduler.slot():
+                self.llm_calls += 1
+                try:
+                    votes = await self.agent.generate_votes_batch(batch, proposal_data, debate_summary)
+                except LLMUnavailableError:
+                    # Retrying a throttled provider member by member would only make it worse
+                    raise
+                except Exception:
+                    self.failed_batches += 1
+                    votes = {}
+            missing = [member for member in batch if member["id"] not in votes]
+            if missing:
+                self.member_fallbacks += len(missing)
+                member_votes = await asyncio.gather(*(sample_member(member) for member in missing))
+                votes = {**votes, **{member["id"]: vote for member, vote in zip(missing, member_votes)}}
+            for member in batch:
+                tallies[round_index, TALLY_COLUMNS[votes[member["id"]]]] += 1
+            done += 1
+            await self._report_progress(done / total)
+
+        tasks = [
+            asyncio.ensure_future(sample(round_index, batch))
+            for round_index in range(rounds) for batch in batches
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return tallies
+
+    async def run(self, proposal_id: int, db_crud, rounds: int, method: str = "local"):
+        """
+        Sample a proposal's votes `rounds` times and store the tallies with their summary
+
+        The tokens the rounds spent are stored as the proposal's "monte_carlo" usage.
+        """
+        if method not in MONTE_CARLO_METHODS:
+            raise ValueError(f"Unknown Monte Carlo method: {method}")
+
+        proposal = await db_crud.get_proposal(proposal_id)
+        if not proposal:
+            raise ValueError(f"Proposal with id {proposal_id} not found")
+        members = await db_crud.get_all_members()
+
+        debate = None
+        with track_usage() as usage, usage_stage("monte_carlo"):
+            try:
+                if method == "batch":
+                    # Rounds reuse the summary of the latest simulated debate instead of debating again
+                    debate = await db_crud.get_latest_summarized_debate(proposal_id)
+                    if debate is None:
+                        raise ValueError(f"Proposal {proposal_id} has no debate summary to vote on")
+                    tallies = await self.sample_batch(members, proposal, debate["summary"], rounds)
+                else:
+                    tallies = await self.sample_local(members, proposal, rounds)
+            finally:
+                if usage.requests:
+                    await db_crud.record_token_usage(
+                        proposal_id, "monte_carlo", usage.as_dict(), debate["id"] if debate else None
+                    )
+
+        return await db_crud.create_monte_carlo_run({
+            "proposal_id": proposal_id,
+            "debate_id": debate["id"] if debate else None,
+            "method": method,
+            "tallies": encode_tallies(tallies),
+            **summarize_tallies(tallies)
+        })
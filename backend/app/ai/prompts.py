@@ -1,4 +1,5 @@
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 
 # Common context about the Dutch parliamentary system
 DUTCH_PARLIAMENT_CONTEXT = """
@@ -22,63 +23,118 @@ The Dutch parliament has multiple political parties across the political spectru
 The Dutch parliament typically debates and votes on legislative proposals.
 """
 
-def get_debate_prompt(member_data: Dict[Any, Any], proposal_data: Dict[Any, Any]) -> str:
+# Start of every prompt, with the scales used in member personas
+CONTEXT_PREFIX = f"""
+{DUTCH_PARLIAMENT_CONTEXT}
+Members' stances are scored from 0 to 100: economic (0=left, 100=right),
+social (0=progressive, 100=conservative) and EU (0=pro-EU, 100=anti-EU).
+"""
+
+class Prompt(str):
     """
-    Generate a prompt for a parliament member to debate a law proposal
+    A prompt that knows its shared prefix
+
+    Prompts start with the parts shared with other requests and end with what differs per
+    request: a member's prompts start with the context, the proposal and the debate summary,
+    shared by every member; batched votes start with the context and the batch's members, which
+    are the same for every proposal. Providers that cache prompt prefixes then only process the
+    end anew.
     """
-    economic_leaning = "economically left-wing" if member_data["economic_leaning"] < 40 else (
-        "economically centrist" if member_data["economic_leaning"] < 60 else "economically right-wing"
-    )
-    
-    social_leaning = "socially progressive" if member_data["social_leaning"] < 40 else (
-        "socially moderate" if member_data["social_leaning"] < 60 else "socially conservative"
-    )
-    
-    eu_stance = "pro-European" if member_data["eu_stance"] < 40 else (
-        "EU-neutral" if member_data["eu_stance"] < 60 else "EU-skeptical"
+    def __new__(cls, prefix: str, rest: str):
+        prompt = super().__new__(cls, prefix + rest)
+        prompt.prefix = prefix
+        return prompt
+
+def _leaning_label(score: float, low: str, mid: str, high: str) -> str:
+    return low if score < 40 else (mid if score < 60 else high)
+
+# Rendered personas by member id, with the member fields they were rendered from
+_personas: Dict[int, Tuple[tuple, str]] = {}
+
+def get_member_persona(member_data: Dict[Any, Any]) -> str:
+    """
+    Compact description of a member (party, leanings and profile), rendered once per member
+
+    A member changed elsewhere (e.g. by another process) is rendered again, as the cached
+    persona no longer matches its fields.
+    """
+    party = member_data["party"]
+    fields = (member_data["name"], party["name"], party["abbreviation"], member_data["economic_leaning"],
+              member_data["social_leaning"], member_data["eu_stance"], member_data["bio"])
+    cached = _personas.get(member_data.get("id"))
+    if cached is not None and cached[0] == fields:
+        return cached[1]
+
+    name, party_name, abbreviation, economic, social, eu, bio = fields
+    economic_label = _leaning_label(economic, "economically left-wing", "economically centrist", "economically right-wing")
+    social_label = _leaning_label(social, "socially progressive", "socially moderate", "socially conservative")
+    eu_label = _leaning_label(eu, "pro-European", "EU-neutral", "EU-skeptical")
+    persona = (
+        f"{name}, a member of the {party_name} ({abbreviation}).\n"
+        f"Stance: {economic_label} ({economic}), {social_label} ({social}), {eu_label} ({eu}).\n"
+        f"Profile: {bio}"
     )
-    
+    if member_data.get("id") is not None:
+        _personas[member_data["id"]] = (fields, persona)
+    return persona
+
+def invalidate_member_persona(member_id: Optional[int] = None):
+    """
+    Drop the cached persona of a member, or of all members
+    """
+    if member_id is None:
+        _personas.clear()
+    else:
+        _personas.pop(member_id, None)
+
+@lru_cache(maxsize=256)
+def _proposal_section(title: str, content: str, proposer: Optional[str]) -> str:
+    proposer_line = f"Proposed by: {proposer}\n" if proposer else ""
     return f"""
-{DUTCH_PARLIAMENT_CONTEXT}
+The proposal:
 
-You are {member_data['name']}, a member of the {member_data['party']['name']} ({member_data['party']['abbreviation']}).
-Your political stance is {economic_leaning}, {social_leaning}, and {eu_stance}.
+Title: {title}
+Content: {content}
+{proposer_line}"""
 
-Your profile: {member_data['bio']}
+def get_proposal_section(proposal_data: Dict[Any, Any], debate_summary: Optional[str] = None) -> str:
+    """
+    The proposal and, once the debate is held, its summary
+    """
+    proposer = proposal_data.get("proposer")
+    section = _proposal_section(
+        proposal_data["title"], proposal_data["content"],
+        f"{proposer['name']} ({proposer['party']['abbreviation']})" if proposer else None
+    )
+    if debate_summary is not None:
+        section += f"\nSummary of the debate: {debate_summary}\n"
+    return section
 
-You are participating in a debate about the following proposal:
+def get_proposal_prefix(proposal_data: Dict[Any, Any], debate_summary: Optional[str] = None) -> str:
+    """
+    The shared start of every member's prompts about a proposal
+    """
+    return CONTEXT_PREFIX + get_proposal_section(proposal_data, debate_summary)
 
-Title: {proposal_data['title']}
-Content: {proposal_data['content']}
-Proposed by: {proposal_data['proposer']['name']} ({proposal_data['proposer']['party']['abbreviation']})
+def get_debate_prompt(member_data: Dict[Any, Any], proposal_data: Dict[Any, Any]) -> Prompt:
+    """
+    Generate a prompt for a parliament member to debate a law proposal
+    """
+    return Prompt(get_proposal_prefix(proposal_data), f"""
+You are {get_member_persona(member_data)}
 
+You are participating in the debate about this proposal.
 Generate a realistic 2-3 paragraph statement or question that you would make during this debate. 
 Ensure it reflects your political stance and your party's ideology. Use a formal but engaging parliamentary speaking style.
 Be specific in your points, addressing particular aspects of the proposal, rather than making general comments.
-"""
+""")
 
-def get_voting_prompt(member_data: Dict[Any, Any], proposal_data: Dict[Any, Any], debate_summary: str) -> str:
+def get_voting_prompt(member_data: Dict[Any, Any], proposal_data: Dict[Any, Any], debate_summary: str) -> Prompt:
     """
     Generate a prompt for a parliament member to vote on a law proposal
     """
-    return f"""
-{DUTCH_PARLIAMENT_CONTEXT}
-
-You are {member_data['name']}, a member of the {member_data['party']['name']} ({member_data['party']['abbreviation']}).
-Your political leaning scores (0-100 scale):
-- Economic (0=left, 100=right): {member_data['economic_leaning']}
-- Social (0=progressive, 100=conservative): {member_data['social_leaning']}
-- EU (0=pro-EU, 100=anti-EU): {member_data['eu_stance']}
-
-Your profile: {member_data['bio']}
-
-You need to vote on the following proposal:
-
-Title: {proposal_data['title']}
-Content: {proposal_data['content']}
-Proposed by: {proposal_data['proposer']['name']} ({proposal_data['proposer']['party']['abbreviation']})
-
-Summary of the debate: {debate_summary}
+    return Prompt(get_proposal_prefix(proposal_data, debate_summary), f"""
+You are {get_member_persona(member_data)}
 
 Based on your political views and your party's ideology, how would you vote on this proposal?
 
@@ -86,9 +142,48 @@ Reply with ONLY ONE of the following options:
 - FOR (if you support the proposal)
 - AGAINST (if you oppose the proposal)
 - ABSTAIN (if you choose to abstain from voting)
-"""
+""")
 
-def get_debate_summary_prompt(debate_entries: list) -> str:
+def get_batch_voting_prompt(members: List[Dict[Any, Any]], proposal_data: Dict[Any, Any], debate_summary: str) -> Prompt:
+    """
+    Generate a prompt for a group of parliament members (usually one party) to vote on a law proposal
+    """
+    member_profiles = "\n\n".join([
+        f"Member ID {member['id']}: {get_member_persona(member)}"
+        for member in members
+    ])
+    
+    return Prompt(CONTEXT_PREFIX + f"""
+You are simulating the votes of the following members of parliament:
+
+{member_profiles}
+""", get_proposal_section(proposal_data, debate_summary) + """
+Based on each member's political views and their party's ideology, how would each of them vote on this proposal?
+
+Reply with ONLY a JSON list containing one object per member, for example:
+[{"member_id": 1, "vote": "FOR"}, {"member_id": 2, "vote": "AGAINST"}]
+
+The vote must be one of FOR, AGAINST or ABSTAIN.
+""")
+
+def get_proposal_classification_prompt(proposal_data: Dict[Any, Any]) -> Prompt:
+    """
+    Generate a prompt to place a law proposal on the same ideological axes as the members
+    """
+    return Prompt(get_proposal_prefix(proposal_data), """
+Classify this proposal on three ideological axes (0-100 scale):
+- economic (0=left, 100=right)
+- social (0=progressive, 100=conservative)
+- eu (0=pro-EU, 100=anti-EU)
+
+For each axis give the position of a member of parliament who would support this proposal most strongly,
+and a weight between 0 and 1 for how much that axis matters for this proposal.
+
+Reply with ONLY a JSON object of the form:
+{"economic": 50, "social": 50, "eu": 50, "economic_weight": 0.5, "social_weight": 0.5, "eu_weight": 0.5}
+""")
+
+def get_debate_summary_prompt(debate_entries: list) -> Prompt:
     """
     Generate a prompt to summarize a debate
     """
@@ -97,9 +192,7 @@ def get_debate_summary_prompt(debate_entries: list) -> str:
         for entry in debate_entries
     ])
     
-    return f"""
-{DUTCH_PARLIAMENT_CONTEXT}
-
+    return Prompt(CONTEXT_PREFIX, f"""
 Below is a transcript of a debate in the Dutch parliament:
 
 {debate_text}
@@ -110,4 +203,42 @@ Provide a neutral, factual summary of this debate in 3-4 paragraphs. Include:
 3. The general tone of the debate
 
 Do not add your own opinions or perspectives. Stick strictly to summarizing what was said.
-"""
+""")
+
+def get_partial_summary_prompt(debate_entries: list, label: str) -> Prompt:
+    """
+    Generate a prompt to summarize one part of a long debate, e.g. the speeches of one party
+    """
+    debate_text = "\n\n".join([
+        f"{entry['member']['name']} ({entry['member']['party']['abbreviation']}): {entry['content']}"
+        for entry in debate_entries
+    ])
+    
+    return Prompt(CONTEXT_PREFIX, f"""
+Below are speeches by {label} from a debate in the Dutch parliament:
+
+{debate_text}
+
+Summarize these speeches in one neutral, factual paragraph: the positions taken, the main
+arguments and any concerns or conditions raised. Mention which members said what where it matters.
+""")
+
+def get_summary_merge_prompt(partial_summaries: list, final: bool = True) -> Prompt:
+    """
+    Generate a prompt to combine summaries of parts of a debate into one summary
+    """
+    summaries_text = "\n\n".join([f"{label}: {summary}" for label, summary in partial_summaries])
+    length = "3-4 paragraphs" if final else "one or two paragraphs"
+    
+    return Prompt(CONTEXT_PREFIX, f"""
+Below are summaries of different parts of a debate in the Dutch parliament:
+
+{summaries_text}
+
+Combine them into a single neutral, factual summary of the debate in {length}. Include:
+1. The main points raised by different parties
+2. Key areas of agreement and disagreement
+3. The general tone of the debate
+
+Do not add your own opinions or perspectives. Stick strictly to what the summaries say.
+""")
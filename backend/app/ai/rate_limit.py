@@ -0,0 +1,262 @@
+import asyncio
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Mapping, Optional
+
+from app.config import settings
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    `acquire()` takes one token and waits until one is available.
+    """
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """
+        Wait until `tokens` tokens are available and take them
+        """
+        # Created lazily so the lock binds to the loop that actually uses it
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit for requests to a rate-limited API
+
+    Every success raises the limit by 1/limit (about one per round of requests), every
+    throttled response halves it, between `min_limit` and `max_limit`. Like TCP, throttled
+    requests sent before the last decrease do not decrease it again. A pause (from Retry-After or exhausted rate-limit headers)
+    holds back all new requests until it ends.
+    """
+    def __init__(self, max_limit: int, min_limit: int = 1, initial_limit: Optional[float] = None,
+                 decrease_factor: float = 0.5):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(initial_limit or self.max_limit)
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.successes = 0
+        self.throttled = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def _wake(self):
+        # Hand free slots to waiters in arrival order
+        while self._waiters and self.in_flight < self.current_limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def acquire(self):
+        while True:
+            delay = self.paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight < self.current_limit and not self._waiters:
+                self.in_flight += 1
+                return
+            
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # A slot handed over just before the cancellation goes to the next waiter
+                if waiter.done() and not waiter.cancelled():
+                    self.release()
+                raise
+            return
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one request slot; yields the time the request started, for `record_throttle`
+        """
+        await self.acquire()
+        try:
+            yield time.monotonic()
+        finally:
+            self.release()
+
+    def record_success(self):
+        self.successes += 1
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def record_throttle(self, retry_after: Optional[float] = None, started_at: Optional[float] = None):
+        self.throttled += 1
+        if started_at is None or started_at >= self._last_decrease:
+            self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+            self._last_decrease = time.monotonic()
+        if retry_after:
+            self.pause(retry_after)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "max_concurrency": self.max_limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "successes": self.successes,
+            "throttled": self.throttled,
+            "paused_for": max(0.0, self.paused_until - time.monotonic()),
+        }
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+def _parse_seconds(value: str) -> Optional[float]:
+    """
+    Parse a delay given as seconds ("2", "0.5"), a duration ("1m30s", "250ms") or an HTTP date
+    """
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+# Pairs of (remaining, reset) rate-limit headers, in the spellings used by LLM providers
+RATE_LIMIT_HEADERS = (
+    ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+    ("x-ratelimit-remaining", "x-ratelimit-reset"),
+    ("ratelimit-remaining", "ratelimit-reset"),
+)
+
+def rate_limit_delay(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Seconds to hold back requests according to a response's headers, if any
+
+    Uses Retry-After, or the reset time of a rate-limit window with no requests remaining.
+    """
+    if headers.get("retry-after"):
+        return _parse_seconds(headers["retry-after"])
+    for remaining, reset in RATE_LIMIT_HEADERS:
+        if headers.get(remaining, "").strip() == "0" and headers.get(reset):
+            return _parse_seconds(headers[reset])
+    return None
+
+# Scheduler of the enclosing `slot` block; asyncio tasks inherit it when created
+_current_scheduler: ContextVar[Optional["LLMScheduler"]] = ContextVar("llm_scheduler", default=None)
+
+class LLMScheduler:
+    """
+    Shared gate for LLM requests
+
+    Bounds the requests in flight and their rate across every simulation that uses it,
+    so simulations of many proposals together keep the provider busy without exceeding
+    its limits. Also counts requests for throughput reporting.
+    """
+    def __init__(self, rate: Optional[float] = None, max_in_flight: Optional[int] = None):
+        self.rate_limiter = TokenBucket(rate or settings.LLM_REQUESTS_PER_SECOND)
+        self.max_in_flight = max(1, max_in_flight or settings.LLM_MAX_IN_FLIGHT)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.calls = 0
+        self.attempts = 0
+        self.in_flight = 0
+        self.started_at = time.monotonic()
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Send the LLM requests made inside the block through this scheduler
+
+        The client takes a slot and a rate-limit token for each attempt of a request (see
+        `attempt`), so retries are rate limited too and backoff between attempts holds neither.
+        """
+        self.calls += 1
+        token = _current_scheduler.set(self)
+        try:
+            yield
+        finally:
+            _current_scheduler.reset(token)
+
+    @asynccontextmanager
+    async def attempt(self):
+        """
+        Hold one request slot for a single attempt, waiting for a free slot and a rate-limit token first
+        """
+        # Created lazily so the semaphore binds to the loop that actually uses it
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        async with self._semaphore:
+            await self.rate_limiter.acquire()
+            self.attempts += 1
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> Dict[str, float]:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "rate_limit": self.rate_limiter.rate,
+            "calls_per_second": self.calls / elapsed if elapsed > 0 else 0.0,
+        }
+
+def current_scheduler() -> Optional[LLMScheduler]:
+    """
+    The scheduler of the enclosing `LLMScheduler.slot` block, if any
+    """
+    return _current_scheduler.get()
+
+# Scheduler shared by all simulations a process runs
+_default_scheduler: Optional[LLMScheduler] = None
+
+def get_default_scheduler() -> LLMScheduler:
+    global _default_scheduler
+    if _default_scheduler is None:
+        _default_scheduler = LLMScheduler()
+    return _default_scheduler
@@ -1,97 +1,617 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 import asyncio
+import time
+from contextlib import asynccontextmanager
 from app.ai.agents import ParliamentaryAgent
+from app.ai.budget import (
+    TokenBudget, batch_vote_cost, classification_cost, debate_entry_cost, summary_cost, vote_cost
+)
+from app.ai.client import LLMUnavailableError
+from app.ai.ideology import IdeologyVoteModel
+from app.ai.rate_limit import LLMScheduler
+from app.ai.summarizer import DebateSummarizer
+from app.ai.usage import TokenUsage, estimate_tokens, track_usage, usage_stage
+from app.config import settings
+from app.models.checkpoint import SimulationStage
 from app.models.vote import VoteType
 from app.models.proposal import ProposalStatus
 
+VOTING_MODES = ("member", "batch", "local")
+
+# Share of the overall progress covered by each stage of a simulation run
+STAGE_PROGRESS = {
+    "debate": (0.0, 0.45),
+    "summary": (0.45, 0.5),
+    "voting": (0.5, 1.0),
+}
+
+def split_vote_batches(members: List[Dict[Any, Any]], batch_size: int = 0) -> List[List[Dict[Any, Any]]]:
+    """
+    Split the members into batches for batched voting: fixed-size, or one per party if `batch_size` is 0
+    """
+    if batch_size > 0:
+        return [members[i:i + batch_size] for i in range(0, len(members), batch_size)]
+    
+    batches: Dict[str, List[Dict[Any, Any]]] = {}
+    for member in members:
+        batches.setdefault(member["party"]["abbreviation"], []).append(member)
+    return list(batches.values())
+
+async def _gather_all(aws) -> List[Any]:
+    """
+    Like asyncio.gather, but waits for every awaitable before raising the first error
+
+    Vote tasks write to the shared session, so none may still be running once a stage gives up.
+    """
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
 class ParliamentSimulation:
-    def __init__(self, agent: ParliamentaryAgent = None):
+    def __init__(self, agent: ParliamentaryAgent = None, concurrency: int = None,
+                 scheduler: LLMScheduler = None, debate_concurrency: int = None,
+                 voting_mode: str = None, vote_batch_size: int = None,
+                 vote_model: IdeologyVoteModel = None, vote_checkpoint_size: int = None,
+                 on_progress: Callable[[str, float], Awaitable[None]] = None,
+                 on_event: Callable[[str, Dict[str, Any]], Awaitable[None]] = None,
+                 stream_debate: bool = None, token_budget: int = None):
         self.agent = agent or ParliamentaryAgent()
+        # Number of LLM requests kept in flight at once; 1 runs members one by one
+        self.concurrency = max(1, concurrency or settings.SIMULATION_CONCURRENCY)
+        self.debate_concurrency = max(1, debate_concurrency or settings.DEBATE_CONCURRENCY)
+        self.debate_max_speakers = max(1, settings.DEBATE_MAX_SPEAKERS)
+        # Rate and in-flight limits, shared with other simulations when they use the same scheduler
+        self.scheduler = scheduler or LLMScheduler()
+        # LLM requests made by this simulation
+        self.llm_calls = 0
+        # Seconds spent in each stage (debate, summary, voting) by the last run
+        self.stage_durations: Dict[str, float] = {}
+        self.voting_mode = voting_mode or settings.VOTING_MODE
+        if self.voting_mode not in VOTING_MODES:
+            raise ValueError(f"Unknown voting mode: {self.voting_mode}")
+        self.vote_batch_size = settings.VOTING_BATCH_SIZE if vote_batch_size is None else vote_batch_size
+        self.vote_model = vote_model or IdeologyVoteModel(
+            for_threshold=settings.LOCAL_VOTE_FOR_THRESHOLD,
+            against_threshold=settings.LOCAL_VOTE_AGAINST_THRESHOLD,
+            noise=settings.LOCAL_VOTE_NOISE
+        )
+        self.vote_checkpoint_size = max(1, vote_checkpoint_size or settings.VOTE_CHECKPOINT_SIZE)
+        # Called with the current stage and the overall progress (0-1) of a run
+        self.on_progress = on_progress
+        # Called with each event of a run (debate entries, the summary, votes, the outcome)
+        self.on_event = on_event
+        # Stream speeches, relaying their text to listeners and storing it while it is generated
+        self.stream_debate = settings.DEBATE_STREAMING if stream_debate is None else stream_debate
+        self.debate_flush_interval = settings.DEBATE_FLUSH_INTERVAL
+        # Set once the LLM API stays unavailable after retries; requests not yet sent are then
+        # not attempted, since the run fails and is resumed from its checkpoint later
+        self._unavailable: Optional[LLMUnavailableError] = None
+        # Tokens a run may spend (0 = no limit), and the budget and plan of the current run
+        self.token_budget = settings.SIMULATION_TOKEN_BUDGET if token_budget is None else token_budget
+        self.budget = TokenBudget(0, TokenUsage())
+        self.plan = self._default_plan()
+        self._budget_notices = set()
+    
+    def _default_plan(self) -> Dict[str, Any]:
+        """
+        How a run without a token budget is held
+        """
+        return {
+            "speakers": self.debate_max_speakers,
+            "speech_tokens": settings.DEBATE_MAX_TOKENS,
+            "summary_tokens": settings.SUMMARY_MAX_TOKENS,
+            "voting_mode": self.voting_mode,
+            # Tokens speeches and votes leave unspent for what comes after them
+            "keep_after_debate": 0,
+            "keep_after_votes": 0,
+            "estimated_tokens": None,
+            "degraded": False
+        }
+    
+    async def _over_budget(self, stage: str, what: str):
+        """
+        Note once per stage that the token budget left something out
+        """
+        if stage in self._budget_notices:
+            return
+        self._budget_notices.add(stage)
+        print(f"Token budget of {self.budget.limit} reached during the {stage} stage: {what}")
+        await self._emit("budget", {"stage": stage, "detail": what, "limit": self.budget.limit})
     
+    async def _report_progress(self, stage: str, fraction: float):
+        """
+        Report progress through `fraction` (0-1) of a stage to the progress callback
+        """
+        if self.on_progress is None:
+            return
+        start, end = STAGE_PROGRESS[stage]
+        try:
+            await self.on_progress(stage, start + (end - start) * fraction)
+        except Exception as e:
+            print(f"Error reporting simulation progress: {str(e)}")
+    
+    @asynccontextmanager
+    async def _llm_slot(self, semaphore: asyncio.Semaphore = None):
+        """
+        Hold a slot for one LLM request within the stage's concurrency, sent through the scheduler
+
+        The scheduler's limits apply to each attempt of the request, not to its retry backoff.
+        """
+        if semaphore is not None:
+            await semaphore.acquire()
+        try:
+            if self._unavailable is not None:
+                raise self._unavailable
+            async with self.scheduler.slot():
+                self.llm_calls += 1
+                yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+    
+    async def _emit(self, event_type: str, data: Dict[str, Any]):
+        """
+        Pass an event to the event callback; a failing callback never stops the simulation
+        """
+        if self.on_event is None:
+            return
+        try:
+            await self.on_event(event_type, data)
+        except Exception as e:
+            print(f"Error publishing simulation event {event_type}: {str(e)}")
+    
+    async def _generate_debate_entry(self, semaphore: asyncio.Semaphore, member: Dict[Any, Any],
+                                     proposal_data: Dict[Any, Any],
+                                     on_text: Callable[[str], Awaitable[None]] = None) -> Optional[str]:
+        """
+        Generate a single speech within the concurrency and rate limits
+
+        With `on_text` the speech is streamed and each piece of text is passed to it as it arrives.
+        Returns None if it failed, or if the token budget left no room for it.
+        """
+        # Speeches reserve their tokens as they are requested, so the first speakers go first
+        speech_tokens = self.plan["speech_tokens"]
+        cost = debate_entry_cost(member, proposal_data, speech_tokens)
+        if not self.budget.reserve(cost, keep=self.plan["keep_after_debate"]):
+            await self._over_budget("debate", "the remaining members do not speak")
+            return None
+        try:
+            async with self._llm_slot(semaphore):
+                try:
+                    if on_text is None:
+                        return await self.agent.generate_debate_entry(member, proposal_data, speech_tokens)
+                    
+                    parts = []
+                    async for text in self.agent.stream_debate_entry(member, proposal_data, speech_tokens):
+                        parts.append(text)
+                        await on_text(text)
+                    return "".join(parts)
+                except LLMUnavailableError as e:
+                    self._unavailable = e
+                    raise
+                except Exception as e:
+                    print(f"Error generating debate entry for member {member['name']}: {str(e)}")
+                    return None
+        finally:
+            self.budget.release(cost)
+
+    def _speech_streamer(self, member: Dict[Any, Any], parts: List[str]) -> Callable[[str], Awaitable[None]]:
+        """
+        Text callback for a streamed speech: collects the text and relays it to listeners
+        """
+        async def on_text(text: str):
+            parts.append(text)
+            await self._emit("debate_chunk", {
+                "member_id": member["id"],
+                "member_name": member["name"],
+                "party": member["party"]["abbreviation"],
+                "text": text
+            })
+        
+        return on_text
+
+    async def _persist_streamed_speech(self, task: asyncio.Future, parts: List[str], entry: Dict[str, Any],
+                                       db_crud) -> Optional[Dict[str, Any]]:
+        """
+        Store the text of a speech while it is still being streamed, every `debate_flush_interval` seconds
+
+        Returns the stored (partial) entry, or None if no text arrived before the speech was done.
+        """
+        db_entry = None
+        while not task.done():
+            await asyncio.wait({task}, timeout=self.debate_flush_interval)
+            content = "".join(parts)
+            if task.done() or not content:
+                continue
+            if db_entry is None:
+                db_entry = await db_crud.create_debate_entry({**entry, "content": content})
+            elif content != db_entry["content"]:
+                db_entry = await db_crud.update_debate_entry(db_entry["id"], content)
+        return db_entry
+
     async def simulate_debate(self, proposal_data: Dict[Any, Any], members: List[Dict[Any, Any]], 
-                             debate_id: int, db_crud):
+                             debate_id: int, db_crud, existing_entries: List[Dict[Any, Any]] = None,
+                             summarizer: DebateSummarizer = None):
         """
         Simulate a debate on a proposal among parliament members
+
+        Members with an entry in `existing_entries` (from an interrupted run) do not speak again.
+        Every entry, in speaking order, is also passed to `summarizer` as soon as it is stored.
         """
-        # Limit the number of members participating in the debate for efficiency
-        participating_members = members[:15]  # Take only some members
+        # Limit the number of members participating in the debate for efficiency (and the token budget)
+        participating_members = members[:self.plan["speakers"]]
+        existing = {entry["member_id"]: entry for entry in existing_entries or []}
+        speakers = [member for member in participating_members if member["id"] not in existing]
+        
+        # Request all speeches up front; at most `debate_concurrency` run at once
+        semaphore = asyncio.Semaphore(self.debate_concurrency)
+        speech_parts: Dict[int, List[str]] = {member["id"]: [] for member in speakers}
+        tasks = {
+            member["id"]: asyncio.ensure_future(self._generate_debate_entry(
+                semaphore, member, proposal_data,
+                self._speech_streamer(member, speech_parts[member["id"]]) if self.stream_debate else None
+            ))
+            for member in speakers
+        }
         
         debate_entries = []
         
-        # Generate debate entries for each participating member
-        for member in participating_members:
-            try:
-                debate_content = await self.agent.generate_debate_entry(member, proposal_data)
+        # Persist each speech in speaking order as soon as it and its predecessors are done
+        try:
+            for member in participating_members:
+                if member["id"] in existing:
+                    debate_entries.append(existing[member["id"]])
+                    if summarizer is not None:
+                        summarizer.add(existing[member["id"]])
+                    continue
                 
-                # Create debate entry in the database
+                task = tasks[member["id"]]
                 entry = {
                     "debate_id": debate_id,
                     "member_id": member["id"],
-                    "content": debate_content
                 }
                 
-                db_entry = await db_crud.create_debate_entry(entry)
-                debate_entries.append(db_entry)
-                
-                # Small delay to avoid rate limiting
-                await asyncio.sleep(1)
+                try:
+                    # A streamed speech whose turn it is gets stored while it is being generated
+                    db_entry = None
+                    if self.stream_debate:
+                        db_entry = await self._persist_streamed_speech(task, speech_parts[member["id"]], entry, db_crud)
+                    debate_content = await task
+                    
+                    if debate_content is None:
+                        # Do not keep half a speech of a failed generation
+                        if db_entry is not None:
+                            await db_crud.delete_debate_entry(db_entry["id"])
+                        continue
+                    
+                    # Create debate entry in the database
+                    if db_entry is None:
+                        db_entry = await db_crud.create_debate_entry({**entry, "content": debate_content})
+                    elif db_entry["content"] != debate_content:
+                        db_entry = await db_crud.update_debate_entry(db_entry["id"], debate_content)
+                    debate_entries.append(db_entry)
+                    if summarizer is not None:
+                        summarizer.add(db_entry)
+                    await self._emit("debate_entry", {
+                        "id": db_entry["id"],
+                        "debate_id": debate_id,
+                        "member_id": member["id"],
+                        "member_name": member["name"],
+                        "party": member["party"]["abbreviation"],
+                        "content": db_entry["content"],
+                        "timestamp": db_entry["timestamp"]
+                    })
+                    await self._report_progress("debate", len(debate_entries) / len(participating_members))
                 
-            except Exception as e:
-                print(f"Error generating debate entry for member {member['name']}: {str(e)}")
+                except LLMUnavailableError:
+                    # A speech is never skipped because the API is down; the resumed run gives it
+                    if db_entry is not None:
+                        await db_crud.delete_debate_entry(db_entry["id"])
+                    raise
+                except Exception as e:
+                    print(f"Error saving debate entry for member {member['name']}: {str(e)}")
+        finally:
+            # Speeches still being generated are stopped and awaited, closing their streams
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
         
         return debate_entries
     
+    async def _generate_vote(self, semaphore: asyncio.Semaphore, member: Dict[Any, Any],
+                             proposal_data: Dict[Any, Any], debate_summary: str) -> Optional[VoteType]:
+        """
+        Generate a single member's vote within the concurrency and rate limits
+
+        Returns None if the token budget left no room for it.
+        """
+        cost = vote_cost(member, proposal_data, debate_summary)
+        if not self.budget.reserve(cost, keep=self.plan["keep_after_votes"]):
+            await self._over_budget("voting", "the remaining votes come from the ideology model")
+            return None
+        try:
+            async with self._llm_slot(semaphore):
+                try:
+                    return await self.agent.generate_vote(member, proposal_data, debate_summary)
+                except LLMUnavailableError as e:
+                    # Recording these as ABSENT would silently skew the outcome
+                    self._unavailable = e
+                    raise
+                except Exception as e:
+                    print(f"Error generating vote for member {member['name']}: {str(e)}")
+                    # Default to absent if there's an error
+                    return VoteType.ABSENT
+        finally:
+            self.budget.release(cost)
+
+    def _vote_batches(self, members: List[Dict[Any, Any]]) -> List[List[Dict[Any, Any]]]:
+        return split_vote_batches(members, self.vote_batch_size)
+
+    async def _generate_batch_votes(self, semaphore: asyncio.Semaphore, batch: List[Dict[Any, Any]],
+                                    proposal_data: Dict[Any, Any], debate_summary: str) -> Dict[int, VoteType]:
+        """
+        Generate the votes of one batch of members within the concurrency and rate limits
+
+        A batch the token budget has no room for gets no votes, like a failed one.
+        """
+        cost = batch_vote_cost(batch, proposal_data, debate_summary)
+        if not self.budget.reserve(cost, keep=self.plan["keep_after_votes"]):
+            return {}
+        try:
+            async with self._llm_slot(semaphore):
+                try:
+                    return await self.agent.generate_votes_batch(batch, proposal_data, debate_summary)
+                except LLMUnavailableError as e:
+                    self._unavailable = e
+                    raise
+                except Exception as e:
+                    print(f"Error generating votes for batch of {len(batch)} members: {str(e)}")
+                    return {}
+        finally:
+            self.budget.release(cost)
+
+    async def _compute_local_votes(self, semaphore: asyncio.Semaphore, members: List[Dict[Any, Any]],
+                                   proposal_data: Dict[Any, Any]) -> Optional[Dict[int, VoteType]]:
+        """
+        Votes from the ideology model after one classification request, or None if that failed
+
+        The classification is the cheapest way to vote, so it is made even when the token budget
+        is spent; plans keep room for it (keep_after_votes).
+        """
+        async with self._llm_slot(semaphore):
+            try:
+                position = await self.agent.classify_proposal(proposal_data)
+            except LLMUnavailableError as e:
+                self._unavailable = e
+                raise
+            except Exception as e:
+                print(f"Error classifying proposal {proposal_data['title']}: {str(e)}")
+                position = None
+        if position is None:
+            return None
+        vote_types = self.vote_model.compute_votes(members, position)
+        return {member["id"]: vote_type for member, vote_type in zip(members, vote_types)}
+
+    async def _generate_votes(self, members: List[Dict[Any, Any]], proposal_data: Dict[Any, Any],
+                              debate_summary: str,
+                              on_votes: Callable[[Dict[int, VoteType]], Awaitable[None]] = None) -> List[VoteType]:
+        """
+        Generate every member's vote, returned in member order
+
+        `on_votes` is awaited with each group of votes (by member id) as soon as it is known.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        votes_by_member: Dict[int, VoteType] = {}
+        
+        async def record(votes: Dict[int, VoteType]):
+            votes_by_member.update(votes)
+            if on_votes is not None and votes:
+                await on_votes(votes)
+            await self._report_progress("voting", len(votes_by_member) / len(members))
+        
+        async def generate_vote(member: Dict[Any, Any]):
+            vote_type = await self._generate_vote(semaphore, member, proposal_data, debate_summary)
+            if vote_type is not None:
+                await record({member["id"]: vote_type})
+        
+        async def generate_batch_votes(batch: List[Dict[Any, Any]]):
+            await record(await self._generate_batch_votes(semaphore, batch, proposal_data, debate_summary))
+        
+        # The run's voting mode, which the token budget may have lowered
+        voting_mode = self.plan["voting_mode"]
+        if voting_mode == "local":
+            # One classification request, then every vote is computed locally
+            votes = await self._compute_local_votes(semaphore, members, proposal_data)
+            if votes is not None:
+                await record(votes)
+                return [votes[member["id"]] for member in members]
+            print(f"Could not classify proposal {proposal_data['title']}, falling back to member voting")
+        
+        if voting_mode == "batch":
+            await _gather_all([generate_batch_votes(batch) for batch in self._vote_batches(members)])
+        
+        # Ask members individually if their vote was not (or could not be) generated in a batch
+        remaining = [member for member in members if member["id"] not in votes_by_member]
+        await _gather_all([generate_vote(member) for member in remaining])
+        
+        # Members the token budget had no room for get their vote from the ideology model
+        remaining = [member for member in members if member["id"] not in votes_by_member]
+        if remaining:
+            votes = await self._compute_local_votes(semaphore, remaining, proposal_data)
+            if votes is None:
+                print(f"Could not classify proposal {proposal_data['title']}, "
+                      f"{len(remaining)} members over the token budget are absent")
+                votes = {member["id"]: VoteType.ABSENT for member in remaining}
+            await record(votes)
+        
+        return [votes_by_member[member["id"]] for member in members]
+
     async def simulate_voting(self, proposal_id: int, proposal_data: Dict[Any, Any], 
-                             members: List[Dict[Any, Any]], debate_summary: str, db_crud):
+                             members: List[Dict[Any, Any]], debate_summary: str, db_crud,
+                             voted_member_ids: List[int] = None):
         """
         Simulate voting on a proposal among parliament members
+
+        Members in `voted_member_ids` (whose votes an interrupted run already stored) are skipped.
         """
-        votes = []
+        voted = set(voted_member_ids or [])
+        pending_members = [member for member in members if member["id"] not in voted]
         
-        # Generate votes for each member
-        for member in members:
-            try:
-                vote_type = await self.agent.generate_vote(member, proposal_data, debate_summary)
-                
-                # Create vote in the database
-                vote = {
-                    "proposal_id": proposal_id,
-                    "member_id": member["id"],
+        # Votes are written in chunks as they come in, so a crash loses at most one chunk
+        pending_votes: List[Dict[str, Any]] = []
+        write_lock = asyncio.Lock()
+        
+        async def write_votes():
+            async with write_lock:
+                if not pending_votes:
+                    return
+                chunk = pending_votes[:]
+                pending_votes.clear()
+                await db_crud.create_votes_bulk(chunk)
+        
+        member_names = {member["id"]: member["name"] for member in members}
+        
+        async def on_votes(votes: Dict[int, VoteType]):
+            pending_votes.extend(
+                {"proposal_id": proposal_id, "member_id": member_id, "vote": vote_type}
+                for member_id, vote_type in votes.items()
+            )
+            for member_id, vote_type in votes.items():
+                await self._emit("vote", {
+                    "member_id": member_id,
+                    "member_name": member_names[member_id],
                     "vote": vote_type
-                }
-                
-                db_vote = await db_crud.create_vote(vote)
-                votes.append(db_vote)
-                
-                # Small delay to avoid rate limiting
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                print(f"Error generating vote for member {member['name']}: {str(e)}")
-                # Default to absent if there's an error
-                vote = {
-                    "proposal_id": proposal_id,
-                    "member_id": member["id"],
-                    "vote": VoteType.ABSENT
-                }
-                db_vote = await db_crud.create_vote(vote)
-                votes.append(db_vote)
+                })
+            if len(pending_votes) >= self.vote_checkpoint_size:
+                await write_votes()
+        
+        # Generate all votes concurrently, bounded by the semaphore and the rate limiter
+        if pending_members:
+            try:
+                await self._generate_votes(pending_members, proposal_data, debate_summary, on_votes=on_votes)
+            except LLMUnavailableError:
+                # Keep the votes that did come in, so the resumed run only asks the others
+                await write_votes()
+                raise
+        await write_votes()
+        
+        vote_summary = await db_crud.get_vote_summary(proposal_id)
         
         # Determine outcome
-        for_votes = sum(1 for v in votes if v.vote == VoteType.FOR)
-        against_votes = sum(1 for v in votes if v.vote == VoteType.AGAINST)
+        status = ProposalStatus.PASSED if vote_summary.passed else ProposalStatus.REJECTED
+        await db_crud.update_proposal_status(proposal_id, status)
+        await self._emit("outcome", {"status": status, "vote_summary": vote_summary.dict()})
+        
+        return vote_summary
+    
+    def _plan_budget(self, proposal: Dict[Any, Any], members: List[Dict[Any, Any]], stage: SimulationStage,
+                     debate_entries: List[Dict[Any, Any]], debate_summary: Optional[str]) -> Dict[str, Any]:
+        """
+        Fit the rest of a run into what is left of its token budget
+
+        Speeches get shorter first (down to BUDGET_MIN_SPEECH_TOKENS, the summary shrinking along),
+        then fewer members speak (down to BUDGET_MIN_SPEAKERS). Only when even the cheapest debate
+        leaves too little for the voting mode is the next cheaper one (batch, then local) taken.
+        The estimates are rough; reservations (see TokenBudget) stop requests that would overrun.
+        """
+        plan = self._default_plan()
+        if not self.budget.enabled:
+            return plan
+        
+        participating = members[:self.debate_max_speakers]
+        spoken = {entry["member_id"] for entry in debate_entries}
+        min_speech = min(settings.BUDGET_MIN_SPEECH_TOKENS, settings.DEBATE_MAX_TOKENS)
         
-        if for_votes > against_votes:
-            await db_crud.update_proposal_status(proposal_id, ProposalStatus.PASSED)
+        # Ways to hold the debate, from the full one down to the cheapest
+        if stage == SimulationStage.DEBATE:
+            # Members who spoke in an interrupted run keep their place in the debate
+            min_speakers = max([settings.BUDGET_MIN_SPEAKERS] + [
+                position + 1 for position, member in enumerate(participating) if member["id"] in spoken
+            ])
+            levels = []
+            speech_tokens = settings.DEBATE_MAX_TOKENS
+            while True:
+                levels.append((len(participating), speech_tokens))
+                if speech_tokens <= min_speech:
+                    break
+                speech_tokens = max(min_speech, speech_tokens * 3 // 4)
+            levels += [(count, speech_tokens) for count in range(len(participating) - 1, min_speakers - 1, -1)]
+            prompt_tokens = [
+                0 if member["id"] in spoken else debate_entry_cost(member, proposal, 0) for member in participating
+            ]
         else:
-            await db_crud.update_proposal_status(proposal_id, ProposalStatus.REJECTED)
+            levels = [(len(debate_entries), settings.DEBATE_MAX_TOKENS)]
         
-        return votes
+        # Tokens of each voting mode apart from the summary, and the requests that repeat the summary
+        summary = debate_summary if stage == SimulationStage.VOTING else ""
+        batches = self._vote_batches(members)
+        voting_costs = {
+            "member": (sum(vote_cost(member, proposal, summary) for member in members), len(members)),
+            "batch": (sum(batch_vote_cost(batch, proposal, summary) for batch in batches), len(batches)),
+            "local": (classification_cost(proposal), 0),
+        }
+        modes = VOTING_MODES[VOTING_MODES.index(self.voting_mode):]
+        remaining = self.budget.remaining
+        
+        for mode in modes:
+            for speakers, speech_tokens in levels:
+                summary_tokens = min(settings.SUMMARY_MAX_TOKENS, max(
+                    min_speech, settings.SUMMARY_MAX_TOKENS * speech_tokens // settings.DEBATE_MAX_TOKENS
+                ))
+                debate_tokens = summary_stage_tokens = 0
+                if stage == SimulationStage.DEBATE:
+                    debate_tokens = sum(prompt_tokens[:speakers]) + speech_tokens * sum(
+                        1 for member in participating[:speakers] if member["id"] not in spoken
+                    )
+                    summary_stage_tokens = summary_cost(speakers, speech_tokens, summary_tokens)
+                elif stage == SimulationStage.SUMMARY:
+                    summary_stage_tokens = (summary_cost(0, 0, summary_tokens)
+                                              + sum(estimate_tokens(entry["content"]) for entry in debate_entries))
+                votes_base, summary_requests = voting_costs[mode]
+                voting_tokens = votes_base + (summary_requests * summary_tokens if summary == "" else 0)
+                # Members the budget leaves without an LLM vote are voted locally after a classification
+                keep_after_votes = 0 if mode == "local" else voting_costs["local"][0]
+                estimated = debate_tokens + summary_stage_tokens + voting_tokens + keep_after_votes
+                cheapest = mode == modes[-1] and (speakers, speech_tokens) == levels[-1]
+                if estimated <= remaining or cheapest:
+                    if estimated > remaining:
+                        print(f"Token budget of {self.budget.limit} is too small for the cheapest run "
+                              f"(about {estimated} tokens); it stops requests once spent")
+                    return {
+                        **plan,
+                        "speakers": speakers if stage == SimulationStage.DEBATE else plan["speakers"],
+                        "speech_tokens": speech_tokens,
+                        "summary_tokens": summary_tokens,
+                        "voting_mode": mode,
+                        "keep_after_debate": summary_stage_tokens + voting_tokens + keep_after_votes,
+                        "keep_after_votes": keep_after_votes,
+                        "estimated_tokens": estimated,
+                        "degraded": mode != self.voting_mode or (speakers, speech_tokens) != levels[0]
+                    }
+    
+    async def _record_usage(self, proposal_id: int, debate_id: int, usage: TokenUsage, db_crud):
+        """
+        Store the tokens each stage of a run spent, also when the run failed
+        """
+        for stage, stage_usage in usage.stages.items():
+            try:
+                await db_crud.record_token_usage(proposal_id, stage, stage_usage.as_dict(), debate_id)
+            except Exception as e:
+                print(f"Error recording token usage of the {stage} stage of proposal {proposal_id}: {str(e)}")
     
     async def run_full_simulation(self, proposal_id: int, db_crud):
         """
         Run a full simulation of the parliamentary process for a proposal
+
+        The tokens each stage spends are stored per debate and stage; with a token budget, the
+        run is planned to stay within it (see _plan_budget).
         """
+        self._unavailable = None
+        self.stage_durations = {}
+        self._budget_notices = set()
+        
         # Get proposal data
         proposal = await db_crud.get_proposal(proposal_id)
         if not proposal:
@@ -100,30 +620,105 @@ class ParliamentSimulation:
         # Get all members
         members = await db_crud.get_all_members()
         
-        # Update proposal to debating status
-        await db_crud.update_proposal_status(proposal_id, ProposalStatus.DEBATING)
-        
-        # Create a new debate
-        debate = await db_crud.create_debate({
-            "proposal_id": proposal_id,
-            "title": f"Debate on {proposal.title}"
-        })
+        # Pick up an interrupted run where its checkpoint left off; everything before the
+        # checkpoint's stage (and any entries or votes already stored) is reused as is
+        checkpoint = await db_crud.get_checkpoint(proposal_id)
+        debate = None
+        if checkpoint is not None and checkpoint["stage"] != SimulationStage.COMPLETED and checkpoint["debate_id"]:
+            debate = await db_crud.get_debate(checkpoint["debate_id"])
         
-        # Simulate debate
-        debate_entries = await self.simulate_debate(proposal, members, debate.id, db_crud)
+        if debate is not None:
+            stage = checkpoint["stage"]
+            print(f"Resuming simulation of proposal {proposal_id} at the {stage.value} stage")
+        else:
+            stage = SimulationStage.DEBATE
+            
+            # Update proposal to debating status
+            await db_crud.update_proposal_status(proposal_id, ProposalStatus.DEBATING)
+            
+            # Create a new debate
+            debate = await db_crud.create_debate({
+                "proposal_id": proposal_id,
+                "title": f"Debate on {proposal['title']}"
+            })
+            await db_crud.save_checkpoint(proposal_id, stage=stage, debate_id=debate["id"])
+        await self._emit("debate", {"id": debate["id"], "title": debate["title"], "stage": stage})
+        debate_entries = await db_crud.get_debate_entries(debate["id"])
         
-        # Generate debate summary
-        debate_summary = await self.agent.generate_debate_summary(debate_entries)
+        # Earlier attempts of a resumed run count towards its budget
+        spent = await db_crud.get_debate_token_total(debate["id"]) if self.token_budget > 0 else 0
+        with track_usage() as usage:
+            self.budget = TokenBudget(self.token_budget, usage, spent)
+            self.plan = self._plan_budget(proposal, members, stage, debate_entries, debate["summary"])
+            if self.plan["degraded"]:
+                print(f"Simulation of proposal {proposal_id} planned within its token budget of "
+                      f"{self.budget.limit}: {self.plan['speakers']} speakers, speeches of "
+                      f"{self.plan['speech_tokens']} tokens, {self.plan['voting_mode']} voting")
+                await self._emit("budget", {"limit": self.budget.limit, "spent": spent, "plan": self.plan})
+            try:
+                return await self._run_stages(proposal, members, debate, debate_entries, stage, db_crud)
+            finally:
+                await self._record_usage(proposal_id, debate["id"], usage, db_crud)
+    
+    async def _run_stages(self, proposal: Dict[Any, Any], members: List[Dict[Any, Any]], debate: Dict[str, Any],
+                          debate_entries: List[Dict[Any, Any]], stage: SimulationStage, db_crud):
+        """
+        Run the stages of a simulation from `stage` on
+        """
+        proposal_id = proposal["id"]
+        resumed_stage = stage
         
-        # Update proposal to voting status
-        await db_crud.update_proposal_status(proposal_id, ProposalStatus.VOTING)
+        # Long debates are summarized in parts while they are held (see DebateSummarizer)
+        summarizer = DebateSummarizer(self.agent, self._llm_slot, max_tokens=self.plan["summary_tokens"])
+        try:
+            # Simulate debate
+            if stage == SimulationStage.DEBATE:
+                started = time.perf_counter()
+                with usage_stage("debate"):
+                    debate_entries = await self.simulate_debate(
+                        proposal, members, debate["id"], db_crud, debate_entries, summarizer
+                    )
+                stage = SimulationStage.SUMMARY
+                await db_crud.save_checkpoint(proposal_id, stage=stage)
+                self.stage_durations["debate"] = time.perf_counter() - started
+            
+            # Generate debate summary
+            if stage == SimulationStage.SUMMARY:
+                started = time.perf_counter()
+                await self._report_progress("summary", 0.0)
+                if not summarizer.entries:
+                    # Resumed after the debate; its speeches are summarized now
+                    for entry in debate_entries:
+                        summarizer.add(entry)
+                debate["summary"] = await summarizer.finish()
+                await db_crud.update_debate_summary(debate["id"], debate["summary"])
+                await self._emit("summary", {"debate_id": debate["id"], "summary": debate["summary"]})
+                
+                # Update proposal to voting status; votes from earlier runs are replaced, so that
+                # stored votes always belong to this run if it has to be resumed
+                await db_crud.delete_votes(proposal_id)
+                await db_crud.update_proposal_status(proposal_id, ProposalStatus.VOTING)
+                stage = SimulationStage.VOTING
+                await db_crud.save_checkpoint(proposal_id, stage=stage)
+                self.stage_durations["summary"] = time.perf_counter() - started
+        finally:
+            await summarizer.cancel()
         
-        # Simulate voting
-        votes = await self.simulate_voting(proposal_id, proposal, members, debate_summary, db_crud)
+        # Simulate voting; only a run resumed within this stage can have stored votes to keep
+        started = time.perf_counter()
+        voted_member_ids = []
+        if resumed_stage == SimulationStage.VOTING:
+            voted_member_ids = await db_crud.get_voted_member_ids(proposal_id)
+        with usage_stage("voting"):
+            vote_summary = await self.simulate_voting(
+                proposal_id, proposal, members, debate["summary"], db_crud, voted_member_ids
+            )
+        await db_crud.save_checkpoint(proposal_id, stage=SimulationStage.COMPLETED)
+        self.stage_durations["voting"] = time.perf_counter() - started
         
         return {
             "proposal": proposal,
             "debate": debate,
             "debate_entries": debate_entries,
-            "votes": votes
+            "vote_summary": vote_summary
         }
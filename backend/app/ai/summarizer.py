@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any, AsyncContextManager, Callable, Dict, List, Tuple
+
+from app.ai.agents import ParliamentaryAgent
+from app.ai.usage import usage_stage
+from app.config import settings
+
+class DebateSummarizer:
+    """
+    Map-reduce summary of a debate, built up while the debate is being held
+
+    Speeches are grouped per party. Every `chunk_size` speeches of a party are summarized as
+    soon as they are in, concurrently with the rest of the debate. `finish` summarizes the
+    remaining speeches and merges the partial summaries, `fan_in` at a time, into the final
+    summary. Every request so sees a bounded prompt, and the debate's length mostly adds
+    requests that run while it is still going.
+
+    Debates of at most `direct_max_entries` speeches are summarized in one request as before.
+    The summary's requests count towards the "summary" stage of the token usage, also while
+    the debate is still going.
+    """
+    def __init__(self, agent: ParliamentaryAgent, slot: Callable[[], AsyncContextManager],
+                 chunk_size: int = None, fan_in: int = None, direct_max_entries: int = None,
+                 max_tokens: int = None):
+        self.agent = agent
+        # Called for a context manager holding an LLM request slot
+        self.slot = slot
+        self.chunk_size = max(1, chunk_size or settings.SUMMARY_CHUNK_SIZE)
+        self.fan_in = max(2, fan_in or settings.SUMMARY_FAN_IN)
+        self.direct_max_entries = (settings.SUMMARY_DIRECT_MAX_ENTRIES if direct_max_entries is None
+                                   else direct_max_entries)
+        # Length of the final summary, in tokens (SUMMARY_MAX_TOKENS)
+        self.max_tokens = max_tokens or settings.SUMMARY_MAX_TOKENS
+        self.entries: List[Dict[str, Any]] = []
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._parts: List[asyncio.Future] = []
+
+    async def _summarize_part(self, party: str, entries: List[Dict[str, Any]]) -> Tuple[str, str]:
+        label = f"{party} members ({', '.join(entry['member']['name'] for entry in entries)})"
+        with usage_stage("summary"):
+            async with self.slot():
+                summary = await self.agent.summarize_debate_part(entries, label)
+        return party, summary
+
+    async def _merge(self, summaries: List[Tuple[str, str]], final: bool) -> Tuple[str, str]:
+        with usage_stage("summary"):
+            async with self.slot():
+                summary = await self.agent.merge_debate_summaries(summaries, final, self.max_tokens)
+        return ", ".join(dict.fromkeys(label for label, _ in summaries)), summary
+
+    def _dispatch(self, party: str, final: bool = False):
+        pending = self._pending.get(party, [])
+        while len(pending) >= self.chunk_size or (final and pending):
+            chunk, pending[:] = pending[:self.chunk_size], pending[self.chunk_size:]
+            self._parts.append(asyncio.ensure_future(self._summarize_part(party, chunk)))
+
+    def add(self, entry: Dict[str, Any]):
+        """
+        Take in a speech; full chunks are summarized in the background
+        """
+        self.entries.append(entry)
+        self._pending.setdefault(entry["member"]["party"]["abbreviation"], []).append(entry)
+        # Short debates are summarized in one piece, so nothing is started before that is ruled out
+        if len(self.entries) > self.direct_max_entries:
+            for party in list(self._pending):
+                self._dispatch(party)
+
+    async def finish(self) -> str:
+        """
+        The summary of every speech added so far
+        """
+        if len(self.entries) <= self.direct_max_entries:
+            with usage_stage("summary"):
+                async with self.slot():
+                    return await self.agent.generate_debate_summary(self.entries, self.max_tokens)
+
+        for party in list(self._pending):
+            self._dispatch(party, final=True)
+        summaries = list(await asyncio.gather(*self._parts))
+        self._parts = []
+
+        # Merge level by level until one request can take the remaining summaries
+        while len(summaries) > self.fan_in:
+            summaries = list(await asyncio.gather(*[
+                self._merge(summaries[i:i + self.fan_in], final=False)
+                for i in range(0, len(summaries), self.fan_in)
+            ]))
+        _, summary = await self._merge(summaries, final=True)
+        return summary
+
+    async def cancel(self):
+        """
+        Stop partial summaries still running, e.g. when the debate failed, and wait for them
+
+        Their errors are dropped; the debate's own error is the one that matters.
+        """
+        parts, self._parts = self._parts, []
+        for part in parts:
+            part.cancel()
+        await asyncio.gather(*parts, return_exceptions=True)
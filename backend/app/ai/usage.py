@@ -0,0 +1,104 @@
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about four characters per token), for responses without usage figures
+    """
+    return max(1, math.ceil(len(text) / 4))
+
+class TokenUsage:
+    """
+    Tokens of the LLM requests made within a `track_usage` block
+
+    `prefix_tokens` is the part of the prompt tokens in the prompts' shared prefixes (see
+    app.ai.prompts.Prompt), which a provider with prefix caching can serve from its cache;
+    `cached_tokens` is what the provider reports it did serve from cache. Requests made within
+    a `usage_stage` block are also added up per stage in `stages`.
+    """
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.prefix_tokens = 0
+        self.stages: Dict[str, "TokenUsage"] = {}
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0, prefix_tokens: int = 0,
+            stage: Optional[str] = None):
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_tokens += cached_tokens
+        self.prefix_tokens += prefix_tokens
+        if stage is not None:
+            self.stages.setdefault(stage, TokenUsage()).add(prompt_tokens, completion_tokens, cached_tokens, prefix_tokens)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cached_tokens": self.cached_tokens,
+            "prefix_tokens": self.prefix_tokens,
+        }
+
+# Usage of the enclosing `track_usage` blocks and the current stage; asyncio tasks inherit them when created
+_active: ContextVar[Tuple[TokenUsage, ...]] = ContextVar("active_token_usage", default=())
+_stage: ContextVar[Optional[str]] = ContextVar("token_usage_stage", default=None)
+
+@contextmanager
+def track_usage() -> Iterator[TokenUsage]:
+    """
+    Add up the tokens of the LLM requests made by this task (and tasks it starts) inside the block
+
+    Blocks nest, so a whole run and each of its stages can be tracked at once.
+    """
+    usage = TokenUsage()
+    token = _active.set(_active.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _active.reset(token)
+
+@contextmanager
+def usage_stage(stage: str) -> Iterator[None]:
+    """
+    Count the LLM requests made by this task (and tasks it starts) inside the block towards `stage`
+    """
+    token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+def parse_usage(data: Optional[Dict[str, Any]]) -> Optional[Tuple[int, int, int]]:
+    """
+    Prompt, completion and cached prompt tokens from a response's `usage` object, if it has one
+    """
+    if not data or "prompt_tokens" not in data:
+        return None
+    details = data.get("prompt_tokens_details") or {}
+    cached = details.get("cached_tokens") or data.get("prompt_cache_hit_tokens") or 0
+    return data["prompt_tokens"], data.get("completion_tokens") or 0, cached
+
+def record_usage(prompt: str, content: str, usage: Optional[Dict[str, Any]], total: TokenUsage = None):
+    """
+    Count a completed request in the active `track_usage` blocks (and `total`)
+
+    Without usage figures in the response, the tokens are estimated from the text.
+    """
+    parsed = parse_usage(usage)
+    prompt_tokens, completion_tokens, cached_tokens = parsed or (estimate_tokens(prompt), estimate_tokens(content), 0)
+    prefix = getattr(prompt, "prefix", "")
+    prefix_tokens = round(prompt_tokens * len(prefix) / len(prompt)) if prompt else 0
+    stage = _stage.get()
+    for tracked in _active.get() + ((total,) if total is not None else ()):
+        tracked.add(prompt_tokens, completion_tokens, cached_tokens, prefix_tokens, stage)
@@ -1,68 +1,72 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
+from app.crud import loaders
 from app.database import get_db
+from app.dependencies import cursor_after, with_next_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Member])
-def read_members(
+async def read_members(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     party_id: int = None,
-    db: Session = Depends(get_db)
+    after: Optional[int] = Depends(cursor_after),
+    db: AsyncSession = Depends(get_db)
 ):
     if party_id:
-        members = crud.get_members_by_party(db, party_id=party_id, skip=skip, limit=limit)
+        members = await crud.get_members_by_party(db, party_id=party_id, skip=skip, limit=limit, after=after)
     else:
-        members = crud.get_members(db, skip=skip, limit=limit)
-    return members
+        members = await crud.get_members(db, skip=skip, limit=limit, after=after)
+    return with_next_cursor(response, members)
 
 @router.post("/", response_model=schemas.Member)
-def create_member(
+async def create_member(
     member: schemas.MemberCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if party exists
-    party = crud.get_party(db, party_id=member.party_id)
+    party = await crud.get_party(db, party_id=member.party_id)
     if not party:
         raise HTTPException(status_code=404, detail="Party not found")
-    return crud.create_member(db=db, member=member)
+    return await crud.create_member(db=db, member=member)
 
 @router.get("/{member_id}", response_model=schemas.MemberWithParty)
-def read_member(
+async def read_member(
     member_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_member = crud.get_member(db, member_id=member_id)
+    db_member = await crud.get_member(db, member_id=member_id, load=loaders.MEMBER_WITH_PARTY)
     if db_member is None:
         raise HTTPException(status_code=404, detail="Member not found")
     return db_member
 
 @router.put("/{member_id}", response_model=schemas.Member)
-def update_member(
+async def update_member(
     member_id: int,
     member_data: schemas.MemberCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if party exists
-    party = crud.get_party(db, party_id=member_data.party_id)
+    party = await crud.get_party(db, party_id=member_data.party_id)
     if not party:
         raise HTTPException(status_code=404, detail="Party not found")
         
-    db_member = crud.update_member(db, member_id=member_id, member_data=member_data)
+    db_member = await crud.update_member(db, member_id=member_id, member_data=member_data)
     if db_member is None:
         raise HTTPException(status_code=404, detail="Member not found")
     return db_member
 
 @router.delete("/{member_id}")
-def delete_member(
+async def delete_member(
     member_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    success = crud.delete_member(db, member_id=member_id)
+    success = await crud.delete_member(db, member_id=member_id)
     if not success:
         raise HTTPException(status_code=404, detail="Member not found")
     return {"detail": "Member successfully deleted"}
@@ -1,58 +1,62 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
+from app.crud import loaders
 from app.database import get_db
+from app.dependencies import cursor_after, with_next_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Party])
-def read_parties(
+async def read_parties(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    after: Optional[int] = Depends(cursor_after),
+    db: AsyncSession = Depends(get_db)
 ):
-    parties = crud.get_parties(db, skip=skip, limit=limit)
-    return parties
+    parties = await crud.get_parties(db, skip=skip, limit=limit, after=after)
+    return with_next_cursor(response, parties)
 
 @router.post("/", response_model=schemas.Party)
-def create_party(
+async def create_party(
     party: schemas.PartyCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_party = crud.get_party_by_name(db, name=party.name)
+    db_party = await crud.get_party_by_name(db, name=party.name)
     if db_party:
         raise HTTPException(status_code=400, detail="Party with this name already exists")
-    return crud.create_party(db=db, party=party)
+    return await crud.create_party(db=db, party=party)
 
 @router.get("/{party_id}", response_model=schemas.PartyWithMembers)
-def read_party(
+async def read_party(
     party_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_party = crud.get_party(db, party_id=party_id)
+    db_party = await crud.get_party(db, party_id=party_id, load=loaders.PARTY_WITH_MEMBERS)
     if db_party is None:
         raise HTTPException(status_code=404, detail="Party not found")
     return db_party
 
 @router.put("/{party_id}", response_model=schemas.Party)
-def update_party(
+async def update_party(
     party_id: int,
     party_data: schemas.PartyCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_party = crud.update_party(db, party_id=party_id, party_data=party_data)
+    db_party = await crud.update_party(db, party_id=party_id, party_data=party_data)
     if db_party is None:
         raise HTTPException(status_code=404, detail="Party not found")
     return db_party
 
 @router.delete("/{party_id}")
-def delete_party(
+async def delete_party(
     party_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    success = crud.delete_party(db, party_id=party_id)
+    success = await crud.delete_party(db, party_id=party_id)
     if not success:
         raise HTTPException(status_code=404, detail="Party not found")
     return {"detail": "Party successfully deleted"}
@@ -1,53 +1,68 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
+from app.crud import loaders
 from app.models.proposal import ProposalStatus
 from app.database import get_db
+from app.dependencies import cursor_after, with_next_cursor
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Proposal])
-def read_proposals(
+@router.get("/", response_model=List[schemas.ProposalWithSummary])
+async def read_proposals(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     status: Optional[ProposalStatus] = None,
-    db: Session = Depends(get_db)
+    after: Optional[int] = Depends(cursor_after),
+    db: AsyncSession = Depends(get_db)
 ):
-    proposals = crud.get_proposals(db, skip=skip, limit=limit, status=status)
-    return proposals
+    proposals = with_next_cursor(
+        response, await crud.get_proposals(db, skip=skip, limit=limit, status=status, after=after)
+    )
+    
+    # Fetch the vote summaries of the whole page in one query
+    summaries = await crud.get_vote_summaries(db, proposal_ids=[proposal.id for proposal in proposals])
+    return [
+        schemas.ProposalWithSummary(
+            **schemas.Proposal.from_orm(proposal).dict(),
+            votes_summary=summaries.get(proposal.id)
+        )
+        for proposal in proposals
+    ]
 
 @router.post("/", response_model=schemas.Proposal)
-def create_proposal(
+async def create_proposal(
     proposal: schemas.ProposalCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if member exists
-    member = crud.get_member(db, member_id=proposal.proposer_id)
+    member = await crud.get_member(db, member_id=proposal.proposer_id)
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
-    return crud.create_proposal(db=db, proposal=proposal)
+    return await crud.create_proposal(db=db, proposal=proposal)
 
 @router.get("/{proposal_id}", response_model=schemas.ProposalDetail)
-def read_proposal(
+async def read_proposal(
     proposal_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_proposal = crud.get_proposal(db, proposal_id=proposal_id)
+    # The proposer and their party come with the proposal in one query; with the vote tally (and,
+    # for proposals without one, the vote counts) this takes at most 3 queries
+    db_proposal = await crud.get_proposal(db, proposal_id=proposal_id, load=loaders.PROPOSAL_WITH_PROPOSER)
     if db_proposal is None:
         raise HTTPException(status_code=404, detail="Proposal not found")
-    
-    # Get the proposer details
-    proposer = crud.get_member(db, member_id=db_proposal.proposer_id)
+    proposer = db_proposal.proposer
     
     # Get vote summary if in voting or later state
     votes_summary = None
     if db_proposal.status in [ProposalStatus.VOTING, ProposalStatus.PASSED, ProposalStatus.REJECTED]:
-        votes_summary = crud.get_vote_summary(db, proposal_id=proposal_id)
+        votes_summary = await crud.get_vote_summary(db, proposal_id=proposal_id)
         
     result = schemas.ProposalDetail(
-        **db_proposal.__dict__,
+        **schemas.Proposal.from_orm(db_proposal).dict(),
         proposer={
             "id": proposer.id,
             "name": proposer.name,
@@ -63,12 +78,12 @@ def read_proposal(
     return result
 
 @router.put("/{proposal_id}/status", response_model=schemas.Proposal)
-def update_proposal_status(
+async def update_proposal_status(
     proposal_id: int,
     status: ProposalStatus,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_proposal = crud.update_proposal_status(db, proposal_id=proposal_id, status=status)
+    db_proposal = await crud.update_proposal_status(db, proposal_id=proposal_id, status=status)
     if db_proposal is None:
         raise HTTPException(status_code=404, detail="Proposal not found")
     
@@ -79,20 +94,20 @@ def update_proposal_status(
     
     # When setting to a different status, perform appropriate actions
     if db_proposal.status == ProposalStatus.VOTING:
-        vote_summary = crud.get_vote_summary(db, proposal_id=proposal_id)
+        vote_summary = await crud.get_vote_summary(db, proposal_id=proposal_id)
         if vote_summary.passed:
-            db_proposal = crud.update_proposal_status(db, proposal_id=proposal_id, status=ProposalStatus.PASSED)
+            db_proposal = await crud.update_proposal_status(db, proposal_id=proposal_id, status=ProposalStatus.PASSED)
         else:
-            db_proposal = crud.update_proposal_status(db, proposal_id=proposal_id, status=ProposalStatus.REJECTED)
+            db_proposal = await crud.update_proposal_status(db, proposal_id=proposal_id, status=ProposalStatus.REJECTED)
     
     return db_proposal
 
 @router.delete("/{proposal_id}")
-def delete_proposal(
+async def delete_proposal(
     proposal_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    success = crud.delete_proposal(db, proposal_id=proposal_id)
+    success = await crud.delete_proposal(db, proposal_id=proposal_id)
     if not success:
         raise HTTPException(status_code=404, detail="Proposal not found")
     return {"detail": "Proposal successfully deleted"}
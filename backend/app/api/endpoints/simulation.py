@@ -1,9 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
-from app.database import get_db
-from app.ai.simulation import ParliamentSimulation
+from app.config import settings
+from app.database import SessionLocal, get_db
+from app.dependencies import cursor_after, with_next_cursor
+from app.ai.client import get_default_client
+from app.ai.monte_carlo import MONTE_CARLO_METHODS, MonteCarloEstimator, decode_tallies
+from app.ai.rate_limit import get_default_scheduler
+from app.ai.simulation import VOTING_MODES
+from app.events import format_sse, get_broker
+from app.models.job import JobStatus
 from app.models.proposal import ProposalStatus
 
 router = APIRouter()
@@ -11,11 +22,13 @@ router = APIRouter()
 @router.post("/{proposal_id}/start")
 async def start_simulation(
     proposal_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    fresh: bool = False,
+    voting_mode: Optional[str] = None,
+    token_budget: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if proposal exists
-    proposal = crud.get_proposal(db, proposal_id=proposal_id)
+    proposal = await crud.get_proposal(db, proposal_id=proposal_id)
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     
@@ -26,47 +39,366 @@ async def start_simulation(
             detail=f"Simulation can only start for proposals in draft or submitted status, not {proposal.status}"
         )
     
-    # Start simulation in the background
-    simulation = ParliamentSimulation()
-    background_tasks.add_task(
-        simulation.run_full_simulation,
-        proposal_id=proposal_id,
-        db_crud=crud  # Pass the CRUD functions for database operations
-    )
+    if voting_mode is not None and voting_mode not in VOTING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown voting mode {voting_mode}, expected one of {', '.join(VOTING_MODES)}"
+        )
+    
+    if token_budget is not None and token_budget < 0:
+        raise HTTPException(status_code=400, detail="token_budget must be 0 (unlimited) or more")
+    
+    if await crud.get_active_job(db, proposal_id=proposal_id):
+        raise HTTPException(status_code=400, detail="A simulation is already queued or running for this proposal")
+    
+    # Queue the simulation for a worker; `fresh` bypasses the LLM response cache, and
+    # `token_budget` overrides SIMULATION_TOKEN_BUDGET
+    job = await crud.create_job(db, proposal_id=proposal_id, options={
+        "fresh": fresh, "voting_mode": voting_mode, "token_budget": token_budget
+    })
     
     # Update proposal status to submitted if it was in draft
     if proposal.status == ProposalStatus.DRAFT:
-        crud.update_proposal_status(db, proposal_id=proposal_id, status=ProposalStatus.SUBMITTED)
+        await crud.update_proposal_status(db, proposal_id=proposal_id, status=ProposalStatus.SUBMITTED)
     
-    return {"detail": "Simulation started successfully"}
+    return {"detail": "Simulation queued successfully", "job_id": job.id}
+
+@router.post("/{proposal_id}/monte-carlo")
+async def start_monte_carlo(
+    proposal_id: int,
+    rounds: int = 1000,
+    method: str = "local",
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Estimate a proposal's pass probability from `rounds` sampled vote rounds
+
+    The local ideology model is sampled right away; LLM-sampled ("batch") rounds vote on the
+    latest debate summary and are queued as a job.
+    """
+    proposal = await crud.get_proposal(db, proposal_id=proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    
+    if method not in MONTE_CARLO_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown Monte Carlo method {method}, expected one of {', '.join(MONTE_CARLO_METHODS)}"
+        )
+    if not 1 <= rounds <= settings.MONTE_CARLO_MAX_ROUNDS:
+        raise HTTPException(status_code=400, detail=f"rounds must be between 1 and {settings.MONTE_CARLO_MAX_ROUNDS}")
+    
+    if method == "local":
+        estimator = MonteCarloEstimator(scheduler=get_default_scheduler())
+        try:
+            db_run = await estimator.run(proposal_id, crud.SimulationStore(db), rounds, method)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"detail": "Monte Carlo estimate completed", "run": schemas.MonteCarloRun.from_orm(db_run)}
+    
+    if await crud.get_latest_summarized_debate(db, proposal_id=proposal_id) is None:
+        raise HTTPException(status_code=400, detail="Simulate the proposal first; LLM rounds vote on its debate summary")
+    if await crud.get_active_job(db, proposal_id=proposal_id):
+        raise HTTPException(status_code=400, detail="A simulation is already queued or running for this proposal")
+    
+    job = await crud.create_job(db, proposal_id=proposal_id, options={"monte_carlo": {"rounds": rounds, "method": method}})
+    return {"detail": "Monte Carlo estimate queued successfully", "job_id": job.id}
+
+@router.get("/{proposal_id}/monte-carlo", response_model=List[schemas.MonteCarloRun])
+async def read_monte_carlo_runs(
+    proposal_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    after: Optional[int] = Depends(cursor_after),
+    db: AsyncSession = Depends(get_db)
+):
+    runs = await crud.get_monte_carlo_runs_by_proposal(
+        db, proposal_id=proposal_id, skip=skip, limit=limit, after=after
+    )
+    return with_next_cursor(response, runs)
+
+@router.get("/monte-carlo/{run_id}", response_model=schemas.MonteCarloRunDetail)
+async def read_monte_carlo_run(
+    run_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    db_run = await crud.get_monte_carlo_run(db, run_id=run_id)
+    if db_run is None:
+        raise HTTPException(status_code=404, detail="Monte Carlo run not found")
+    return {
+        **schemas.MonteCarloRun.from_orm(db_run).dict(),
+        "round_tallies": decode_tallies(db_run.tallies).tolist()
+    }
 
 @router.get("/{proposal_id}/status")
-def get_simulation_status(
+async def get_simulation_status(
     proposal_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if proposal exists
-    proposal = crud.get_proposal(db, proposal_id=proposal_id)
+    proposal = await crud.get_proposal(db, proposal_id=proposal_id)
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     
     # Get debate info if exists
-    debates = crud.get_debates_by_proposal(db, proposal_id=proposal_id)
+    debates = await crud.get_debates_by_proposal(db, proposal_id=proposal_id)
     
-    # Get votes info if exists
-    votes = crud.get_votes_by_proposal(db, proposal_id=proposal_id) if proposal.status in [
-        ProposalStatus.VOTING, ProposalStatus.PASSED, ProposalStatus.REJECTED
-    ] else []
-    
-    # Get vote summary if in voting or later state
+    # Get vote summary if in voting or later state; it is read from the maintained tally
     vote_summary = None
     if proposal.status in [ProposalStatus.VOTING, ProposalStatus.PASSED, ProposalStatus.REJECTED]:
-        vote_summary = crud.get_vote_summary(db, proposal_id=proposal_id)
+        vote_summary = await crud.get_vote_summary(db, proposal_id=proposal_id)
+    
+    # Latest simulation job for the proposal, if any
+    jobs = await crud.get_jobs_by_proposal(db, proposal_id=proposal_id)
     
     return {
         "proposal_id": proposal_id,
         "status": proposal.status,
+        "job": schemas.SimulationJob.from_orm(jobs[0]) if jobs else None,
         "debates_count": len(debates),
-        "votes_count": len(votes),
+        "votes_count": vote_summary.total if vote_summary else 0,
         "vote_summary": vote_summary.dict() if vote_summary else None
     }
+
+@router.get("/{proposal_id}/usage", response_model=schemas.ProposalTokenUsage)
+async def get_simulation_usage(
+    proposal_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    LLM tokens spent on a proposal, per debate and stage (debate, summary, voting, monte_carlo)
+    """
+    proposal = await crud.get_proposal(db, proposal_id=proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    
+    stages = [
+        {**row, "total_tokens": row["prompt_tokens"] + row["completion_tokens"]}
+        for row in await crud.get_token_usage_by_proposal(db, proposal_id=proposal_id)
+    ]
+    total = {key: sum(stage[key] for stage in stages) for key in schemas.TokenCounts.__fields__}
+    return {"proposal_id": proposal_id, "total": total, "stages": stages}
+
+async def _simulation_events(proposal_id: int):
+    """
+    Stream a proposal's simulation events until its job finishes or fails for good
+    """
+    async with get_broker().subscribe(proposal_id) as queue:
+        # Read the current state only once subscribed, so nothing published in between is missed
+        async with SessionLocal() as db:
+            proposal = await crud.get_proposal(db, proposal_id=proposal_id)
+            job = await crud.get_active_job(db, proposal_id=proposal_id)
+        yield format_sse("status", {
+            "status": proposal.status,
+            "job": schemas.SimulationJob.from_orm(job).dict() if job else None
+        })
+        if job is None:
+            return
+        
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.EVENT_KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            
+            yield format_sse(event["type"], event["data"])
+            if event["type"] == "job" and event["data"]["status"] in [JobStatus.SUCCEEDED, JobStatus.FAILED]:
+                return
+
+@router.get("/{proposal_id}/events")
+async def stream_simulation_events(
+    proposal_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Server-sent events of a running simulation: debate entries, the summary, votes,
+    progress and the outcome, as they are produced
+    """
+    proposal = await crud.get_proposal(db, proposal_id=proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    
+    return StreamingResponse(
+        _simulation_events(proposal_id),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    cache = get_default_client().cache
+    if cache is None:
+        return {"backend": None}
+    return cache.stats()
+
+@router.get("/llm-client")
+async def get_llm_client_metrics():
+    """
+    Adaptive concurrency, throttling and retry figures of this process's LLM client
+    """
+    return {**get_default_client().metrics(), "scheduler": get_default_scheduler().stats()}
+
+@router.get("/{proposal_id}/jobs", response_model=List[schemas.SimulationJob])
+async def read_simulation_jobs(
+    proposal_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    after: Optional[int] = Depends(cursor_after),
+    db: AsyncSession = Depends(get_db)
+):
+    jobs = await crud.get_jobs_by_proposal(db, proposal_id=proposal_id, skip=skip, limit=limit, after=after)
+    return with_next_cursor(response, jobs)
+
+@router.get("/jobs/{job_id}", response_model=schemas.SimulationJob)
+async def read_simulation_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    db_job = await crud.get_job(db, job_id=job_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_job
+
+@router.post("/jobs/{job_id}/retry", response_model=schemas.SimulationJob)
+async def retry_simulation_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    db_job = await crud.get_job(db, job_id=job_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if db_job.status != JobStatus.FAILED:
+        raise HTTPException(status_code=400, detail=f"Only failed jobs can be retried, not {db_job.status}")
+    return await crud.retry_job(db, job_id=job_id)
+
+@router.post("/batch", response_model=schemas.SimulationBatchCreated)
+async def start_simulation_batch(
+    batch: schemas.SimulationBatchCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue simulations for many proposals at once, given by id or by status
+
+    Workers share one LLM scheduler between the jobs they run, so the batch's requests
+    are spread over the provider's rate limit across proposals.
+    """
+    if batch.voting_mode is not None and batch.voting_mode not in VOTING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown voting mode {batch.voting_mode}, expected one of {', '.join(VOTING_MODES)}"
+        )
+    if batch.token_budget is not None and batch.token_budget < 0:
+        raise HTTPException(status_code=400, detail="token_budget must be 0 (unlimited) or more")
+    
+    startable = [ProposalStatus.DRAFT, ProposalStatus.SUBMITTED]
+    skipped = []
+    if batch.proposal_ids is not None:
+        proposals = await crud.get_proposals_by_ids(db, batch.proposal_ids)
+        found = {proposal.id for proposal in proposals}
+        skipped += [
+            {"proposal_id": proposal_id, "reason": "not found"}
+            for proposal_id in dict.fromkeys(batch.proposal_ids) if proposal_id not in found
+        ]
+        skipped += [
+            {"proposal_id": proposal.id, "reason": f"status is {proposal.status.value}"}
+            for proposal in proposals if proposal.status not in startable
+        ]
+        proposals = [proposal for proposal in proposals if proposal.status in startable][:batch.limit]
+    else:
+        if batch.status is not None and batch.status not in startable:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Simulation can only start for proposals in draft or submitted status, not {batch.status}"
+            )
+        statuses = [batch.status] if batch.status is not None else startable
+        proposals = await crud.get_proposals_by_statuses(db, statuses, limit=batch.limit)
+    
+    proposal_ids = [proposal.id for proposal in proposals]
+    active = set(await crud.get_active_job_proposal_ids(db, proposal_ids)) if proposal_ids else set()
+    skipped += [
+        {"proposal_id": proposal_id, "reason": "a simulation is already queued or running"}
+        for proposal_id in proposal_ids if proposal_id in active
+    ]
+    queued = [proposal_id for proposal_id in proposal_ids if proposal_id not in active]
+    if not queued:
+        raise HTTPException(status_code=400, detail="No proposals to simulate")
+    
+    db_batch = await crud.create_batch(
+        db,
+        proposal_ids=queued,
+        options={"fresh": batch.fresh, "voting_mode": batch.voting_mode, "token_budget": batch.token_budget},
+        name=batch.name
+    )
+    return {"batch": db_batch, "queued": queued, "skipped": skipped}
+
+@router.get("/batches", response_model=List[schemas.SimulationBatch])
+async def read_simulation_batches(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = Depends(cursor_after),
+    db: AsyncSession = Depends(get_db)
+):
+    batches = await crud.get_batches(db, skip=skip, limit=limit, after=after)
+    return with_next_cursor(response, batches)
+
+def _batch_throughput(jobs) -> dict:
+    """
+    Aggregate throughput of a batch's jobs, from the first start to the last finish (or now)
+    """
+    llm_calls = sum(job.llm_calls or 0 for job in jobs)
+    started = [job.started_at for job in jobs if job.started_at]
+    if not started:
+        return {"llm_calls": llm_calls, "elapsed_seconds": 0.0, "llm_calls_per_second": 0.0, "proposals_per_minute": 0.0}
+    
+    finished = [job.finished_at for job in jobs if job.finished_at]
+    done = all(job.status in [JobStatus.SUCCEEDED, JobStatus.FAILED] for job in jobs)
+    end = max(finished) if done and finished else datetime.utcnow()
+    elapsed = max((end - min(started)).total_seconds(), 0.0)
+    succeeded = sum(1 for job in jobs if job.status == JobStatus.SUCCEEDED)
+    return {
+        "llm_calls": llm_calls,
+        "elapsed_seconds": elapsed,
+        "llm_calls_per_second": llm_calls / elapsed if elapsed else 0.0,
+        "proposals_per_minute": succeeded * 60 / elapsed if elapsed else 0.0
+    }
+
+@router.get("/batches/{batch_id}", response_model=schemas.SimulationBatchReport)
+async def read_simulation_batch(
+    batch_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Progress of a batch: job counts, aggregate throughput and each proposal's outcome
+    """
+    db_batch = await crud.get_batch(db, batch_id=batch_id)
+    if db_batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    jobs = await crud.get_batch_jobs(db, batch_id=batch_id)
+    summaries = await crud.get_vote_summaries(db, [job.proposal_id for job in jobs])
+    
+    jobs_by_status = {}
+    for job in jobs:
+        jobs_by_status[job.status.value] = jobs_by_status.get(job.status.value, 0) + 1
+    
+    return {
+        **schemas.SimulationBatch.from_orm(db_batch).dict(),
+        "jobs_by_status": jobs_by_status,
+        "throughput": _batch_throughput(jobs),
+        "proposals": [
+            {
+                "proposal_id": job.proposal_id,
+                "title": job.proposal.title,
+                "status": job.proposal.status,
+                "job": job,
+                # Only votes of a finished run belong to this batch
+                "vote_summary": summaries.get(job.proposal_id) if job.status == JobStatus.SUCCEEDED else None
+            }
+            for job in jobs
+        ]
+    }
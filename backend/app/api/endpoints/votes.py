@@ -1,52 +1,57 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
 from app.models.vote import VoteType
 from app.database import get_db
+from app.dependencies import cursor_after, with_next_cursor
 
 router = APIRouter()
 
 @router.get("/by-proposal/{proposal_id}", response_model=List[schemas.Vote])
-def read_votes_by_proposal(
+async def read_votes_by_proposal(
     proposal_id: int, 
-    db: Session = Depends(get_db)
+    response: Response,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    after: Optional[int] = Depends(cursor_after),
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if proposal exists
-    proposal = crud.get_proposal(db, proposal_id=proposal_id)
+    proposal = await crud.get_proposal(db, proposal_id=proposal_id)
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     
-    votes = crud.get_votes_by_proposal(db, proposal_id=proposal_id)
-    return votes
+    votes = await crud.get_votes_by_proposal(db, proposal_id=proposal_id, skip=skip, limit=limit, after=after)
+    return with_next_cursor(response, votes)
 
 @router.post("/", response_model=schemas.Vote)
-def create_vote(
+async def create_vote(
     vote: schemas.VoteCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if proposal exists
-    proposal = crud.get_proposal(db, proposal_id=vote.proposal_id)
+    proposal = await crud.get_proposal(db, proposal_id=vote.proposal_id)
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     
     # Check if member exists
-    member = crud.get_member(db, member_id=vote.member_id)
+    member = await crud.get_member(db, member_id=vote.member_id)
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
     
-    return crud.create_vote(db=db, vote=vote)
+    return await crud.create_vote(db=db, vote=vote)
 
 @router.get("/summary/{proposal_id}", response_model=schemas.VoteSummary)
-def get_vote_summary(
+async def get_vote_summary(
     proposal_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if proposal exists
-    proposal = crud.get_proposal(db, proposal_id=proposal_id)
+    proposal = await crud.get_proposal(db, proposal_id=proposal_id)
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     
-    summary = crud.get_vote_summary(db, proposal_id=proposal_id)
+    summary = await crud.get_vote_summary(db, proposal_id=proposal_id)
     return summary
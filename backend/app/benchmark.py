@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import traceback
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app import crud
+from app.ai.agents import ParliamentaryAgent
+from app.ai.client import create_client
+from app.ai.fake_llm import FakeLLM, FakeLLMTransport
+from app.ai.rate_limit import AdaptiveConcurrencyLimiter, LLMScheduler
+from app.ai.simulation import VOTING_MODES, ParliamentSimulation
+from app.ai.usage import track_usage
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.db.init_db import init_db
+from app.db.query_counter import count_queries
+from app.models.member import Member
+from app.models.proposal import Proposal
+
+STAGES = ("debate", "summary", "voting")
+
+# Metrics compared against a baseline report, and whether higher values are better
+REGRESSION_METRICS = {
+    "proposals_per_minute": True,
+    "llm_calls_per_proposal": False,
+    "queries_per_proposal": False,
+    "prompt_tokens_per_proposal": False,
+}
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0}
+    return {"p50": float(np.percentile(values, 50)), "p95": float(np.percentile(values, 95))}
+
+async def run_benchmark(proposal_count: int, concurrency: int, voting_mode: str, fake: FakeLLM,
+                        requests_per_second: float, max_in_flight: int, token_budget: int = 0) -> Dict[str, Any]:
+    """
+    Simulate the first `proposal_count` proposals against a fake LLM and measure the pipeline
+
+    Up to `concurrency` proposals run at once, like jobs on a worker, sharing one client and
+    scheduler. Responses are never cached, so every request pays the fake latency. Each run
+    may spend `token_budget` tokens (0 = no limit).
+    """
+    client = create_client(
+        "fake", transport=FakeLLMTransport(fake), limiter=AdaptiveConcurrencyLimiter(max_in_flight)
+    )
+    scheduler = LLMScheduler(rate=requests_per_second, max_in_flight=max_in_flight)
+    agent = ParliamentaryAgent(client=client, use_cache=False)
+
+    async with SessionLocal() as db:
+        member_count = (await db.execute(select(func.count(Member.id)))).scalar()
+        result = await db.execute(select(Proposal.id).order_by(Proposal.id).limit(proposal_count))
+        proposal_ids = result.scalars().all()
+    if not proposal_ids:
+        raise ValueError("No proposals to simulate; seed the database first with --seed")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    runs: List[Dict[str, Any]] = []
+    failures = 0
+
+    async def simulate(proposal_id: int):
+        nonlocal failures
+        async with semaphore:
+            simulation = ParliamentSimulation(agent=agent, scheduler=scheduler, voting_mode=voting_mode,
+                                              token_budget=token_budget)
+            started = time.perf_counter()
+            try:
+                with count_queries() as queries, track_usage() as usage:
+                    async with SessionLocal() as db:
+                        await simulation.run_full_simulation(proposal_id, crud.SimulationStore(db))
+            except Exception:
+                traceback.print_exc()
+                failures += 1
+                return
+            runs.append({
+                "seconds": time.perf_counter() - started,
+                "llm_calls": simulation.llm_calls,
+                "queries": queries.count,
+                "prompt_tokens": usage.prompt_tokens,
+                "total_tokens": usage.total_tokens,
+                "prefix_tokens": usage.prefix_tokens,
+                "cached_tokens": usage.cached_tokens,
+                **simulation.stage_durations
+            })
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*[simulate(proposal_id) for proposal_id in proposal_ids])
+    finally:
+        await client.aclose()
+    elapsed = time.perf_counter() - started
+
+    completed = len(runs) or 1
+    return {
+        "proposals": len(runs),
+        "failed": failures,
+        "members": member_count,
+        "voting_mode": voting_mode,
+        "token_budget": token_budget,
+        "concurrency": concurrency,
+        "fake_latency": fake.latency,
+        "elapsed_seconds": elapsed,
+        "proposals_per_minute": len(runs) / elapsed * 60,
+        "llm_calls_per_proposal": sum(run["llm_calls"] for run in runs) / completed,
+        "queries_per_proposal": sum(run["queries"] for run in runs) / completed,
+        "prompt_tokens_per_proposal": sum(run["prompt_tokens"] for run in runs) / completed,
+        "total_tokens_per_proposal": sum(run["total_tokens"] for run in runs) / completed,
+        "max_tokens_per_proposal": max((run["total_tokens"] for run in runs), default=0),
+        "prefix_tokens_per_proposal": sum(run["prefix_tokens"] for run in runs) / completed,
+        "cached_tokens_per_proposal": sum(run["cached_tokens"] for run in runs) / completed,
+        "latency": {
+            stage: percentiles([run[stage] for run in runs if stage in run])
+            for stage in ("seconds",) + STAGES
+        },
+        "client": client.metrics(),
+    }
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{report['proposals']} proposals ({report['failed']} failed), {report['members']} members, "
+          f"voting mode {report['voting_mode']}, concurrency {report['concurrency']}, "
+          f"fake latency {report['fake_latency']}s")
+    print(f"  proposals/minute:       {report['proposals_per_minute']:.1f}")
+    print(f"  LLM calls per proposal: {report['llm_calls_per_proposal']:.1f}")
+    print(f"  DB queries per proposal: {report['queries_per_proposal']:.1f}")
+    print(f"  prompt tokens per proposal: {report['prompt_tokens_per_proposal']:.0f} "
+          f"({report['prefix_tokens_per_proposal']:.0f} in shared prefixes, "
+          f"{report['cached_tokens_per_proposal']:.0f} served from the prefix cache)")
+    print(f"  total tokens per proposal: {report['total_tokens_per_proposal']:.0f} "
+          f"(at most {report['max_tokens_per_proposal']}, budget {report['token_budget'] or 'unlimited'})")
+    for stage, values in report["latency"].items():
+        label = "total" if stage == "seconds" else stage
+        print(f"  {label:<8} p50 {values['p50']:.3f}s  p95 {values['p95']:.3f}s")
+    client = report["client"]
+    print(f"  client: {client['retries']} retries, {client['throttled']} throttled, "
+          f"{client['failures']} failures, concurrency limit {client['concurrency_limit']}")
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Metrics that got worse than the baseline by more than `tolerance` (a fraction)
+    """
+    regressions = []
+    for metric, higher_is_better in REGRESSION_METRICS.items():
+        current, previous = report[metric], baseline.get(metric)
+        if not previous:
+            continue
+        change = (current - previous) / previous
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{metric}: {previous:.2f} -> {current:.2f} ({change:+.0%})")
+    return regressions
+
+async def main(args) -> int:
+    try:
+        if args.seed:
+            await init_db(member_count=args.members, proposal_count=args.proposals)
+        fake = FakeLLM(latency=args.latency, latency_sigma=args.latency_sigma,
+                       error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+        report = await run_benchmark(args.proposals, args.concurrency, args.voting_mode, fake,
+                                     args.requests_per_second, args.max_in_flight, args.token_budget)
+    finally:
+        await engine.dispose()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the simulation pipeline against a fake LLM")
+    parser.add_argument("--seed", action="store_true", help="Migrate the database and load scaled sample data first")
+    parser.add_argument("--members", type=int, default=150, help="Members to seed")
+    parser.add_argument("--proposals", type=int, default=50, help="Proposals to seed and simulate")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY,
+                        help="Proposals simulated at once")
+    parser.add_argument("--voting-mode", choices=VOTING_MODES, default=settings.VOTING_MODE)
+    parser.add_argument("--latency", type=float, default=settings.FAKE_LLM_LATENCY,
+                        help="Mean fake LLM latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=settings.FAKE_LLM_LATENCY_SIGMA)
+    parser.add_argument("--error-rate", type=float, default=settings.FAKE_LLM_ERROR_RATE)
+    parser.add_argument("--rate-limit-rate", type=float, default=settings.FAKE_LLM_RATE_LIMIT_RATE)
+    parser.add_argument("--requests-per-second", type=float, default=1000.0,
+                        help="Scheduler rate limit; high by default so the pipeline itself is measured")
+    parser.add_argument("--max-in-flight", type=int, default=settings.LLM_MAX_IN_FLIGHT)
+    parser.add_argument("--token-budget", type=int, default=settings.SIMULATION_TOKEN_BUDGET,
+                        help="Tokens each simulation may spend (0 = no limit)")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against; exits with 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression as a fraction")
+    sys.exit(asyncio.run(main(parser.parse_args())))
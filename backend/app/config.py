@@ -11,9 +11,121 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "parliament")
     DATABASE_URL: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}/{POSTGRES_DB}"
+    # URL used by the application's async engine (asyncpg driver)
+    ASYNC_DATABASE_URL: str = os.getenv(
+        "ASYNC_DATABASE_URL", DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+    )
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
     
     # AI API
     MISTRAL_API_KEY: str = os.getenv("MISTRAL_API_KEY", "")
     MISTRAL_API_URL: str = os.getenv("MISTRAL_API_URL", "https://api.mistral.ai/v1")
 
+    # LLM provider: "mistral", "openai" (any OpenAI-compatible API) or "fake" (offline stand-in)
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "mistral")
+    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_API_URL: str = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1")
+    # Model per task; tasks without one use LLM_MODEL
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "mistral-small-latest")
+    LLM_DEBATE_MODEL: str = os.getenv("LLM_DEBATE_MODEL", "")
+    LLM_VOTE_MODEL: str = os.getenv("LLM_VOTE_MODEL", "")
+    LLM_SUMMARY_MODEL: str = os.getenv("LLM_SUMMARY_MODEL", "")
+    LLM_CLASSIFY_MODEL: str = os.getenv("LLM_CLASSIFY_MODEL", "")
+    # Fake provider: mean latency (seconds) and its log-normal spread, generation speed
+    # (0 = instant), and the share of requests failing with 503 / 429
+    FAKE_LLM_LATENCY: float = float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+    FAKE_LLM_LATENCY_SIGMA: float = float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.5"))
+    FAKE_LLM_TOKENS_PER_SECOND: float = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0"))
+    FAKE_LLM_ERROR_RATE: float = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+    FAKE_LLM_RATE_LIMIT_RATE: float = float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0"))
+    FAKE_LLM_SEED: int = int(os.getenv("FAKE_LLM_SEED", "0"))
+
+    # Simulation jobs
+    # Jobs each worker process runs at once
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    # Workers started inside the API process; set to 0 when running `python -m app.worker` separately
+    EMBEDDED_WORKERS: int = int(os.getenv("EMBEDDED_WORKERS", "1"))
+    WORKER_POLL_INTERVAL: float = float(os.getenv("WORKER_POLL_INTERVAL", "2"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    # Delay before the first retry of a failed job, doubled on every further attempt
+    JOB_RETRY_BACKOFF: float = float(os.getenv("JOB_RETRY_BACKOFF", "30"))
+    JOB_HEARTBEAT_INTERVAL: float = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))
+    # Running jobs without a heartbeat for this long are assumed dead and queued again
+    JOB_STALE_AFTER: float = float(os.getenv("JOB_STALE_AFTER", "120"))
+
+    # Simulation events ("memory" for a single process, "postgres" for separate workers)
+    EVENT_BACKEND: str = os.getenv("EVENT_BACKEND", "memory")
+    EVENT_CHANNEL: str = os.getenv("EVENT_CHANNEL", "simulation_events")
+    # Seconds between keepalive comments on an idle event stream
+    EVENT_KEEPALIVE_INTERVAL: float = float(os.getenv("EVENT_KEEPALIVE_INTERVAL", "15"))
+
+    # LLM HTTP connection pool
+    LLM_HTTP2: bool = os.getenv("LLM_HTTP2", "true").lower() == "true"
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+    LLM_CONNECT_TIMEOUT: float = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+    LLM_READ_TIMEOUT: float = float(os.getenv("LLM_READ_TIMEOUT", "30"))
+
+    # Retries of rate-limited (429), failed (5xx) and dropped LLM requests, with jittered
+    # exponential backoff between LLM_RETRY_BASE_DELAY and LLM_RETRY_MAX_DELAY seconds
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "5"))
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+    # Lower bound of the adaptive concurrency limit; the upper bound is LLM_MAX_IN_FLIGHT
+    LLM_ADAPTIVE_MIN_CONCURRENCY: int = int(os.getenv("LLM_ADAPTIVE_MIN_CONCURRENCY", "1"))
+
+    # LLM response cache ("memory", "sqlite" or "none"); a TTL of 0 never expires entries
+    LLM_CACHE_BACKEND: str = os.getenv("LLM_CACHE_BACKEND", "memory")
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", "86400"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    LLM_CACHE_MAX_BYTES: int = int(os.getenv("LLM_CACHE_MAX_BYTES", "50000000"))
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+
+    # Simulation
+    # Maximum number of LLM requests a simulation keeps in flight (1 = sequential)
+    SIMULATION_CONCURRENCY: int = int(os.getenv("SIMULATION_CONCURRENCY", "8"))
+    # Maximum number of debate speeches generated at once (1 = sequential)
+    DEBATE_CONCURRENCY: int = int(os.getenv("DEBATE_CONCURRENCY", "15"))
+    # Members who speak in a debate
+    DEBATE_MAX_SPEAKERS: int = int(os.getenv("DEBATE_MAX_SPEAKERS", "15"))
+    # Debates with more speeches than SUMMARY_DIRECT_MAX_ENTRIES are summarized map-reduce style:
+    # SUMMARY_CHUNK_SIZE speeches of a party per partial summary, SUMMARY_FAN_IN summaries per merge
+    SUMMARY_DIRECT_MAX_ENTRIES: int = int(os.getenv("SUMMARY_DIRECT_MAX_ENTRIES", "15"))
+    SUMMARY_CHUNK_SIZE: int = int(os.getenv("SUMMARY_CHUNK_SIZE", "8"))
+    SUMMARY_FAN_IN: int = int(os.getenv("SUMMARY_FAN_IN", "8"))
+    # Stream debate speeches and store the speech being given every DEBATE_FLUSH_INTERVAL seconds
+    DEBATE_STREAMING: bool = os.getenv("DEBATE_STREAMING", "true").lower() == "true"
+    DEBATE_FLUSH_INTERVAL: float = float(os.getenv("DEBATE_FLUSH_INTERVAL", "1"))
+    # How votes are generated: "member" (one request per member), "batch" (one request per batch)
+    # or "local" (one classification request, then the ideology model computes every vote)
+    VOTING_MODE: str = os.getenv("VOTING_MODE", "member")
+    # Members per batched voting request; 0 sends one request per party
+    VOTING_BATCH_SIZE: int = int(os.getenv("VOTING_BATCH_SIZE", "0"))
+    # Weighted ideology distance (0-100) within which members vote FOR / beyond which AGAINST
+    LOCAL_VOTE_FOR_THRESHOLD: float = float(os.getenv("LOCAL_VOTE_FOR_THRESHOLD", "20"))
+    LOCAL_VOTE_AGAINST_THRESHOLD: float = float(os.getenv("LOCAL_VOTE_AGAINST_THRESHOLD", "30"))
+    # Width of the soft thresholds when sampling the ideology model for Monte Carlo estimates
+    LOCAL_VOTE_NOISE: float = float(os.getenv("LOCAL_VOTE_NOISE", "5"))
+    # Largest number of vote rounds per Monte Carlo estimate
+    MONTE_CARLO_MAX_ROUNDS: int = int(os.getenv("MONTE_CARLO_MAX_ROUNDS", "10000"))
+    # Response length limits of speeches and of the debate summary, in tokens
+    DEBATE_MAX_TOKENS: int = int(os.getenv("DEBATE_MAX_TOKENS", "500"))
+    SUMMARY_MAX_TOKENS: int = int(os.getenv("SUMMARY_MAX_TOKENS", "1000"))
+    # Prompt and completion tokens a simulation run may spend (0 = no limit); to stay within it,
+    # speeches get shorter (down to BUDGET_MIN_SPEECH_TOKENS), fewer members speak (down to
+    # BUDGET_MIN_SPEAKERS) and voting falls back to cheaper modes
+    SIMULATION_TOKEN_BUDGET: int = int(os.getenv("SIMULATION_TOKEN_BUDGET", "0"))
+    BUDGET_MIN_SPEECH_TOKENS: int = int(os.getenv("BUDGET_MIN_SPEECH_TOKENS", "150"))
+    BUDGET_MIN_SPEAKERS: int = int(os.getenv("BUDGET_MIN_SPEAKERS", "3"))
+    # Votes persisted per write while voting; an interrupted run resumes after the last write
+    VOTE_CHECKPOINT_SIZE: int = int(os.getenv("VOTE_CHECKPOINT_SIZE", "25"))
+    # Sustained request rate allowed towards the LLM provider, per worker process
+    LLM_REQUESTS_PER_SECOND: float = float(os.getenv("LLM_REQUESTS_PER_SECOND", "4"))
+    # LLM requests in flight at once across all simulations of a worker process
+    LLM_MAX_IN_FLIGHT: int = int(os.getenv("LLM_MAX_IN_FLIGHT", "20"))
+
 settings = Settings()
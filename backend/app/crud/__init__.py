@@ -1,5 +1,11 @@
-from app.crud.party import get_party, get_parties, create_party, update_party, delete_party
-from app.crud.member import get_member, get_members, get_members_by_party, create_member, update_member, delete_member
-from app.crud.proposal import get_proposal, get_proposals, create_proposal, update_proposal, update_proposal_status, delete_proposal
-from app.crud.debate import get_debate, get_debates, get_debates_by_proposal, create_debate, get_debate_entry, get_debate_entries, create_debate_entry
-from app.crud.vote import get_vote, get_votes_by_proposal, create_vote, get_vote_summary
+from app.crud.party import get_party, get_party_by_name, get_parties, create_party, update_party, delete_party
+from app.crud.member import get_member, get_members, get_all_members, get_members_by_party, create_member, update_member, delete_member
+from app.crud.proposal import get_proposal, get_proposals, get_proposals_by_ids, get_proposals_by_statuses, create_proposal, update_proposal, update_proposal_status, delete_proposal
+from app.crud.debate import get_debate, get_debates, get_debates_by_proposal, create_debate, get_debate_entry, get_debate_entries, get_all_debate_entries, update_debate_summary, get_latest_summarized_debate, create_debate_entry, update_debate_entry, delete_debate_entry
+from app.crud.vote import get_vote, get_votes_by_proposal, get_voted_member_ids, create_vote, create_votes_bulk, delete_votes_by_proposal, get_vote_summary, get_vote_summaries
+from app.crud.job import get_job, get_jobs_by_proposal, get_active_job, get_active_job_proposal_ids, create_job, claim_job, update_job_progress, heartbeat_jobs, complete_job, fail_job, retry_job, requeue_stale_jobs
+from app.crud.batch import get_batch, get_batches, get_batch_jobs, create_batch
+from app.crud.monte_carlo import get_monte_carlo_run, get_monte_carlo_runs_by_proposal, create_monte_carlo_run
+from app.crud.checkpoint import get_checkpoint, save_checkpoint
+from app.crud.usage import create_token_usage, get_token_usage_by_proposal, get_debate_token_total
+from app.crud.simulation_store import SimulationStore
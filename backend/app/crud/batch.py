@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.config import settings
+from app.crud.pagination import Page, paginate
+from app.models.batch import SimulationBatch
+from app.models.job import SimulationJob
+from app.models.proposal import Proposal, ProposalStatus
+
+async def get_batch(db: AsyncSession, batch_id: int):
+    return await db.get(SimulationBatch, batch_id)
+
+async def get_batches(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> Page:
+    return await paginate(db, select(SimulationBatch), SimulationBatch.id, skip=skip, limit=limit, after=after,
+                          descending=True)
+
+async def get_batch_jobs(db: AsyncSession, batch_id: int):
+    result = await db.execute(
+        select(SimulationJob).options(joinedload(SimulationJob.proposal)).filter(
+            SimulationJob.batch_id == batch_id
+        ).order_by(SimulationJob.id)
+    )
+    return result.scalars().all()
+
+async def create_batch(db: AsyncSession, proposal_ids: List[int], options: Optional[Dict[str, Any]] = None,
+                       name: Optional[str] = None):
+    """
+    Queue one simulation job per proposal under a new batch, in a single transaction
+    """
+    db_batch = SimulationBatch(name=name, options=options or {})
+    db.add(db_batch)
+    await db.flush()
+    
+    db.add_all([
+        SimulationJob(
+            proposal_id=proposal_id,
+            batch_id=db_batch.id,
+            options=options or {},
+            max_attempts=settings.JOB_MAX_ATTEMPTS
+        )
+        for proposal_id in proposal_ids
+    ])
+    # Queued draft proposals count as submitted, as with single simulations
+    await db.execute(
+        update(Proposal).where(
+            Proposal.id.in_(proposal_ids),
+            Proposal.status == ProposalStatus.DRAFT
+        ).values(status=ProposalStatus.SUBMITTED).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await db.refresh(db_batch)
+    return db_batch
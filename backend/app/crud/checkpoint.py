@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.checkpoint import SimulationCheckpoint
+
+async def get_checkpoint(db: AsyncSession, proposal_id: int):
+    return await db.get(SimulationCheckpoint, proposal_id)
+
+async def save_checkpoint(db: AsyncSession, proposal_id: int, **fields):
+    db_checkpoint = await db.get(SimulationCheckpoint, proposal_id)
+    if db_checkpoint is None:
+        db_checkpoint = SimulationCheckpoint(proposal_id=proposal_id)
+        db.add(db_checkpoint)
+    for key, value in fields.items():
+        setattr(db_checkpoint, key, value)
+    await db.commit()
+    await db.refresh(db_checkpoint)
+    return db_checkpoint
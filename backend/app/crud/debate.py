@@ -1,32 +1,89 @@
-from sqlalchemy.orm import Session
+from typing import Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.crud.pagination import Page, paginate
 from app.models.debate import Debate, DebateEntry
 from app.schemas.debate import DebateCreate, DebateEntryCreate
 
-def get_debate(db: Session, debate_id: int):
-    return db.query(Debate).filter(Debate.id == debate_id).first()
+async def get_debate(db: AsyncSession, debate_id: int, load: Sequence[LoaderOption] = ()):
+    """
+    Get a debate, with the relationships of a loader profile (see app.crud.loaders)
+    """
+    result = await db.execute(select(Debate).options(*load).filter(Debate.id == debate_id))
+    return result.scalars().first()
 
-def get_debates(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Debate).offset(skip).limit(limit).all()
+async def get_debates(db: AsyncSession, skip: int = 0, limit: int = 100, proposal_id: Optional[int] = None,
+                      after: Optional[int] = None) -> Page:
+    query = select(Debate)
+    if proposal_id:
+        query = query.filter(Debate.proposal_id == proposal_id)
+    return await paginate(db, query, Debate.id, skip=skip, limit=limit, after=after)
 
-def get_debates_by_proposal(db: Session, proposal_id: int):
-    return db.query(Debate).filter(Debate.proposal_id == proposal_id).all()
+async def get_debates_by_proposal(db: AsyncSession, proposal_id: int):
+    result = await db.execute(select(Debate).filter(Debate.proposal_id == proposal_id))
+    return result.scalars().all()
 
-def create_debate(db: Session, debate: DebateCreate):
+async def create_debate(db: AsyncSession, debate: DebateCreate):
     db_debate = Debate(**debate.dict())
     db.add(db_debate)
-    db.commit()
-    db.refresh(db_debate)
+    await db.commit()
+    await db.refresh(db_debate)
     return db_debate
 
-def get_debate_entry(db: Session, entry_id: int):
-    return db.query(DebateEntry).filter(DebateEntry.id == entry_id).first()
+async def get_debate_entry(db: AsyncSession, entry_id: int, load: Sequence[LoaderOption] = ()):
+    result = await db.execute(select(DebateEntry).options(*load).filter(DebateEntry.id == entry_id))
+    return result.scalars().first()
 
-def get_debate_entries(db: Session, debate_id: int, skip: int = 0, limit: int = 100):
-    return db.query(DebateEntry).filter(DebateEntry.debate_id == debate_id).offset(skip).limit(limit).all()
+async def get_debate_entries(db: AsyncSession, debate_id: int, skip: int = 0, limit: int = 100,
+                             after: Optional[int] = None, load: Sequence[LoaderOption] = ()) -> Page:
+    """
+    A page of a debate's entries in the order they were spoken (ids are assigned as entries are stored)
+    """
+    query = select(DebateEntry).options(*load).filter(DebateEntry.debate_id == debate_id)
+    return await paginate(db, query, DebateEntry.id, skip=skip, limit=limit, after=after)
 
-def create_debate_entry(db: Session, entry: DebateEntryCreate):
+async def get_all_debate_entries(db: AsyncSession, debate_id: int):
+    result = await db.execute(
+        select(DebateEntry).filter(DebateEntry.debate_id == debate_id).order_by(DebateEntry.id)
+    )
+    return result.scalars().all()
+
+async def update_debate_summary(db: AsyncSession, debate_id: int, summary: str):
+    db_debate = await db.get(Debate, debate_id)
+    if db_debate:
+        db_debate.summary = summary
+        await db.commit()
+        await db.refresh(db_debate)
+    return db_debate
+
+async def get_latest_summarized_debate(db: AsyncSession, proposal_id: int):
+    result = await db.execute(
+        select(Debate).filter(
+            Debate.proposal_id == proposal_id,
+            Debate.summary.isnot(None)
+        ).order_by(Debate.id.desc()).limit(1)
+    )
+    return result.scalars().first()
+
+async def create_debate_entry(db: AsyncSession, entry: DebateEntryCreate):
     db_entry = DebateEntry(**entry.dict())
     db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
+    await db.commit()
+    await db.refresh(db_entry)
+    return db_entry
+
+async def update_debate_entry(db: AsyncSession, entry_id: int, content: str):
+    db_entry = await db.get(DebateEntry, entry_id)
+    if db_entry:
+        db_entry.content = content
+        await db.commit()
+        await db.refresh(db_entry)
+    return db_entry
+
+async def delete_debate_entry(db: AsyncSession, entry_id: int):
+    db_entry = await db.get(DebateEntry, entry_id)
+    if db_entry:
+        await db.delete(db_entry)
+        await db.commit()
     return db_entry
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.crud.pagination import Page, paginate
+from app.models.job import SimulationJob, JobStatus
+
+ACTIVE_JOB_STATUSES = [JobStatus.QUEUED, JobStatus.RUNNING]
+
+async def get_job(db: AsyncSession, job_id: int):
+    return await db.get(SimulationJob, job_id)
+
+async def get_jobs_by_proposal(db: AsyncSession, proposal_id: int, skip: int = 0, limit: Optional[int] = None,
+                               after: Optional[int] = None) -> Page:
+    query = select(SimulationJob).filter(SimulationJob.proposal_id == proposal_id)
+    return await paginate(db, query, SimulationJob.id, skip=skip, limit=limit, after=after, descending=True)
+
+async def get_active_job(db: AsyncSession, proposal_id: int):
+    result = await db.execute(
+        select(SimulationJob).filter(
+            SimulationJob.proposal_id == proposal_id,
+            SimulationJob.status.in_(ACTIVE_JOB_STATUSES)
+        )
+    )
+    return result.scalars().first()
+
+async def get_active_job_proposal_ids(db: AsyncSession, proposal_ids: List[int]) -> List[int]:
+    result = await db.execute(
+        select(SimulationJob.proposal_id).filter(
+            SimulationJob.proposal_id.in_(proposal_ids),
+            SimulationJob.status.in_(ACTIVE_JOB_STATUSES)
+        ).distinct()
+    )
+    return result.scalars().all()
+
+async def create_job(db: AsyncSession, proposal_id: int, options: Optional[Dict[str, Any]] = None):
+    db_job = SimulationJob(
+        proposal_id=proposal_id,
+        options=options or {},
+        max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+async def claim_job(db: AsyncSession, worker_id: str):
+    """
+    Claim the oldest runnable queued job for a worker
+
+    `FOR UPDATE SKIP LOCKED` lets any number of workers poll the table at once
+    without ever handing the same job to two of them.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(SimulationJob).filter(
+            SimulationJob.status == JobStatus.QUEUED,
+            SimulationJob.run_after <= now
+        ).order_by(SimulationJob.run_after, SimulationJob.id).limit(1).with_for_update(skip_locked=True)
+    )
+    db_job = result.scalars().first()
+    if db_job:
+        db_job.status = JobStatus.RUNNING
+        db_job.attempts += 1
+        db_job.worker_id = worker_id
+        db_job.started_at = now
+        db_job.heartbeat_at = now
+        db_job.error = None
+    await db.commit()
+    return db_job
+
+async def update_job_progress(db: AsyncSession, job_id: int, stage: str, progress: float):
+    await db.execute(
+        update(SimulationJob).filter(SimulationJob.id == job_id).values(
+            stage=stage, progress=progress, heartbeat_at=datetime.utcnow()
+        )
+    )
+    await db.commit()
+
+async def heartbeat_jobs(db: AsyncSession, job_ids):
+    if not job_ids:
+        return
+    await db.execute(
+        update(SimulationJob).filter(SimulationJob.id.in_(job_ids)).values(heartbeat_at=datetime.utcnow())
+    )
+    await db.commit()
+
+async def complete_job(db: AsyncSession, job_id: int, llm_calls: int = 0):
+    db_job = await db.get(SimulationJob, job_id)
+    if db_job:
+        db_job.llm_calls = (db_job.llm_calls or 0) + llm_calls
+        db_job.status = JobStatus.SUCCEEDED
+        db_job.progress = 1.0
+        db_job.finished_at = datetime.utcnow()
+        await db.commit()
+    return db_job
+
+async def fail_job(db: AsyncSession, job_id: int, error: str, llm_calls: int = 0):
+    """
+    Record a failed attempt; the job is queued again with exponential backoff until it runs out of attempts
+    """
+    db_job = await db.get(SimulationJob, job_id)
+    if db_job:
+        db_job.llm_calls = (db_job.llm_calls or 0) + llm_calls
+        db_job.error = error
+        db_job.worker_id = None
+        if db_job.attempts < db_job.max_attempts:
+            db_job.status = JobStatus.QUEUED
+            backoff = settings.JOB_RETRY_BACKOFF * 2 ** (db_job.attempts - 1)
+            db_job.run_after = datetime.utcnow() + timedelta(seconds=backoff)
+        else:
+            db_job.status = JobStatus.FAILED
+            db_job.finished_at = datetime.utcnow()
+        await db.commit()
+    return db_job
+
+async def retry_job(db: AsyncSession, job_id: int):
+    """
+    Queue a failed job again with a fresh set of attempts
+    """
+    db_job = await db.get(SimulationJob, job_id)
+    if db_job and db_job.status == JobStatus.FAILED:
+        db_job.status = JobStatus.QUEUED
+        db_job.attempts = 0
+        db_job.run_after = datetime.utcnow()
+        db_job.finished_at = None
+        await db.commit()
+        await db.refresh(db_job)
+    return db_job
+
+async def requeue_stale_jobs(db: AsyncSession, stale_after: float) -> int:
+    """
+    Put running jobs whose worker stopped sending heartbeats back in the queue
+
+    Jobs that already used all their attempts are marked failed instead.
+    """
+    now = datetime.utcnow()
+    stale = [
+        SimulationJob.status == JobStatus.RUNNING,
+        SimulationJob.heartbeat_at < now - timedelta(seconds=stale_after)
+    ]
+    await db.execute(
+        update(SimulationJob).filter(*stale, SimulationJob.attempts >= SimulationJob.max_attempts).values(
+            status=JobStatus.FAILED, worker_id=None, error="Worker stopped responding", finished_at=now
+        )
+    )
+    result = await db.execute(
+        update(SimulationJob).filter(*stale).values(status=JobStatus.QUEUED, worker_id=None, run_after=now)
+    )
+    await db.commit()
+    return result.rowcount
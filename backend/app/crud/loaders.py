@@ -0,0 +1,35 @@
+from sqlalchemy.orm import joinedload, selectinload
+from app.models.debate import Debate, DebateEntry
+from app.models.member import Member
+from app.models.party import Party
+from app.models.proposal import Proposal
+
+# Loader profiles: the relationships a read path serializes, passed as `load=` to the CRUD getters.
+# Everything a response needs is loaded with the row itself, so serializing it never lazy-loads
+# (which fails under asyncio) and the number of queries does not grow with the related rows.
+
+# Debate with its proposal and every entry's member and party: 2 queries whatever the debate's length
+DEBATE_DETAIL = (
+    joinedload(Debate.proposal),
+    selectinload(Debate.entries).joinedload(DebateEntry.member).joinedload(Member.party),
+)
+
+# Entry with its member and party: 1 query
+DEBATE_ENTRY_WITH_MEMBER = (
+    joinedload(DebateEntry.member).joinedload(Member.party),
+)
+
+# Member with party: 1 query
+MEMBER_WITH_PARTY = (
+    joinedload(Member.party),
+)
+
+# Party with its members: 2 queries whatever the party's size
+PARTY_WITH_MEMBERS = (
+    selectinload(Party.members),
+)
+
+# Proposal with its proposer and the proposer's party: 1 query
+PROPOSAL_WITH_PROPOSER = (
+    joinedload(Proposal.proposer).joinedload(Member.party),
+)
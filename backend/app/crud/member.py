@@ -1,36 +1,52 @@
-from sqlalchemy.orm import Session
+from typing import Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.ai.prompts import invalidate_member_persona
+from app.crud.pagination import Page, paginate
 from app.models.member import Member
 from app.schemas.member import MemberCreate
 
-def get_member(db: Session, member_id: int):
-    return db.query(Member).filter(Member.id == member_id).first()
+async def get_member(db: AsyncSession, member_id: int, load: Sequence[LoaderOption] = ()):
+    result = await db.execute(select(Member).options(*load).filter(Member.id == member_id))
+    return result.scalars().first()
 
-def get_members(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Member).offset(skip).limit(limit).all()
+async def get_members(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> Page:
+    return await paginate(db, select(Member), Member.id, skip=skip, limit=limit, after=after)
 
-def get_members_by_party(db: Session, party_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Member).filter(Member.party_id == party_id).offset(skip).limit(limit).all()
+async def get_all_members(db: AsyncSession):
+    result = await db.execute(select(Member).options(joinedload(Member.party)).order_by(Member.id))
+    return result.scalars().all()
 
-def create_member(db: Session, member: MemberCreate):
+async def get_members_by_party(db: AsyncSession, party_id: int, skip: int = 0, limit: int = 100,
+                               after: Optional[int] = None) -> Page:
+    query = select(Member).filter(Member.party_id == party_id)
+    return await paginate(db, query, Member.id, skip=skip, limit=limit, after=after)
+
+async def create_member(db: AsyncSession, member: MemberCreate):
     db_member = Member(**member.dict())
     db.add(db_member)
-    db.commit()
-    db.refresh(db_member)
+    await db.commit()
+    await db.refresh(db_member)
     return db_member
 
-def update_member(db: Session, member_id: int, member_data):
-    db_member = db.query(Member).filter(Member.id == member_id).first()
+async def update_member(db: AsyncSession, member_id: int, member_data):
+    db_member = await db.get(Member, member_id)
     if db_member:
         for key, value in member_data.dict(exclude_unset=True).items():
             setattr(db_member, key, value)
-        db.commit()
-        db.refresh(db_member)
+        await db.commit()
+        await db.refresh(db_member)
+        # The member's prompt persona is rendered again on next use
+        invalidate_member_persona(member_id)
     return db_member
 
-def delete_member(db: Session, member_id: int):
-    db_member = db.query(Member).filter(Member.id == member_id).first()
+async def delete_member(db: AsyncSession, member_id: int):
+    db_member = await db.get(Member, member_id)
     if db_member:
-        db.delete(db_member)
-        db.commit()
+        await db.delete(db_member)
+        await db.commit()
+        invalidate_member_persona(member_id)
         return True
     return False
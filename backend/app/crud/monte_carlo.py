@@ -0,0 +1,24 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from app.crud.pagination import Page, paginate
+from app.models.monte_carlo import MonteCarloRun
+
+async def get_monte_carlo_run(db: AsyncSession, run_id: int):
+    return await db.get(MonteCarloRun, run_id)
+
+async def get_monte_carlo_runs_by_proposal(db: AsyncSession, proposal_id: int, skip: int = 0,
+                                           limit: Optional[int] = None, after: Optional[int] = None) -> Page:
+    # The packed tallies are only needed for a single run
+    query = select(MonteCarloRun).options(defer(MonteCarloRun.tallies)).filter(
+        MonteCarloRun.proposal_id == proposal_id
+    )
+    return await paginate(db, query, MonteCarloRun.id, skip=skip, limit=limit, after=after, descending=True)
+
+async def create_monte_carlo_run(db: AsyncSession, run: Dict[str, Any]):
+    db_run = MonteCarloRun(**run)
+    db.add(db_run)
+    await db.commit()
+    await db.refresh(db_run)
+    return db_run
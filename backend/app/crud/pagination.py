@@ -0,0 +1,37 @@
+from typing import Iterable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+class Page(list):
+    """
+    One page of a list query: the rows, and the key to continue after (None on the last page)
+    """
+    def __init__(self, rows: Iterable = (), next_after: Optional[int] = None):
+        super().__init__(rows)
+        self.next_after = next_after
+
+async def paginate(db: AsyncSession, query: Select, key, skip: int = 0, limit: Optional[int] = 100,
+                   after: Optional[int] = None, descending: bool = False) -> Page:
+    """
+    Run a list query ordered by `key` (an id column), one page at a time
+
+    With `after` the page starts behind that key (keyset pagination): the index on the key
+    seeks straight to it, however deep the page is. `skip` is the older offset pagination,
+    which reads and discards every row before the page, and is ignored when `after` is given.
+    Without a `limit` every row is returned.
+    """
+    query = query.order_by(key.desc() if descending else key)
+    if after is not None:
+        query = query.filter(key < after if descending else key > after)
+    elif skip:
+        query = query.offset(skip)
+    if limit is None:
+        result = await db.execute(query)
+        return Page(result.scalars().all())
+
+    # One row more than the page tells whether there is a next page
+    result = await db.execute(query.limit(max(limit, 0) + 1))
+    rows = result.scalars().all()
+    if limit > 0 and len(rows) > limit:
+        return Page(rows[:limit], next_after=getattr(rows[limit - 1], key.key))
+    return Page(rows[:max(limit, 0)])
@@ -1,36 +1,42 @@
-from sqlalchemy.orm import Session
+from typing import Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.crud.pagination import Page, paginate
 from app.models.party import Party
 from app.schemas.party import PartyCreate
 
-def get_party(db: Session, party_id: int):
-    return db.query(Party).filter(Party.id == party_id).first()
+async def get_party(db: AsyncSession, party_id: int, load: Sequence[LoaderOption] = ()):
+    result = await db.execute(select(Party).options(*load).filter(Party.id == party_id))
+    return result.scalars().first()
 
-def get_party_by_name(db: Session, name: str):
-    return db.query(Party).filter(Party.name == name).first()
+async def get_party_by_name(db: AsyncSession, name: str):
+    result = await db.execute(select(Party).filter(Party.name == name))
+    return result.scalars().first()
 
-def get_parties(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Party).offset(skip).limit(limit).all()
+async def get_parties(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> Page:
+    return await paginate(db, select(Party), Party.id, skip=skip, limit=limit, after=after)
 
-def create_party(db: Session, party: PartyCreate):
+async def create_party(db: AsyncSession, party: PartyCreate):
     db_party = Party(**party.dict())
     db.add(db_party)
-    db.commit()
-    db.refresh(db_party)
+    await db.commit()
+    await db.refresh(db_party)
     return db_party
 
-def update_party(db: Session, party_id: int, party_data):
-    db_party = db.query(Party).filter(Party.id == party_id).first()
+async def update_party(db: AsyncSession, party_id: int, party_data):
+    db_party = await db.get(Party, party_id)
     if db_party:
         for key, value in party_data.dict(exclude_unset=True).items():
             setattr(db_party, key, value)
-        db.commit()
-        db.refresh(db_party)
+        await db.commit()
+        await db.refresh(db_party)
     return db_party
 
-def delete_party(db: Session, party_id: int):
-    db_party = db.query(Party).filter(Party.id == party_id).first()
+async def delete_party(db: AsyncSession, party_id: int):
+    db_party = await db.get(Party, party_id)
     if db_party:
-        db.delete(db_party)
-        db.commit()
+        await db.delete(db_party)
+        await db.commit()
         return True
     return False
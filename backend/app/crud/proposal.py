@@ -1,47 +1,64 @@
-from sqlalchemy.orm import Session
+from typing import List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.crud.pagination import Page, paginate
 from app.models.proposal import Proposal, ProposalStatus
 from app.schemas.proposal import ProposalCreate
 from datetime import datetime
 
-def get_proposal(db: Session, proposal_id: int):
-    return db.query(Proposal).filter(Proposal.id == proposal_id).first()
+async def get_proposal(db: AsyncSession, proposal_id: int, load: Sequence[LoaderOption] = ()):
+    if not load:
+        return await db.get(Proposal, proposal_id)
+    result = await db.execute(select(Proposal).options(*load).filter(Proposal.id == proposal_id))
+    return result.scalars().first()
 
-def get_proposals(db: Session, skip: int = 0, limit: int = 100, status: ProposalStatus = None):
-    query = db.query(Proposal)
+async def get_proposals(db: AsyncSession, skip: int = 0, limit: int = 100, status: ProposalStatus = None,
+                        after: Optional[int] = None) -> Page:
+    query = select(Proposal)
     if status:
         query = query.filter(Proposal.status == status)
-    return query.offset(skip).limit(limit).all()
+    return await paginate(db, query, Proposal.id, skip=skip, limit=limit, after=after)
 
-def create_proposal(db: Session, proposal: ProposalCreate):
+async def get_proposals_by_ids(db: AsyncSession, proposal_ids: List[int]):
+    result = await db.execute(select(Proposal).filter(Proposal.id.in_(proposal_ids)).order_by(Proposal.id))
+    return result.scalars().all()
+
+async def get_proposals_by_statuses(db: AsyncSession, statuses: List[ProposalStatus], limit: int = None):
+    query = select(Proposal).filter(Proposal.status.in_(statuses)).order_by(Proposal.id)
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+async def create_proposal(db: AsyncSession, proposal: ProposalCreate):
     db_proposal = Proposal(**proposal.dict(), status=ProposalStatus.DRAFT)
     db.add(db_proposal)
-    db.commit()
-    db.refresh(db_proposal)
+    await db.commit()
+    await db.refresh(db_proposal)
     return db_proposal
 
-def update_proposal_status(db: Session, proposal_id: int, status: ProposalStatus):
-    db_proposal = db.query(Proposal).filter(Proposal.id == proposal_id).first()
+async def update_proposal_status(db: AsyncSession, proposal_id: int, status: ProposalStatus):
+    db_proposal = await db.get(Proposal, proposal_id)
     if db_proposal:
         db_proposal.status = status
         if status == ProposalStatus.VOTING:
             db_proposal.vote_date = datetime.utcnow()
-        db.commit()
-        db.refresh(db_proposal)
+        await db.commit()
+        await db.refresh(db_proposal)
     return db_proposal
 
-def update_proposal(db: Session, proposal_id: int, proposal_data):
-    db_proposal = db.query(Proposal).filter(Proposal.id == proposal_id).first()
+async def update_proposal(db: AsyncSession, proposal_id: int, proposal_data):
+    db_proposal = await db.get(Proposal, proposal_id)
     if db_proposal:
         for key, value in proposal_data.dict(exclude_unset=True).items():
             setattr(db_proposal, key, value)
-        db.commit()
-        db.refresh(db_proposal)
+        await db.commit()
+        await db.refresh(db_proposal)
     return db_proposal
 
-def delete_proposal(db: Session, proposal_id: int):
-    db_proposal = db.query(Proposal).filter(Proposal.id == proposal_id).first()
+async def delete_proposal(db: AsyncSession, proposal_id: int):
+    db_proposal = await db.get(Proposal, proposal_id)
     if db_proposal:
-        db.delete(db_proposal)
-        db.commit()
+        await db.delete(db_proposal)
+        await db.commit()
         return True
     return False
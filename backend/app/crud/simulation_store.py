@@ -0,0 +1,140 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud import checkpoint as checkpoint_crud
+from app.crud import loaders
+from app.crud import debate as debate_crud
+from app.crud import member as member_crud
+from app.crud import monte_carlo as monte_carlo_crud
+from app.crud import proposal as proposal_crud
+from app.crud import usage as usage_crud
+from app.crud import vote as vote_crud
+from app.models.member import Member
+from app.models.proposal import ProposalStatus
+from app.schemas.debate import DebateCreate, DebateEntryCreate
+from app.schemas.vote import VoteCreate, VoteSummary
+
+def member_to_dict(member: Member) -> Dict[str, Any]:
+    """
+    Plain-dict view of a member (with party) as used by the prompts
+    """
+    return {
+        "id": member.id,
+        "name": member.name,
+        "role": member.role,
+        "economic_leaning": member.economic_leaning,
+        "social_leaning": member.social_leaning,
+        "eu_stance": member.eu_stance,
+        "bio": member.bio,
+        "party": {
+            "id": member.party.id,
+            "name": member.party.name,
+            "abbreviation": member.party.abbreviation
+        }
+    }
+
+class SimulationStore:
+    """
+    Database operations of ParliamentSimulation, bound to one session
+
+    The simulation works on plain dicts; this class loads and stores them through the CRUD layer.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._members: Dict[int, Dict[str, Any]] = {}
+
+    async def get_proposal(self, proposal_id: int):
+        db_proposal = await proposal_crud.get_proposal(self.db, proposal_id, load=loaders.PROPOSAL_WITH_PROPOSER)
+        if db_proposal is None:
+            return None
+        return {
+            "id": db_proposal.id,
+            "title": db_proposal.title,
+            "content": db_proposal.content,
+            "status": db_proposal.status,
+            "proposer": member_to_dict(db_proposal.proposer)
+        }
+
+    async def get_all_members(self) -> List[Dict[str, Any]]:
+        members = [member_to_dict(member) for member in await member_crud.get_all_members(self.db)]
+        self._members = {member["id"]: member for member in members}
+        return members
+
+    async def update_proposal_status(self, proposal_id: int, status: ProposalStatus):
+        await proposal_crud.update_proposal_status(self.db, proposal_id, status)
+
+    async def get_checkpoint(self, proposal_id: int) -> Optional[Dict[str, Any]]:
+        db_checkpoint = await checkpoint_crud.get_checkpoint(self.db, proposal_id)
+        if db_checkpoint is None:
+            return None
+        return {"stage": db_checkpoint.stage, "debate_id": db_checkpoint.debate_id}
+
+    async def save_checkpoint(self, proposal_id: int, **fields):
+        await checkpoint_crud.save_checkpoint(self.db, proposal_id, **fields)
+
+    def _debate_to_dict(self, db_debate) -> Dict[str, Any]:
+        return {
+            "id": db_debate.id,
+            "proposal_id": db_debate.proposal_id,
+            "title": db_debate.title,
+            "summary": db_debate.summary
+        }
+
+    def _entry_to_dict(self, db_entry) -> Dict[str, Any]:
+        return {
+            "id": db_entry.id,
+            "debate_id": db_entry.debate_id,
+            "member_id": db_entry.member_id,
+            "content": db_entry.content,
+            "timestamp": db_entry.timestamp,
+            "member": self._members.get(db_entry.member_id)
+        }
+
+    async def get_debate(self, debate_id: int) -> Optional[Dict[str, Any]]:
+        db_debate = await debate_crud.get_debate(self.db, debate_id)
+        return self._debate_to_dict(db_debate) if db_debate else None
+
+    async def create_debate(self, debate: Dict[str, Any]) -> Dict[str, Any]:
+        db_debate = await debate_crud.create_debate(self.db, DebateCreate(**debate))
+        return self._debate_to_dict(db_debate)
+
+    async def get_latest_summarized_debate(self, proposal_id: int) -> Optional[Dict[str, Any]]:
+        db_debate = await debate_crud.get_latest_summarized_debate(self.db, proposal_id)
+        return self._debate_to_dict(db_debate) if db_debate else None
+
+    async def update_debate_summary(self, debate_id: int, summary: str):
+        await debate_crud.update_debate_summary(self.db, debate_id, summary)
+
+    async def get_debate_entries(self, debate_id: int) -> List[Dict[str, Any]]:
+        return [self._entry_to_dict(entry) for entry in await debate_crud.get_all_debate_entries(self.db, debate_id)]
+
+    async def create_debate_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        db_entry = await debate_crud.create_debate_entry(self.db, DebateEntryCreate(**entry))
+        return self._entry_to_dict(db_entry)
+
+    async def delete_votes(self, proposal_id: int):
+        await vote_crud.delete_votes_by_proposal(self.db, proposal_id)
+
+    async def update_debate_entry(self, entry_id: int, content: str) -> Dict[str, Any]:
+        db_entry = await debate_crud.update_debate_entry(self.db, entry_id, content)
+        return self._entry_to_dict(db_entry)
+
+    async def delete_debate_entry(self, entry_id: int):
+        await debate_crud.delete_debate_entry(self.db, entry_id)
+
+    async def get_voted_member_ids(self, proposal_id: int) -> List[int]:
+        return await vote_crud.get_voted_member_ids(self.db, proposal_id)
+
+    async def get_vote_summary(self, proposal_id: int) -> VoteSummary:
+        return await vote_crud.get_vote_summary(self.db, proposal_id)
+
+    async def create_votes_bulk(self, votes: List[Dict[str, Any]]) -> VoteSummary:
+        return await vote_crud.create_votes_bulk(self.db, [VoteCreate(**vote) for vote in votes])
+
+    async def create_monte_carlo_run(self, run: Dict[str, Any]):
+        return await monte_carlo_crud.create_monte_carlo_run(self.db, run)
+
+    async def record_token_usage(self, proposal_id: int, stage: str, usage: Dict[str, int], debate_id: int = None):
+        await usage_crud.create_token_usage(self.db, proposal_id, stage, usage, debate_id)
+
+    async def get_debate_token_total(self, debate_id: int) -> int:
+        return await usage_crud.get_debate_token_total(self.db, debate_id)
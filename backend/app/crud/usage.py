@@ -0,0 +1,47 @@
+from typing import Any, Dict, List
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.usage import TokenUsageRecord
+
+TOKEN_COLUMNS = ("requests", "prompt_tokens", "completion_tokens", "cached_tokens")
+
+async def create_token_usage(db: AsyncSession, proposal_id: int, stage: str, usage: Dict[str, int],
+                             debate_id: int = None):
+    db_usage = TokenUsageRecord(
+        proposal_id=proposal_id,
+        debate_id=debate_id,
+        stage=stage,
+        **{column: usage.get(column, 0) for column in TOKEN_COLUMNS}
+    )
+    db.add(db_usage)
+    await db.commit()
+    await db.refresh(db_usage)
+    return db_usage
+
+async def get_token_usage_by_proposal(db: AsyncSession, proposal_id: int) -> List[Dict[str, Any]]:
+    """
+    Tokens spent on a proposal, summed per debate and stage
+    """
+    query = select(
+        TokenUsageRecord.debate_id,
+        TokenUsageRecord.stage,
+        *[func.sum(getattr(TokenUsageRecord, column)).label(column) for column in TOKEN_COLUMNS]
+    ).filter(
+        TokenUsageRecord.proposal_id == proposal_id
+    ).group_by(
+        TokenUsageRecord.debate_id, TokenUsageRecord.stage
+    ).order_by(
+        TokenUsageRecord.debate_id, func.min(TokenUsageRecord.id)
+    )
+    result = await db.execute(query)
+    return [dict(row._mapping) for row in result]
+
+async def get_debate_token_total(db: AsyncSession, debate_id: int) -> int:
+    """
+    Prompt and completion tokens spent so far on the run behind a debate
+    """
+    result = await db.execute(
+        select(func.coalesce(func.sum(TokenUsageRecord.prompt_tokens + TokenUsageRecord.completion_tokens), 0))
+        .filter(TokenUsageRecord.debate_id == debate_id, TokenUsageRecord.stage != "monte_carlo")
+    )
+    return result.scalar()
@@ -1,53 +1,177 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.vote import Vote, VoteType
+from typing import Dict, List, Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from app.crud.pagination import Page, paginate
+from app.models.vote import Vote, VoteType, VoteTally
 from app.schemas.vote import VoteCreate, VoteSummary
 
-def get_vote(db: Session, vote_id: int):
-    return db.query(Vote).filter(Vote.id == vote_id).first()
+# Column of VoteTally holding the count for each vote type
+TALLY_COLUMNS = {
+    VoteType.FOR: "for_votes",
+    VoteType.AGAINST: "against_votes",
+    VoteType.ABSTAIN: "abstain_votes",
+    VoteType.ABSENT: "absent_votes",
+}
 
-def get_vote_by_member_proposal(db: Session, member_id: int, proposal_id: int):
-    return db.query(Vote).filter(
+async def get_vote(db: AsyncSession, vote_id: int):
+    return await db.get(Vote, vote_id)
+
+async def get_vote_by_member_proposal(db: AsyncSession, member_id: int, proposal_id: int):
+    result = await db.execute(select(Vote).filter(
         Vote.member_id == member_id,
         Vote.proposal_id == proposal_id
-    ).first()
+    ))
+    return result.scalars().first()
+
+async def get_votes_by_proposal(db: AsyncSession, proposal_id: int, skip: int = 0, limit: Optional[int] = None,
+                                after: Optional[int] = None) -> Page:
+    query = select(Vote).filter(Vote.proposal_id == proposal_id)
+    return await paginate(db, query, Vote.id, skip=skip, limit=limit, after=after)
+
+async def get_voted_member_ids(db: AsyncSession, proposal_id: int) -> List[int]:
+    result = await db.execute(select(Vote.member_id).filter(Vote.proposal_id == proposal_id))
+    return result.scalars().all()
+
+async def _count_votes(db: AsyncSession, proposal_id: int) -> Dict[VoteType, int]:
+    result = await db.execute(select(Vote.vote, func.count(Vote.id)).filter(
+        Vote.proposal_id == proposal_id
+    ).group_by(Vote.vote))
+    return dict(result.all())
+
+async def _refresh_tally(db: AsyncSession, proposal_id: int) -> Dict[VoteType, int]:
+    """
+    Recompute a proposal's tally from its votes and store it, within the current transaction
+    """
+    counts = await _count_votes(db, proposal_id)
+    values = {column: counts.get(vote_type, 0) for vote_type, column in TALLY_COLUMNS.items()}
+    stmt = insert(VoteTally).values(proposal_id=proposal_id, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=[VoteTally.proposal_id], set_=values)
+    await db.execute(stmt)
+    return counts
 
-def get_votes_by_proposal(db: Session, proposal_id: int):
-    return db.query(Vote).filter(Vote.proposal_id == proposal_id).all()
+async def _lock_tally(db: AsyncSession, proposal_id: int) -> VoteTally:
+    """
+    Lock a proposal's tally row for this transaction, creating it from the votes if missing
+
+    Taking the lock first serialises concurrent vote writers for the same proposal.
+    """
+    query = select(VoteTally).filter(VoteTally.proposal_id == proposal_id).with_for_update()
+    tally = (await db.execute(query)).scalars().first()
+    if tally is None:
+        await _refresh_tally(db, proposal_id)
+        tally = (await db.execute(query.execution_options(populate_existing=True))).scalars().one()
+    return tally
+
+async def create_vote(db: AsyncSession, vote: VoteCreate):
+    tally = await _lock_tally(db, vote.proposal_id)
 
-def create_vote(db: Session, vote: VoteCreate):
     # Check if vote exists already and update if so
-    db_vote = get_vote_by_member_proposal(db, vote.member_id, vote.proposal_id)
+    db_vote = await get_vote_by_member_proposal(db, vote.member_id, vote.proposal_id)
     if db_vote:
+        old_column = TALLY_COLUMNS[db_vote.vote]
+        setattr(tally, old_column, getattr(tally, old_column) - 1)
+        new_column = TALLY_COLUMNS[vote.vote]
+        setattr(tally, new_column, getattr(tally, new_column) + 1)
         db_vote.vote = vote.vote
-        db.commit()
-        db.refresh(db_vote)
+        await db.commit()
+        await db.refresh(db_vote)
         return db_vote
-    
+
     # Otherwise create new vote
     db_vote = Vote(**vote.dict())
     db.add(db_vote)
-    db.commit()
-    db.refresh(db_vote)
+    new_column = TALLY_COLUMNS[vote.vote]
+    setattr(tally, new_column, getattr(tally, new_column) + 1)
+    await db.commit()
+    await db.refresh(db_vote)
     return db_vote
 
-def get_vote_summary(db: Session, proposal_id: int) -> VoteSummary:
-    votes = get_votes_by_proposal(db, proposal_id)
-    
-    total = len(votes)
-    for_votes = sum(1 for v in votes if v.vote == VoteType.FOR)
-    against_votes = sum(1 for v in votes if v.vote == VoteType.AGAINST)
-    abstain_votes = sum(1 for v in votes if v.vote == VoteType.ABSTAIN)
-    absent_votes = sum(1 for v in votes if v.vote == VoteType.ABSENT)
-    
-    # Simple majority rule
-    passed = for_votes > against_votes
-    
+async def create_votes_bulk(db: AsyncSession, votes: List[VoteCreate]) -> VoteSummary:
+    """
+    Insert or update a whole chamber's votes on one proposal in a single statement
+    """
+    proposal_ids = {vote.proposal_id for vote in votes}
+    if len(proposal_ids) != 1:
+        raise ValueError("create_votes_bulk expects votes for exactly one proposal")
+    proposal_id = proposal_ids.pop()
+
+    await _lock_tally(db, proposal_id)
+
+    # A statement may only touch each row once, so keep the last vote per member
+    rows = list({vote.member_id: vote.dict() for vote in votes}.values())
+    stmt = insert(Vote).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_votes_proposal_member",
+        set_={"vote": stmt.excluded.vote}
+    )
+    await db.execute(stmt)
+
+    # Re-votes may have moved counts between columns, so recount rather than increment
+    counts = await _refresh_tally(db, proposal_id)
+    await db.commit()
+
+    return _summary_from_counts(counts)
+
+async def delete_votes_by_proposal(db: AsyncSession, proposal_id: int):
+    """
+    Remove a proposal's votes and zero its tally, e.g. before it is voted on again
+    """
+    await _lock_tally(db, proposal_id)
+    await db.execute(delete(Vote).filter(Vote.proposal_id == proposal_id))
+    await _refresh_tally(db, proposal_id)
+    await db.commit()
+
+def _summary_from_counts(counts: Dict[VoteType, int]) -> VoteSummary:
+    for_votes = counts.get(VoteType.FOR, 0)
+    against_votes = counts.get(VoteType.AGAINST, 0)
+
     return VoteSummary(
-        total=total,
+        total=sum(counts.values()),
         for_votes=for_votes,
         against_votes=against_votes,
-        abstain_votes=abstain_votes,
-        absent_votes=absent_votes,
-        passed=passed
+        abstain_votes=counts.get(VoteType.ABSTAIN, 0),
+        absent_votes=counts.get(VoteType.ABSENT, 0),
+        # Simple majority rule
+        passed=for_votes > against_votes
     )
+
+def _summary_from_tally(tally: VoteTally) -> VoteSummary:
+    return _summary_from_counts({
+        vote_type: getattr(tally, column) for vote_type, column in TALLY_COLUMNS.items()
+    })
+
+async def get_vote_summary(db: AsyncSession, proposal_id: int) -> VoteSummary:
+    tally = await db.get(VoteTally, proposal_id)
+    if tally is not None:
+        return _summary_from_tally(tally)
+
+    # Proposals whose votes predate the tally table are counted from the votes themselves
+    return _summary_from_counts(await _count_votes(db, proposal_id))
+
+async def get_vote_summaries(db: AsyncSession, proposal_ids: List[int]) -> Dict[int, VoteSummary]:
+    """
+    Vote summaries for many proposals at once; proposals without votes are left out
+    """
+    if not proposal_ids:
+        return {}
+
+    result = await db.execute(select(VoteTally).filter(VoteTally.proposal_id.in_(proposal_ids)))
+    tallies = result.scalars().all()
+    summaries = {tally.proposal_id: _summary_from_tally(tally) for tally in tallies}
+
+    # Count the remaining proposals from their votes in one grouped query
+    missing_ids = [proposal_id for proposal_id in proposal_ids if proposal_id not in summaries]
+    if missing_ids:
+        counts: Dict[int, Dict[VoteType, int]] = {}
+        result = await db.execute(select(Vote.proposal_id, Vote.vote, func.count(Vote.id)).filter(
+            Vote.proposal_id.in_(missing_ids)
+        ).group_by(Vote.proposal_id, Vote.vote))
+        for proposal_id, vote, count in result.all():
+            counts.setdefault(proposal_id, {})[vote] = count
+        summaries.update({
+            proposal_id: _summary_from_counts(proposal_counts) for proposal_id, proposal_counts in counts.items()
+        })
+
+    # Tally rows can exist with every count at zero; report those like proposals without votes
+    return {proposal_id: summary for proposal_id, summary in summaries.items() if summary.total}
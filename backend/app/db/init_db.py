@@ -1,10 +1,10 @@
+import argparse
 import asyncio
-import json
-from sqlalchemy.orm import Session
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.ext.asyncio import async_sessionmaker
+import random
+from typing import Any, Dict, List
 
-from app.database import engine, Base
+from app.database import engine, SessionLocal
+from app.db.migrate import upgrade_database
 from app.models.party import Party
 from app.models.member import Member
 from app.models.proposal import Proposal, ProposalStatus
@@ -171,25 +171,68 @@ PROPOSALS_DATA = [
     }
 ]
 
-async def init_db():
-    """Initialize the database with sample data."""
-    Base.metadata.create_all(bind=engine)
+FIRST_NAMES = ["Anna", "Bram", "Daan", "Emma", "Fenna", "Jan", "Julia", "Lars", "Lotte", "Mila",
+               "Noah", "Pieter", "Roos", "Sanne", "Sem", "Thijs", "Tess", "Wouter", "Yara", "Zoë"]
+LAST_NAMES = ["de Jong", "Jansen", "de Vries", "van den Berg", "van Dijk", "Bakker", "Visser",
+              "Smit", "Meijer", "de Boer", "Mulder", "de Groot", "Bos", "Vos", "Peters", "Hendriks"]
+
+def generate_members(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Synthetic members for load tests, each close to a sample member of the same party
+    """
+    rng = random.Random(seed)
+    members = []
+    for index in range(count):
+        template = MEMBERS_DATA[index % len(MEMBERS_DATA)]
+        leanings = {
+            key: min(100.0, max(0.0, round(template[key] + rng.gauss(0, 8), 1)))
+            for key in ("economic_leaning", "social_leaning", "eu_stance")
+        }
+        members.append({
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} ({len(MEMBERS_DATA) + index + 1})",
+            "party_abbreviation": template["party_abbreviation"],
+            "role": "MP",
+            "bio": template["bio"],
+            **leanings
+        })
+    return members
+
+def generate_proposals(count: int) -> List[Dict[str, Any]]:
+    """
+    Numbered copies of the sample proposals, submitted by their original proposers
+    """
+    return [
+        {**template, "title": f"{template['title']} #{index + 1}", "status": "submitted"}
+        for index, template in enumerate(PROPOSALS_DATA * (count // len(PROPOSALS_DATA) + 1))
+    ][:count]
+
+async def init_db(member_count: int = None, proposal_count: int = None):
+    """
+    Initialize the database with sample data
+
+    With `member_count` / `proposal_count` the sample data is topped up with synthetic
+    members and proposals up to those numbers, e.g. a full chamber of 150 for benchmarks.
+    """
+    # Alembic runs its own event loop, so it migrates from a thread
+    await asyncio.to_thread(upgrade_database)
     
     party_abbreviation_to_id = {}
     member_name_to_id = {}
     
-    with Session(engine) as db:
+    async with SessionLocal() as db:
         # Add parties
         for party_data in PARTIES_DATA:
             db_party = Party(**party_data)
             db.add(db_party)
-            db.flush()
+            await db.flush()
             party_abbreviation_to_id[party_data["abbreviation"]] = db_party.id
         
-        db.commit()
+        await db.commit()
         
         # Add members
-        for member_data in MEMBERS_DATA:
+        members_data = MEMBERS_DATA + generate_members(max(0, (member_count or 0) - len(MEMBERS_DATA)))
+        for member_data in members_data:
+            member_data = dict(member_data)
             party_abbreviation = member_data.pop("party_abbreviation")
             party_id = party_abbreviation_to_id.get(party_abbreviation)
             if not party_id:
@@ -201,13 +244,15 @@ async def init_db():
                 **{k: v for k, v in member_data.items()}
             )
             db.add(db_member)
-            db.flush()
+            await db.flush()
             member_name_to_id[member_data["name"]] = db_member.id
         
-        db.commit()
+        await db.commit()
         
         # Add proposals
-        for proposal_data in PROPOSALS_DATA:
+        proposals_data = PROPOSALS_DATA + generate_proposals(max(0, (proposal_count or 0) - len(PROPOSALS_DATA)))
+        for proposal_data in proposals_data:
+            proposal_data = dict(proposal_data)
             proposer_name = proposal_data.pop("proposer_name")
             status = proposal_data.pop("status")
             proposer_id = member_name_to_id.get(proposer_name)
@@ -222,9 +267,14 @@ async def init_db():
             )
             db.add(db_proposal)
         
-        db.commit()
+        await db.commit()
     
-    print("Database initialized with sample data!")
+    await engine.dispose()
+    print(f"Database initialized with {len(members_data)} members and {len(proposals_data)} proposals!")
 
 if __name__ == "__main__":
-    asyncio.run(init_db())
+    parser = argparse.ArgumentParser(description="Create the tables and load sample data")
+    parser.add_argument("--members", type=int, default=None, help="Top up with synthetic members up to this number")
+    parser.add_argument("--proposals", type=int, default=None, help="Top up with copies of the sample proposals up to this number")
+    args = parser.parse_args()
+    asyncio.run(init_db(member_count=args.members, proposal_count=args.proposals))
@@ -0,0 +1,41 @@
+import asyncio
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, pool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+
+# Revision matching the schema of the first release, which created its tables with create_all;
+# the revisions after it add (only) what such a database lacks
+BASELINE_REVISION = "0001"
+
+async def _schema_state():
+    # A throwaway engine, as this runs on its own event loop
+    engine = create_async_engine(settings.ASYNC_DATABASE_URL, poolclass=pool.NullPool)
+    async with engine.connect() as conn:
+        tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+    await engine.dispose()
+    return "alembic_version" in tables, "parties" in tables
+
+def upgrade_database():
+    """
+    Migrate the database to the latest revision (alembic upgrade head)
+
+    A database created by create_all before migrations were introduced is stamped at the
+    baseline revision first, so only the migrations after it run. Runs its own event loop;
+    call it from a thread in async code.
+    """
+    config = Config(ALEMBIC_INI)
+    versioned, has_tables = asyncio.run(_schema_state())
+    if has_tables and not versioned:
+        print(f"Existing schema without migration history, stamping it at revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+if __name__ == "__main__":
+    upgrade_database()
@@ -0,0 +1,58 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database import engine
+
+class QueryCounter:
+    """
+    Number of statements sent to the database within a `count_queries` block
+    """
+    def __init__(self):
+        self.count = 0
+
+# Counters of the enclosing `count_queries` blocks; asyncio tasks inherit them when created
+_active: ContextVar[Tuple[QueryCounter, ...]] = ContextVar("active_query_counters", default=())
+_instrumented: Set[int] = set()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active.get():
+        counter.count += 1
+
+def instrument(target: AsyncEngine = None):
+    """
+    Attach the statement listener to an engine; done once per engine
+    """
+    target = target or engine
+    if id(target.sync_engine) not in _instrumented:
+        event.listen(target.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        _instrumented.add(id(target.sync_engine))
+
+@contextmanager
+def count_queries(target: AsyncEngine = None) -> Iterator[QueryCounter]:
+    """
+    Count the statements executed by this task (and tasks it starts) inside the block
+
+    Blocks nest, so a whole run and each of its concurrent parts can be counted at once.
+    """
+    instrument(target)
+    counter = QueryCounter()
+    token = _active.set(_active.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active.reset(token)
+
+@contextmanager
+def assert_max_queries(limit: int, target: AsyncEngine = None) -> Iterator[QueryCounter]:
+    """
+    Fail with an AssertionError if the block executes more than `limit` statements
+
+    For tests of read paths, e.g. that a detail endpoint's queries do not grow with its data.
+    """
+    with count_queries(target) as counter:
+        yield counter
+    assert counter.count <= limit, f"Expected at most {limit} queries, got {counter.count}"
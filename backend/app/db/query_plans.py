@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import json
+import math
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+
+from app.database import engine
+
+# The lookups behind the vote and debate read paths, as the CRUD functions run them
+QUERIES = {
+    "vote of a member on a proposal": (
+        "SELECT * FROM votes WHERE proposal_id = :proposal_id AND member_id = :member_id"
+    ),
+    "votes of a proposal": "SELECT * FROM votes WHERE proposal_id = :proposal_id ORDER BY id",
+    "entries of a debate": "SELECT * FROM debate_entries WHERE debate_id = :debate_id ORDER BY id LIMIT 101",
+    "debates of a proposal": "SELECT * FROM debates WHERE proposal_id = :proposal_id ORDER BY id LIMIT 101",
+}
+
+# The indexes of migration 0003, dropped to compare against the plans without them
+DROP_INDEXES = [
+    "ALTER TABLE votes DROP CONSTRAINT uq_votes_proposal_member",
+    "DROP INDEX ix_debate_entries_debate_id_timestamp",
+    "DROP INDEX ix_debates_proposal_id",
+]
+
+def _scan(plan: Dict[str, Any]) -> str:
+    """
+    How the plan reads its table, e.g. "Index Scan using ix_debates_proposal_id"
+    """
+    if "Relation Name" in plan:
+        # Bitmap heap scans name their index in the bitmap index scan below them
+        index = plan.get("Index Name") or next(
+            (child["Index Name"] for child in plan.get("Plans", []) if "Index Name" in child), None
+        )
+        return plan["Node Type"] + (f" using {index}" if index else "")
+    for child in plan.get("Plans", []):
+        return _scan(child)
+    return plan["Node Type"]
+
+async def _explain(conn, sql: str, params: Dict[str, int], runs: int) -> Tuple[str, float, List[str]]:
+    """
+    Scan type and best execution time in ms over `runs` executions, and the text plan
+    """
+    timings = []
+    for _ in range(runs):
+        result = await conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"), params)
+        data = result.scalar()
+        explained = (json.loads(data) if isinstance(data, str) else data)[0]
+        timings.append(explained["Execution Time"])
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)
+    return _scan(explained["Plan"]), min(timings), result.scalars().all()
+
+async def _populate(conn, vote_count: int, speakers: int) -> Dict[str, int]:
+    """
+    Add synthetic proposals with a vote from every member, a debate and `speakers` entries each
+    """
+    member_ids = (await conn.execute(text("SELECT id FROM members ORDER BY id"))).scalars().all()
+    if not member_ids:
+        raise ValueError("No members to vote; seed the database first (python -m app.db.init_db)")
+    before = (await conn.execute(text("SELECT coalesce(max(id), 0) FROM proposals"))).scalar()
+    proposal_count = math.ceil(vote_count / len(member_ids))
+
+    await conn.execute(text(
+        "INSERT INTO proposals (title, content, status, submitted_date) "
+        "SELECT 'Query plan benchmark #' || g, '', 'PASSED', now() FROM generate_series(1, :count) g"
+    ), {"count": proposal_count})
+    await conn.execute(text(
+        "INSERT INTO votes (proposal_id, member_id, vote) "
+        "SELECT p.id, m.id, (ARRAY['FOR', 'AGAINST', 'ABSTAIN', 'ABSENT'])[1 + (p.id + m.id) % 4]::votetype "
+        "FROM proposals p CROSS JOIN members m WHERE p.id > :before"
+    ), {"before": before})
+    await conn.execute(text(
+        "INSERT INTO debates (proposal_id, title, date) SELECT id, title, now() FROM proposals WHERE id > :before"
+    ), {"before": before})
+    await conn.execute(text(
+        "INSERT INTO debate_entries (debate_id, member_id, content, timestamp) "
+        "SELECT d.id, (CAST(:member_ids AS integer[]))[1 + (d.id * 31 + g) % :member_count], 'Speech', "
+        "d.date + g * interval '1 minute' "
+        "FROM debates d CROSS JOIN generate_series(1, :speakers) g WHERE d.proposal_id > :before"
+    ), {"member_ids": list(member_ids), "member_count": len(member_ids), "speakers": speakers, "before": before})
+    await conn.execute(text("ANALYZE proposals, votes, debates, debate_entries"))
+
+    counts = {}
+    for table in ("votes", "debates", "debate_entries"):
+        counts[table] = (await conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar()
+    # Look up rows in the middle of the synthetic data (ids may have gaps, as sequences do not roll back)
+    proposal_id = (await conn.execute(
+        text("SELECT id FROM proposals WHERE id > :before ORDER BY id OFFSET :offset LIMIT 1"),
+        {"before": before, "offset": proposal_count // 2}
+    )).scalar()
+    counts["params"] = {
+        "proposal_id": proposal_id,
+        "member_id": member_ids[len(member_ids) // 2],
+        "debate_id": (await conn.execute(
+            text("SELECT id FROM debates WHERE proposal_id = :proposal_id"), {"proposal_id": proposal_id}
+        )).scalar(),
+    }
+    return counts
+
+async def run_query_plans(vote_count: int, speakers: int, runs: int) -> Dict[str, Any]:
+    """
+    Explain the vote and debate lookups on `vote_count` synthetic votes, with and without the indexes
+
+    Everything happens in one transaction that is rolled back, so the database is left as it
+    was; the index drops do lock the tables meanwhile, so use a development database.
+    """
+    report: Dict[str, Any] = {"queries": {}}
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            counts = await _populate(conn, vote_count, speakers)
+            params = counts.pop("params")
+            report["rows"] = counts
+            for label, sql in QUERIES.items():
+                query_params = {name: value for name, value in params.items() if f":{name}" in sql}
+                report["queries"][label] = {"indexed": await _explain(conn, sql, query_params, runs)}
+
+            for statement in DROP_INDEXES:
+                await conn.execute(text(statement))
+            for label, sql in QUERIES.items():
+                query_params = {name: value for name, value in params.items() if f":{name}" in sql}
+                report["queries"][label]["unindexed"] = await _explain(conn, sql, query_params, runs)
+        finally:
+            await transaction.rollback()
+    return report
+
+def print_report(report: Dict[str, Any], verbose: bool = False):
+    rows = report["rows"]
+    print(f"\n{rows['votes']} votes, {rows['debates']} debates, {rows['debate_entries']} debate entries "
+          f"(synthetic rows rolled back afterwards)")
+    for label, plans in report["queries"].items():
+        print(f"\n{label}")
+        for variant in ("indexed", "unindexed"):
+            scan, milliseconds, plan = plans[variant]
+            print(f"  {variant:<10} {milliseconds:9.3f} ms  {scan}")
+            if verbose:
+                for line in plan:
+                    print(f"    {line}")
+
+async def main(args):
+    try:
+        report = await run_query_plans(args.votes, args.speakers, args.runs)
+    finally:
+        await engine.dispose()
+    print_report(report, args.verbose)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare query plans of vote and debate lookups at scale")
+    parser.add_argument("--votes", type=int, default=1_000_000, help="Synthetic votes to add")
+    parser.add_argument("--speakers", type=int, default=15, help="Debate entries per synthetic debate")
+    parser.add_argument("--runs", type=int, default=5, help="Executions per query; the fastest counts")
+    parser.add_argument("--verbose", action="store_true", help="Print the full plans")
+    asyncio.run(main(parser.parse_args()))
@@ -1,6 +1,51 @@
-from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import base64
+import binascii
+import json
+from typing import Optional
 
+from fastapi import Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.pagination import Page
 from app.database import get_db
 
 # Add dependencies here that can be reused across the application
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(after: int) -> str:
+    """
+    Opaque page token for the rows behind key `after`
+    """
+    return base64.urlsafe_b64encode(json.dumps({"after": after}).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        after = data["after"]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    if isinstance(after, bool) or not isinstance(after, int):
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return after
+
+def cursor_after(
+    cursor: Optional[str] = Query(None, description=f"Token of the next page, from the {NEXT_CURSOR_HEADER} header")
+) -> Optional[int]:
+    """
+    The key a list endpoint's page starts after, from its `cursor` query parameter
+    """
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def with_next_cursor(response: Response, page: Page) -> Page:
+    """
+    Send the token of the page after `page`, if there is one, in the X-Next-Cursor header
+    """
+    if page.next_after is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(page.next_after)
+    return page
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from app.config import settings
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+def format_sse(event_type: str, data: Dict[str, Any]) -> str:
+    """
+    Encode one event in the text/event-stream wire format
+    """
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+class EventBroker(ABC):
+    """
+    Publish/subscribe of simulation events, keyed by proposal id
+
+    Subscribers get an asyncio.Queue of {"type", "proposal_id", "data"} events. Events are
+    dropped for a subscriber whose queue is full rather than slowing down the simulation.
+    """
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+
+    def _dispatch(self, event: Dict[str, Any]):
+        for queue in self._subscribers.get(event["proposal_id"], ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass
+
+    @abstractmethod
+    async def publish(self, proposal_id: int, event_type: str, data: Dict[str, Any]):
+        """
+        Deliver an event to the subscribers of `proposal_id`, in any process using the broker
+        """
+
+    async def _listen(self):
+        """
+        Make sure events from publishers reach this process's subscribers
+        """
+
+    @asynccontextmanager
+    async def subscribe(self, proposal_id: int) -> AsyncIterator[asyncio.Queue]:
+        await self._listen()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(proposal_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(proposal_id, set())
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(proposal_id, None)
+
+    async def startup(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+class MemoryBroker(EventBroker):
+    """
+    In-process broker; subscribers only see events of simulations run by the same process
+    """
+    async def publish(self, proposal_id: int, event_type: str, data: Dict[str, Any]):
+        self._dispatch({"type": event_type, "proposal_id": proposal_id, "data": data})
+
+class PostgresBroker(EventBroker):
+    """
+    Broker over Postgres LISTEN/NOTIFY, so API processes see events published by any worker
+    """
+    def __init__(self, dsn: str = None, channel: str = None, queue_size: int = 1000):
+        super().__init__(queue_size)
+        # asyncpg takes plain postgresql:// URLs, without the SQLAlchemy driver suffix
+        self.dsn = (dsn or settings.DATABASE_URL).replace("postgresql+asyncpg://", "postgresql://")
+        self.channel = channel or settings.EVENT_CHANNEL
+        self._publisher = None
+        self._listener = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _connect(self):
+        import asyncpg
+        return await asyncpg.connect(self.dsn)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            self._dispatch(json.loads(payload))
+        except ValueError as e:
+            print(f"Ignoring malformed simulation event: {str(e)}")
+
+    def _on_listener_closed(self, connection):
+        # Reconnect on the next subscription
+        self._listener = None
+
+    async def _listen(self):
+        async with self.lock:
+            if self._listener is not None and not self._listener.is_closed():
+                return
+            self._listener = await self._connect()
+            self._listener.add_termination_listener(self._on_listener_closed)
+            await self._listener.add_listener(self.channel, self._on_notification)
+
+    async def publish(self, proposal_id: int, event_type: str, data: Dict[str, Any]):
+        event = {"type": event_type, "proposal_id": proposal_id, "data": data}
+        payload = json.dumps(event, default=str)
+        if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT and "content" in data:
+            # Long speeches do not fit in a notification; subscribers can load the entry instead
+            event["data"] = {**data, "content": None, "truncated": True}
+            payload = json.dumps(event, default=str)
+
+        async with self.lock:
+            try:
+                if self._publisher is None or self._publisher.is_closed():
+                    self._publisher = await self._connect()
+                await self._publisher.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            except Exception:
+                self._publisher = None
+                raise
+
+    async def aclose(self):
+        for connection in (self._listener, self._publisher):
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        self._listener = None
+        self._publisher = None
+
+def create_broker(backend: str = None) -> EventBroker:
+    backend = (backend or settings.EVENT_BACKEND).lower()
+    if backend == "memory":
+        return MemoryBroker()
+    if backend == "postgres":
+        return PostgresBroker()
+    raise ValueError(f"Unknown event backend: {backend}")
+
+_default_broker: Optional[EventBroker] = None
+
+def get_broker() -> EventBroker:
+    global _default_broker
+    if _default_broker is None:
+        _default_broker = create_broker()
+    return _default_broker
@@ -1,11 +1,13 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
 from app.config import settings
-from app.database import engine, Base
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.dependencies import NEXT_CURSOR_HEADER
+from app.ai.client import get_default_client
+from app.events import get_broker
+from app.worker import SimulationWorker
+from app.database import engine
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -19,10 +21,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the next page token of list endpoints
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+async def startup():
+    # Open the shared LLM connection pool
+    await get_default_client().startup()
+    
+    # Run simulation workers inside the API process unless they are deployed separately
+    app.state.workers = [SimulationWorker() for _ in range(settings.EMBEDDED_WORKERS)]
+    app.state.worker_tasks = [asyncio.create_task(worker.run()) for worker in app.state.workers]
+
+@app.on_event("shutdown")
+async def shutdown():
+    for worker in app.state.workers:
+        worker.stop()
+    for task in app.state.worker_tasks:
+        task.cancel()
+    await asyncio.gather(*app.state.worker_tasks, return_exceptions=True)
+    
+    await get_default_client().aclose()
+    await get_broker().aclose()
+    await engine.dispose()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Dutch Parliament Simulator API"}
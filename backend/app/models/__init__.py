@@ -2,4 +2,9 @@ from app.models.party import Party
 from app.models.member import Member
 from app.models.proposal import Proposal, ProposalStatus
 from app.models.debate import Debate, DebateEntry
-from app.models.vote import Vote, VoteType
+from app.models.vote import Vote, VoteType, VoteTally
+from app.models.job import SimulationJob, JobStatus
+from app.models.batch import SimulationBatch
+from app.models.checkpoint import SimulationCheckpoint, SimulationStage
+from app.models.monte_carlo import MonteCarloRun
+from app.models.usage import TokenUsageRecord
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.database import Base
+
+class SimulationBatch(Base):
+    """A set of simulation jobs queued together for many proposals"""
+    __tablename__ = "simulation_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=True)
+    # Simulation settings shared by the batch's jobs
+    options = Column(JSON, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    jobs = relationship("SimulationJob", back_populates="batch")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum
+import enum
+from datetime import datetime
+
+from app.database import Base
+
+class SimulationStage(str, enum.Enum):
+    DEBATE = "debate"
+    SUMMARY = "summary"
+    VOTING = "voting"
+    COMPLETED = "completed"
+
+class SimulationCheckpoint(Base):
+    """Last completed point of a proposal's simulation, so an interrupted run can resume"""
+    __tablename__ = "simulation_checkpoints"
+
+    proposal_id = Column(Integer, ForeignKey("proposals.id", ondelete="CASCADE"), primary_key=True)
+    # Stage the run was in; everything before it is complete and persisted
+    stage = Column(Enum(SimulationStage), default=SimulationStage.DEBATE)
+    debate_id = Column(Integer, ForeignKey("debates.id"), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
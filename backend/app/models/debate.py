@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -8,16 +8,22 @@ class Debate(Base):
     __tablename__ = "debates"
 
     id = Column(Integer, primary_key=True, index=True)
-    proposal_id = Column(Integer, ForeignKey("proposals.id"))
+    proposal_id = Column(Integer, ForeignKey("proposals.id"), index=True)
     title = Column(String, index=True)
     date = Column(DateTime, default=datetime.utcnow)
+    summary = Column(Text, nullable=True)
     
     # Relationships
     proposal = relationship("Proposal", back_populates="debates")
-    entries = relationship("DebateEntry", back_populates="debate")
+    # In speaking order
+    entries = relationship("DebateEntry", back_populates="debate", order_by="DebateEntry.id")
 
 class DebateEntry(Base):
     __tablename__ = "debate_entries"
+    __table_args__ = (
+        # A debate's entries in speaking order
+        Index("ix_debate_entries_debate_id_timestamp", "debate_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     debate_id = Column(Integer, ForeignKey("debates.id"))
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum, JSON
+from sqlalchemy.orm import relationship
+import enum
+from datetime import datetime
+
+from app.database import Base
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class SimulationJob(Base):
+    __tablename__ = "simulation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    proposal_id = Column(Integer, ForeignKey("proposals.id", ondelete="CASCADE"), index=True)
+    batch_id = Column(Integer, ForeignKey("simulation_batches.id"), nullable=True, index=True)
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, index=True)
+    # Simulation settings for this run, e.g. voting_mode and fresh
+    options = Column(JSON, default=dict)
+    
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    stage = Column(String, nullable=True)
+    progress = Column(Float, default=0.0)
+    error = Column(Text, nullable=True)
+    # LLM requests made over all attempts
+    llm_calls = Column(Integer, default=0)
+    
+    # Worker holding the job and its last sign of life
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    proposal = relationship("Proposal")
+    batch = relationship("SimulationBatch", back_populates="jobs")
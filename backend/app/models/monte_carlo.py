@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.database import Base
+
+class MonteCarloRun(Base):
+    """Outcome estimate of a proposal from many sampled vote rounds"""
+    __tablename__ = "monte_carlo_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    proposal_id = Column(Integer, ForeignKey("proposals.id", ondelete="CASCADE"), index=True)
+    # Debate whose summary the rounds voted on; empty for the local ideology model
+    debate_id = Column(Integer, ForeignKey("debates.id"), nullable=True)
+    method = Column(String)
+    rounds = Column(Integer)
+    
+    pass_count = Column(Integer)
+    pass_probability = Column(Float)
+    # 95% Wilson interval of the pass probability
+    ci_low = Column(Float)
+    ci_high = Column(Float)
+    mean_for = Column(Float)
+    mean_against = Column(Float)
+    mean_abstain = Column(Float)
+    mean_absent = Column(Float)
+    # Per-round for/against/abstain/absent counts, packed as little-endian uint16
+    tallies = Column(LargeBinary)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    proposal = relationship("Proposal")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+
+from app.database import Base
+
+class TokenUsageRecord(Base):
+    """LLM tokens spent on one stage of a proposal's simulation run"""
+    __tablename__ = "token_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    proposal_id = Column(Integer, ForeignKey("proposals.id", ondelete="CASCADE"), index=True)
+    # Debate the run belonged to; a resumed run adds rows to the same debate
+    debate_id = Column(Integer, ForeignKey("debates.id"), nullable=True, index=True)
+    # debate, summary, voting or monte_carlo
+    stage = Column(String)
+    requests = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cached_tokens = Column(Integer, default=0)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Enum
+from sqlalchemy import Column, Integer, ForeignKey, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 import enum
 
@@ -12,6 +12,10 @@ class VoteType(str, enum.Enum):
 
 class Vote(Base):
     __tablename__ = "votes"
+    __table_args__ = (
+        # One vote per member per proposal; also the conflict target for bulk upserts
+        UniqueConstraint("proposal_id", "member_id", name="uq_votes_proposal_member"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     proposal_id = Column(Integer, ForeignKey("proposals.id"))
@@ -21,3 +25,13 @@ class Vote(Base):
     # Relationships
     proposal = relationship("Proposal", back_populates="votes")
     member = relationship("Member", back_populates="votes")
+
+class VoteTally(Base):
+    """Running vote counts per proposal, kept up to date by the vote CRUD functions"""
+    __tablename__ = "vote_tallies"
+
+    proposal_id = Column(Integer, ForeignKey("proposals.id", ondelete="CASCADE"), primary_key=True)
+    for_votes = Column(Integer, nullable=False, default=0, server_default="0")
+    against_votes = Column(Integer, nullable=False, default=0, server_default="0")
+    abstain_votes = Column(Integer, nullable=False, default=0, server_default="0")
+    absent_votes = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,5 +1,16 @@
-from app.schemas.party import Party, PartyCreate, PartyWithMembers, PartyBasic
-from app.schemas.member import Member, MemberCreate, MemberWithParty, MemberBasic
-from app.schemas.proposal import Proposal, ProposalCreate, ProposalDetail
+from app.schemas.party import Party, PartyCreate, PartyWithMembers
+from app.schemas.member import Member, MemberCreate, MemberWithParty, MemberBasic, PartyBasic
+from app.schemas.proposal import Proposal, ProposalCreate, ProposalDetail, ProposalWithSummary
 from app.schemas.debate import Debate, DebateCreate, DebateDetail, DebateEntry, DebateEntryCreate, DebateEntryWithMember
 from app.schemas.vote import Vote, VoteCreate, VoteSummary
+from app.schemas.job import SimulationJob
+from app.schemas.batch import (
+    SimulationBatch, SimulationBatchCreate, SimulationBatchCreated, SimulationBatchReport,
+    BatchProposalResult, BatchThroughput, SkippedProposal
+)
+from app.schemas.monte_carlo import MonteCarloRun, MonteCarloRunDetail
+from app.schemas.usage import TokenCounts, StageTokenUsage, ProposalTokenUsage
+
+# Resolve the forward references between the party and member schemas
+MemberWithParty.update_forward_refs(PartyBasic=PartyBasic)
+PartyWithMembers.update_forward_refs(MemberBasic=MemberBasic)
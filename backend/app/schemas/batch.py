@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from app.models.proposal import ProposalStatus
+from app.schemas.job import SimulationJob
+from app.schemas.vote import VoteSummary
+
+class SimulationBatchCreate(BaseModel):
+    # Proposals to simulate; without ids, every proposal in `status` (draft or submitted) is taken
+    proposal_ids: Optional[List[int]] = None
+    status: Optional[ProposalStatus] = None
+    limit: Optional[int] = None
+    name: Optional[str] = None
+    fresh: bool = False
+    voting_mode: Optional[str] = None
+    # Tokens each simulation may spend; None uses SIMULATION_TOKEN_BUDGET, 0 is unlimited
+    token_budget: Optional[int] = None
+
+class SimulationBatch(BaseModel):
+    id: int
+    name: Optional[str] = None
+    options: Dict[str, Any] = {}
+    created_at: datetime
+    
+    class Config:
+        orm_mode = True
+
+class SkippedProposal(BaseModel):
+    proposal_id: int
+    reason: str
+
+class SimulationBatchCreated(BaseModel):
+    batch: SimulationBatch
+    queued: List[int]
+    skipped: List[SkippedProposal]
+
+class BatchProposalResult(BaseModel):
+    proposal_id: int
+    title: str
+    status: ProposalStatus
+    job: SimulationJob
+    vote_summary: Optional[VoteSummary] = None
+
+class BatchThroughput(BaseModel):
+    llm_calls: int
+    elapsed_seconds: float
+    llm_calls_per_second: float
+    proposals_per_minute: float
+
+class SimulationBatchReport(SimulationBatch):
+    jobs_by_status: Dict[str, int]
+    throughput: BatchThroughput
+    proposals: List[BatchProposalResult]
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from app.schemas.member import MemberWithParty
+from app.schemas.proposal import Proposal
 
 class DebateEntryBase(BaseModel):
     member_id: int
@@ -18,7 +20,7 @@ class DebateEntry(DebateEntryBase):
         orm_mode = True
 
 class DebateEntryWithMember(DebateEntry):
-    member: dict
+    member: MemberWithParty
     
     class Config:
         orm_mode = True
@@ -33,13 +35,14 @@ class DebateCreate(DebateBase):
 class Debate(DebateBase):
     id: int
     date: datetime
+    summary: Optional[str] = None
     
     class Config:
         orm_mode = True
 
 class DebateDetail(Debate):
     entries: List[DebateEntryWithMember] = []
-    proposal: dict
+    proposal: Proposal
     
     class Config:
         orm_mode = True
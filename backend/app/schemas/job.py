@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+from app.models.job import JobStatus
+
+class SimulationJob(BaseModel):
+    id: int
+    proposal_id: int
+    batch_id: Optional[int] = None
+    status: JobStatus
+    options: Dict[str, Any] = {}
+    attempts: int
+    max_attempts: int
+    stage: Optional[str] = None
+    progress: float
+    error: Optional[str] = None
+    llm_calls: int = 0
+    worker_id: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class MonteCarloRun(BaseModel):
+    id: int
+    proposal_id: int
+    debate_id: Optional[int] = None
+    method: str
+    rounds: int
+    pass_count: int
+    pass_probability: float
+    ci_low: float
+    ci_high: float
+    mean_for: float
+    mean_against: float
+    mean_abstain: float
+    mean_absent: float
+    created_at: datetime
+    
+    class Config:
+        orm_mode = True
+
+class MonteCarloRunDetail(MonteCarloRun):
+    # For/against/abstain/absent counts of every round
+    round_tallies: List[List[int]] = []
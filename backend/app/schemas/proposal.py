@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from app.models.proposal import ProposalStatus
+from app.schemas.vote import VoteSummary
 
 class ProposalBase(BaseModel):
     title: str
@@ -20,6 +21,12 @@ class Proposal(ProposalBase):
     class Config:
         orm_mode = True
 
+class ProposalWithSummary(Proposal):
+    votes_summary: Optional[VoteSummary] = None
+    
+    class Config:
+        orm_mode = True
+
 class ProposalDetail(Proposal):
     proposer: Dict[str, Any]
     votes_summary: Optional[Dict[str, int]] = None
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+class TokenCounts(BaseModel):
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cached_tokens: int = 0
+
+class StageTokenUsage(TokenCounts):
+    debate_id: Optional[int] = None
+    # debate, summary, voting or monte_carlo
+    stage: str
+
+class ProposalTokenUsage(BaseModel):
+    proposal_id: int
+    total: TokenCounts
+    stages: List[StageTokenUsage] = []
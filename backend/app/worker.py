@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import os
+import socket
+import time
+import traceback
+import uuid
+from typing import Dict, Optional
+
+from app import crud
+from app.ai.agents import ParliamentaryAgent
+from app.ai.client import get_default_client
+from app.ai.monte_carlo import MonteCarloEstimator
+from app.ai.rate_limit import LLMScheduler, get_default_scheduler
+from app.ai.simulation import ParliamentSimulation
+from app.ai.usage import track_usage
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.events import get_broker
+from app.models.job import JobStatus
+
+class SimulationWorker:
+    """
+    Claims simulation jobs from the simulation_jobs table and runs them
+
+    Any number of workers can run side by side, in one process or across hosts;
+    jobs are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`.
+    """
+    def __init__(self, worker_id: Optional[str] = None, concurrency: int = None,
+                 poll_interval: float = None, scheduler: LLMScheduler = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(1, concurrency or settings.WORKER_CONCURRENCY)
+        self.poll_interval = poll_interval or settings.WORKER_POLL_INTERVAL
+        # All jobs of the process share one scheduler, so their LLM requests fill the same limits
+        self.scheduler = scheduler or get_default_scheduler()
+        self._running: Dict[int, asyncio.Task] = {}
+        self._stopping = False
+
+    async def _publish(self, proposal_id: int, event_type: str, data: Dict):
+        try:
+            await get_broker().publish(proposal_id, event_type, data)
+        except Exception as e:
+            print(f"Worker {self.worker_id} could not publish {event_type} event: {str(e)}")
+
+    def _event_publisher(self, proposal_id: int):
+        """
+        Event callback for a job's simulation, publishing to the proposal's subscribers
+        """
+        async def publish(event_type: str, data: Dict):
+            await self._publish(proposal_id, event_type, data)
+
+        return publish
+
+    def _progress_reporter(self, job_id: int, proposal_id: int):
+        """
+        Progress callback for a job's simulation, writing and publishing at most once a second per stage
+        """
+        lock = asyncio.Lock()
+        last = {"stage": None, "time": 0.0}
+
+        async def report(stage: str, progress: float):
+            now = time.monotonic()
+            if stage == last["stage"] and now - last["time"] < 1.0:
+                return
+            last.update(stage=stage, time=now)
+            # Progress is reported from concurrent tasks, so each write gets its own session
+            async with lock, SessionLocal() as db:
+                await crud.update_job_progress(db, job_id, stage, progress)
+            await self._publish(proposal_id, "progress", {"job_id": job_id, "stage": stage, "progress": progress})
+
+        return report
+
+    async def run_job(self, job):
+        """
+        Run one claimed job to completion and record the outcome
+        """
+        options = job.options or {}
+        monte_carlo = options.get("monte_carlo")
+        if monte_carlo:
+            # Sampled vote rounds only; the proposal's status is left alone
+            runner = MonteCarloEstimator(
+                scheduler=self.scheduler,
+                on_progress=self._progress_reporter(job.id, job.proposal_id)
+            )
+        else:
+            runner = ParliamentSimulation(
+                agent=ParliamentaryAgent(use_cache=not options.get("fresh", False)),
+                voting_mode=options.get("voting_mode"),
+                token_budget=options.get("token_budget"),
+                scheduler=self.scheduler,
+                on_progress=self._progress_reporter(job.id, job.proposal_id),
+                on_event=self._event_publisher(job.proposal_id)
+            )
+        await self._publish(job.proposal_id, "job", {
+            "id": job.id, "status": JobStatus.RUNNING, "attempts": job.attempts
+        })
+        try:
+            with track_usage() as usage:
+                async with SessionLocal() as db:
+                    if monte_carlo:
+                        await runner.run(job.proposal_id, crud.SimulationStore(db), monte_carlo["rounds"],
+                                         monte_carlo.get("method", "batch"))
+                    else:
+                        await runner.run_full_simulation(job.proposal_id, crud.SimulationStore(db))
+        except Exception as e:
+            traceback.print_exc()
+            async with SessionLocal() as db:
+                db_job = await crud.fail_job(db, job.id, f"{type(e).__name__}: {str(e)}", runner.llm_calls)
+            # A failed attempt that is queued again keeps the job alive for subscribers
+            await self._publish(job.proposal_id, "job", {
+                "id": job.id, "status": db_job.status, "attempts": db_job.attempts, "error": db_job.error
+            })
+        else:
+            async with SessionLocal() as db:
+                await crud.complete_job(db, job.id, runner.llm_calls)
+            stats = self.scheduler.stats()
+            client = get_default_client().metrics()
+            print(f"Worker {self.worker_id} finished job {job.id} with {runner.llm_calls} LLM calls "
+                  f"({stats['calls_per_second']:.2f} calls/s, {stats['in_flight']} in flight, "
+                  f"concurrency limit {client['concurrency_limit']}, {client['throttled']} throttled, "
+                  f"{client['retries']} retries; {usage.prompt_tokens} prompt tokens, {usage.prefix_tokens} "
+                  f"in shared prefixes, {usage.cached_tokens} cached)")
+            if monte_carlo and runner.failed_batches + runner.member_fallbacks:
+                print(f"Worker {self.worker_id} asked {runner.member_fallbacks} members individually in job "
+                      f"{job.id} after {runner.failed_batches} failed batches and incomplete batch replies")
+            await self._publish(job.proposal_id, "job", {"id": job.id, "status": JobStatus.SUCCEEDED})
+        finally:
+            self._running.pop(job.id, None)
+
+    async def _heartbeat(self):
+        """
+        Keep this worker's jobs alive and requeue jobs abandoned by dead workers
+        """
+        while True:
+            try:
+                async with SessionLocal() as db:
+                    await crud.heartbeat_jobs(db, list(self._running))
+                    requeued = await crud.requeue_stale_jobs(db, settings.JOB_STALE_AFTER)
+                if requeued:
+                    print(f"Worker {self.worker_id} requeued {requeued} stale job(s)")
+            except Exception as e:
+                print(f"Worker {self.worker_id} heartbeat failed: {str(e)}")
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+
+    async def run(self):
+        """
+        Poll for jobs until stopped, running up to `concurrency` of them at once
+        """
+        print(f"Worker {self.worker_id} started with concurrency {self.concurrency}")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while not self._stopping:
+                job = None
+                if len(self._running) < self.concurrency:
+                    try:
+                        async with SessionLocal() as db:
+                            job = await crud.claim_job(db, self.worker_id)
+                    except Exception as e:
+                        print(f"Worker {self.worker_id} could not claim a job: {str(e)}")
+                if job is not None:
+                    print(f"Worker {self.worker_id} running job {job.id} for proposal {job.proposal_id}")
+                    self._running[job.id] = asyncio.create_task(self.run_job(job))
+                else:
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            heartbeat.cancel()
+            # Jobs still running are cancelled; their heartbeats stop and another worker picks them up
+            tasks = [heartbeat, *self._running.values()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        self._stopping = True
+
+async def main(concurrency: int = None, worker_id: str = None):
+    worker = SimulationWorker(worker_id=worker_id, concurrency=concurrency)
+    await get_default_client().startup()
+    try:
+        await worker.run()
+    finally:
+        await get_default_client().aclose()
+        await get_broker().aclose()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run simulation jobs from the job queue")
+    parser.add_argument("--concurrency", type=int, default=None, help="Jobs to run at once")
+    parser.add_argument("--worker-id", default=None, help="Identifier recorded on claimed jobs")
+    args = parser.parse_args()
+    asyncio.run(main(concurrency=args.concurrency, worker_id=args.worker_id))
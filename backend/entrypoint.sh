@@ -14,9 +14,9 @@ if [ "$1" = "--init-db" ]; then
     exit 0
 fi
 
-# Run database migrations (if applicable)
-# Uncomment and adjust if using Alembic or another migration tool
-# alembic upgrade head
+# Bring the database schema up to date (alembic upgrade head)
+echo "Running database migrations..."
+python -m app.db.migrate || exit 1
 
 # Run the command passed to docker
 exec "$@"
\ No newline at end of file
@@ -0,0 +1,44 @@
+import pytest
+
+from app.ai.agents import parse_batch_votes
+from app.models.vote import VoteType
+
+MEMBER_IDS = {1, 2, 3}
+
+def test_parses_every_member():
+    response = '[{"member_id": 1, "vote": "FOR"}, {"member_id": 2, "vote": "against"}, {"member_id": 3, "vote": " Abstain "}]'
+    assert parse_batch_votes(response, MEMBER_IDS) == {1: VoteType.FOR, 2: VoteType.AGAINST, 3: VoteType.ABSTAIN}
+
+def test_list_wrapped_in_prose_or_a_code_fence():
+    response = 'Here are the votes:\n```json\n[{"member_id": "2", "vote": "FOR"}]\n```\nThat is all.'
+    assert parse_batch_votes(response, MEMBER_IDS) == {2: VoteType.FOR}
+
+@pytest.mark.parametrize("response", [
+    "",
+    "FOR",
+    "[not json]",
+    '[{"member_id": 1, "vote": "FOR"}',
+    '{"member_id": 1, "vote": "FOR"}',
+    '[[1, "FOR"], "2: AGAINST", null]',
+])
+def test_malformed_output_gives_no_votes(response):
+    assert parse_batch_votes(response, MEMBER_IDS) == {}
+
+def test_partial_output_leaves_the_missing_members_out():
+    response = '[{"member_id": 1, "vote": "FOR"}, {"member_id": 2}, {"vote": "AGAINST"}]'
+    assert parse_batch_votes(response, MEMBER_IDS) == {1: VoteType.FOR}
+
+def test_invalid_items_are_skipped():
+    response = ('[{"member_id": "two", "vote": "FOR"}, {"member_id": null, "vote": "FOR"},'
+                ' {"member_id": 2, "vote": "MAYBE"}, {"member_id": 3, "vote": "ABSENT"}, {"member_id": 1, "vote": "FOR"}]')
+    assert parse_batch_votes(response, MEMBER_IDS) == {1: VoteType.FOR}
+
+def test_unknown_member_ids_are_ignored():
+    response = '[{"member_id": 1, "vote": "FOR"}, {"member_id": 99, "vote": "AGAINST"}]'
+    assert parse_batch_votes(response, MEMBER_IDS) == {1: VoteType.FOR}
+
+def test_duplicates():
+    # Repeating the same vote is harmless; contradicting votes leave the member out
+    response = ('[{"member_id": 1, "vote": "FOR"}, {"member_id": 1, "vote": "FOR"},'
+                ' {"member_id": 2, "vote": "FOR"}, {"member_id": 2, "vote": "AGAINST"}, {"member_id": 2, "vote": "FOR"}]')
+    assert parse_batch_votes(response, MEMBER_IDS) == {1: VoteType.FOR}
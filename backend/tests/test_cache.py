@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.ai import cache as cache_module
+from app.ai.cache import MemoryCache, ResponseCache, make_cache_key
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "time", clock.time)
+    return clock
+
+def test_cache_without_backend_methods_cannot_be_created():
+    class IncompleteCache(ResponseCache):
+        async def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteCache()
+
+def test_least_recently_used_entry_is_evicted_at_capacity():
+    async def main():
+        cache = MemoryCache(max_entries=2)
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        # Reading "a" makes "b" the least recently used entry
+        assert await cache.get("a") == "1"
+        await cache.set("c", "3")
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "1"
+        assert await cache.get("c") == "3"
+        assert cache.stats()["entries"] == 2
+
+    asyncio.run(main())
+
+def test_entries_are_evicted_to_stay_within_max_bytes():
+    async def main():
+        cache = MemoryCache(max_bytes=10)
+        await cache.set("a", "x" * 6)
+        await cache.set("b", "y" * 6)
+        assert await cache.get("a") is None
+        assert await cache.get("b") == "y" * 6
+        # Values larger than the whole cache are not stored
+        await cache.set("c", "z" * 11)
+        assert await cache.get("c") is None
+        assert cache.stats()["bytes"] == 6
+
+    asyncio.run(main())
+
+def test_entries_expire_after_the_ttl(clock):
+    async def main():
+        cache = MemoryCache(ttl=60)
+        await cache.set("a", "1")
+        clock.now += 60
+        assert await cache.get("a") == "1"
+        clock.now += 1
+        assert await cache.get("a") is None
+        assert cache.stats()["entries"] == 0
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    asyncio.run(main())
+
+def test_cache_key_covers_every_request_parameter():
+    key = make_cache_key("model", "prompt", 0.7, 100)
+    assert key == make_cache_key("model", "prompt", 0.7, 100)
+    assert len({key, make_cache_key("other", "prompt", 0.7, 100), make_cache_key("model", "other", 0.7, 100),
+                make_cache_key("model", "prompt", 0.0, 100), make_cache_key("model", "prompt", 0.7, 50)}) == 5
@@ -0,0 +1,49 @@
+import base64
+from typing import Optional
+
+import pytest
+from fastapi import Depends, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.crud.pagination import Page
+from app.dependencies import NEXT_CURSOR_HEADER, cursor_after, decode_cursor, encode_cursor, with_next_cursor
+
+app = FastAPI()
+
+@app.get("/items")
+def read_items(response: Response, after: Optional[int] = Depends(cursor_after)):
+    start = after or 0
+    return with_next_cursor(response, Page(range(start + 1, start + 3), next_after=start + 2))
+
+client = TestClient(app)
+
+@pytest.mark.parametrize("after", [0, 1, 123456789, -5])
+def test_cursor_round_trip(after):
+    cursor = encode_cursor(after)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == after
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor(10)[:-2],
+    _b64('{"after": "10"}'),
+    _b64('{"after": true}'),
+    _b64('{"before": 10}'),
+    _b64("[10]"),
+    "",
+])
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+    response = client.get("/items", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
+
+def test_next_cursor_continues_the_listing():
+    first = client.get("/items")
+    assert first.json() == [1, 2]
+    second = client.get("/items", params={"cursor": first.headers[NEXT_CURSOR_HEADER]})
+    assert second.json() == [3, 4]
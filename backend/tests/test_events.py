@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from app.events import EventBroker, MemoryBroker, format_sse
+
+def test_broker_without_publish_cannot_be_created():
+    class IncompleteBroker(EventBroker):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBroker()
+
+def test_memory_broker_delivers_to_subscribers_of_the_proposal():
+    async def main():
+        broker = MemoryBroker()
+        async with broker.subscribe(1) as queue, broker.subscribe(2) as other:
+            await broker.publish(1, "vote", {"member_id": 7, "vote": "for"})
+            assert queue.get_nowait() == {"type": "vote", "proposal_id": 1, "data": {"member_id": 7, "vote": "for"}}
+            assert other.empty()
+        assert not broker._subscribers
+
+    asyncio.run(main())
+
+def test_format_sse():
+    assert format_sse("summary", {"text": "<b>"}) == 'event: summary\ndata: {"text": "<b>"}\n\n'
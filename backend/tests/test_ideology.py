@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from app.ai.ideology import (
+    ABSTAIN, AGAINST, FOR, IdeologyVoteModel, ProposalPosition, parse_proposal_position, tally_vote_codes
+)
+from app.models.vote import VoteType
+
+def _member(member_id: int, economic: float, social: float = 50.0, eu: float = 50.0) -> dict:
+    return {"id": member_id, "economic_leaning": economic, "social_leaning": social, "eu_stance": eu}
+
+def test_thresholds_decide_the_deterministic_votes():
+    model = IdeologyVoteModel(for_threshold=20, against_threshold=30)
+    # Only the economic axis counts, so distances are 0, 20, 25, 30 and 31
+    position = ProposalPosition(position=np.array([50.0, 50.0, 50.0]), weights=np.array([1.0, 0.0, 0.0]))
+    members = [_member(i, economic) for i, economic in enumerate((50, 70, 25, 80, 81))]
+    assert model.compute_votes(members, position) == [
+        VoteType.FOR, VoteType.FOR, VoteType.ABSTAIN, VoteType.ABSTAIN, VoteType.AGAINST
+    ]
+
+def test_distances_are_weighted_per_axis():
+    model = IdeologyVoteModel()
+    members = np.array([[60.0, 0.0, 50.0]])
+    positions = np.array([[50.0, 50.0, 50.0], [50.0, 50.0, 50.0]])
+    weights = np.array([[1.0, 0.0, 0.0], [1.0, 1.0, 0.0]])
+    assert model.distances(members, positions, weights)[:, 0] == pytest.approx([10.0, np.sqrt((100 + 2500) / 2)])
+
+def test_vote_probabilities_sum_to_one():
+    model = IdeologyVoteModel(for_threshold=20, against_threshold=22, noise=10)
+    probabilities = model.vote_probabilities(np.linspace(0, 100, 51))
+    assert probabilities.sum(axis=-1) == pytest.approx(np.ones(51))
+    assert (probabilities >= 0).all()
+    # Close members mostly vote FOR, distant ones AGAINST
+    assert probabilities[0].argmax() == FOR
+    assert probabilities[-1].argmax() == AGAINST
+
+def test_seeded_sampling_is_reproducible_and_follows_the_probabilities():
+    model = IdeologyVoteModel(for_threshold=20, against_threshold=30, noise=5)
+    distances = np.array([0.0, 20.0, 25.0, 30.0, 60.0])
+    first = model.sample_vote_codes(distances, 20000, np.random.default_rng(42))
+    second = model.sample_vote_codes(distances, 20000, np.random.default_rng(42))
+    assert first.shape == (20000, 5)
+    np.testing.assert_array_equal(first, second)
+
+    frequencies = np.stack([(first == code).mean(axis=0) for code in (FOR, AGAINST, ABSTAIN)], axis=1)
+    np.testing.assert_allclose(frequencies, model.vote_probabilities(distances), atol=0.015)
+    # A member far past the against threshold practically always votes AGAINST
+    assert (first[:, 4] == AGAINST).mean() > 0.99
+
+def test_tally_vote_codes():
+    codes = np.array([[FOR, FOR, AGAINST], [ABSTAIN, AGAINST, AGAINST]], dtype=np.int8)
+    np.testing.assert_array_equal(tally_vote_codes(codes), [[2, 1, 0], [0, 2, 1]])
+
+def test_invalid_model_parameters():
+    with pytest.raises(ValueError):
+        IdeologyVoteModel(for_threshold=40, against_threshold=30)
+    with pytest.raises(ValueError):
+        IdeologyVoteModel(noise=0)
+
+def test_parse_proposal_position():
+    position = parse_proposal_position(
+        'Classification: {"economic": 120, "social": 40, "eu": -5, "economic_weight": 0.5, "social_weight": 2}'
+    )
+    np.testing.assert_array_equal(position.position, [100, 40, 0])
+    np.testing.assert_array_equal(position.weights, [0.5, 1, 1])
+    assert parse_proposal_position('{"economic": 50, "social": 50, "eu": 50, "economic_weight": 0, '
+                                   '"social_weight": 0, "eu_weight": 0}').weights.tolist() == [1, 1, 1]
+    assert parse_proposal_position("no idea") is None
+    assert parse_proposal_position('{"economic": 50}') is None
@@ -0,0 +1,61 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.ai.client import LLMRequestError, LLMUnavailableError
+from app.ai.monte_carlo import TALLY_COLUMNS, MonteCarloEstimator
+from app.models.vote import VoteType
+
+MEMBERS = [{"id": i, "name": f"Member {i}"} for i in range(1, 7)]
+PROPOSAL = {"title": "Test proposal", "content": ""}
+
+class StubAgent:
+    """
+    Batch replies that fail or leave members out, and individual votes that are always FOR
+    """
+    def __init__(self, batch_error: Exception = None, vote_error: Exception = None):
+        self.batch_error = batch_error
+        self.vote_error = vote_error
+        self.batch_calls = 0
+        self.vote_calls = 0
+
+    async def generate_votes_batch(self, batch, proposal_data, debate_summary):
+        self.batch_calls += 1
+        if self.batch_error is not None and self.batch_calls % 2:
+            raise self.batch_error
+        # Only the first member of the batch is answered
+        return {batch[0]["id"]: VoteType.AGAINST}
+
+    async def generate_vote(self, member, proposal_data, debate_summary):
+        self.vote_calls += 1
+        if self.vote_error is not None:
+            raise self.vote_error
+        return VoteType.FOR
+
+def _estimator(agent: StubAgent) -> MonteCarloEstimator:
+    return MonteCarloEstimator(agent=agent, vote_batch_size=3, rng=np.random.default_rng(0))
+
+def test_members_left_out_of_a_batch_vote_individually():
+    agent = StubAgent(batch_error=ValueError("unparseable reply"))
+    estimator = _estimator(agent)
+    tallies = asyncio.run(estimator.sample_batch(MEMBERS, PROPOSAL, "Summary", rounds=4))
+
+    # No member ends up absent: every round has all six votes
+    assert (tallies[:, TALLY_COLUMNS[VoteType.ABSENT]] == 0).all()
+    assert (tallies.sum(axis=1) == len(MEMBERS)).all()
+    # 8 batch requests, every other one failing outright; the rest answer one member of three
+    assert estimator.failed_batches == 4
+    assert estimator.member_fallbacks == 4 * 3 + 4 * 2
+    assert agent.vote_calls == estimator.member_fallbacks
+    assert tallies[:, TALLY_COLUMNS[VoteType.AGAINST]].sum() == 4
+
+def test_unavailable_provider_fails_the_run():
+    agent = StubAgent(batch_error=LLMUnavailableError("throttled", 429))
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(_estimator(agent).sample_batch(MEMBERS, PROPOSAL, "Summary", rounds=2))
+
+def test_failed_individual_vote_fails_the_run():
+    agent = StubAgent(vote_error=LLMRequestError("bad request", 400))
+    with pytest.raises(LLMRequestError):
+        asyncio.run(_estimator(agent).sample_batch(MEMBERS, PROPOSAL, "Summary", rounds=2))
@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db.query_counter import assert_max_queries, count_queries
+
+@pytest.fixture
+def engine():
+    # The counter only uses the sync engine below an AsyncEngine, so SQLite stands in for Postgres
+    sync_engine = create_engine("sqlite://")
+    yield SimpleNamespace(sync_engine=sync_engine)
+    sync_engine.dispose()
+
+def _run(engine, statements: int):
+    with engine.sync_engine.connect() as conn:
+        for _ in range(statements):
+            conn.execute(text("SELECT 1"))
+
+def test_counts_statements_in_the_block(engine):
+    _run(engine, 2)
+    with count_queries(engine) as outer:
+        _run(engine, 3)
+        with count_queries(engine) as inner:
+            _run(engine, 1)
+    _run(engine, 2)
+    assert (outer.count, inner.count) == (4, 1)
+
+def test_assert_max_queries(engine):
+    with assert_max_queries(3, engine) as counter:
+        _run(engine, 3)
+    assert counter.count == 3
+
+    with pytest.raises(AssertionError, match="at most 2 queries, got 3"):
+        with assert_max_queries(2, engine):
+            _run(engine, 3)
+
+def test_concurrent_tasks_count_separately(engine):
+    async def task(statements: int) -> int:
+        with count_queries(engine) as counter:
+            for _ in range(statements):
+                _run(engine, 1)
+                # Let the other task run its statements in between
+                await asyncio.sleep(0)
+        return counter.count
+
+    async def main():
+        with count_queries(engine) as total:
+            counts = await asyncio.gather(task(2), task(5))
+        return counts, total.count
+
+    assert asyncio.run(main()) == ([2, 5], 7)
@@ -0,0 +1,110 @@
+"""
+The detail endpoints load their related rows eagerly, so the number of queries they run does not
+grow with the length of a debate or the size of a party
+
+The tests need the database of ASYNC_DATABASE_URL (migrated to the current schema); the rows they
+seed are rolled back afterwards.
+"""
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import get_db
+from app.db.query_counter import assert_max_queries
+from app.main import app
+from app.models.debate import Debate, DebateEntry
+from app.models.member import Member
+from app.models.party import Party
+from app.models.proposal import Proposal, ProposalStatus
+from app.models.vote import Vote, VoteType
+
+SMALL = 3
+LARGE = 150
+
+async def _seed(db: AsyncSession, size: int) -> dict:
+    """
+    A party of `size` members, and a proposal in voting with a debate of `size` speeches and `size` votes
+    """
+    tag = uuid.uuid4().hex[:8]
+    party = Party(name=f"Test party {tag}", abbreviation=tag, ideology="Centre", description="")
+    db.add(party)
+    await db.flush()
+
+    members = [
+        Member(name=f"Member {i}", party_id=party.id, role="Member", economic_leaning=50,
+               social_leaning=50, eu_stance=50, bio="")
+        for i in range(size)
+    ]
+    db.add_all(members)
+    await db.flush()
+
+    proposal = Proposal(title="Test proposal", content="", proposer_id=members[0].id, status=ProposalStatus.VOTING)
+    db.add(proposal)
+    await db.flush()
+
+    debate = Debate(proposal_id=proposal.id, title="Test debate", summary="")
+    db.add(debate)
+    await db.flush()
+
+    db.add_all([DebateEntry(debate_id=debate.id, member_id=member.id, content="Speech") for member in members])
+    db.add_all([Vote(proposal_id=proposal.id, member_id=member.id, vote=VoteType.FOR) for member in members])
+    await db.flush()
+
+    ids = {"party": party.id, "proposal": proposal.id, "debate": debate.id}
+    # Read everything back from the database, not from the session's identity map
+    db.expunge_all()
+    return ids
+
+async def _count_request_queries(path: str, limit: int) -> int:
+    """
+    Seed a small and a large data set and GET `path` for both, each within `limit` queries
+
+    Returns the number of queries of the large data set, after checking it equals the small one's.
+    """
+    engine = create_async_engine(settings.ASYNC_DATABASE_URL, poolclass=NullPool)
+    counts = []
+    try:
+        for size in (SMALL, LARGE):
+            async with engine.connect() as conn:
+                transaction = await conn.begin()
+                db = AsyncSession(bind=conn, expire_on_commit=False)
+
+                async def override_get_db():
+                    yield db
+
+                app.dependency_overrides[get_db] = override_get_db
+                try:
+                    ids = await _seed(db, size)
+                    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                        with assert_max_queries(limit, engine) as counter:
+                            response = await client.get(path.format(**ids))
+                    assert response.status_code == 200, response.text
+                    counts.append(counter.count)
+                finally:
+                    app.dependency_overrides.pop(get_db, None)
+                    await db.close()
+                    await transaction.rollback()
+    except OSError as e:
+        pytest.skip(f"Database not available: {e}")
+    finally:
+        await engine.dispose()
+
+    assert counts[0] == counts[1], f"{counts[0]} queries for {SMALL} rows, but {counts[1]} for {LARGE}"
+    return counts[1]
+
+def test_read_debate_queries():
+    # The debate with its proposal, then its entries with their members and parties
+    asyncio.run(_count_request_queries("/api/v1/debates/{debate}", 2))
+
+def test_read_party_queries():
+    # The party, then its members
+    asyncio.run(_count_request_queries("/api/v1/parties/{party}", 2))
+
+def test_read_proposal_queries():
+    # The proposal with its proposer and party, then its vote tally and (without one) the vote counts
+    asyncio.run(_count_request_queries("/api/v1/proposals/{proposal}", 3))
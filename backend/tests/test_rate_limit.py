@@ -0,0 +1,178 @@
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.ai import rate_limit
+from app.ai.client import LLMClient
+from app.ai.rate_limit import AdaptiveConcurrencyLimiter, LLMScheduler, TokenBucket, rate_limit_delay
+
+class FakeClock:
+    """
+    Monotonic clock that only moves when the code under test sleeps
+    """
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", clock.sleep)
+    return clock
+
+def test_token_bucket_bursts_up_to_capacity_then_waits(clock):
+    async def main():
+        bucket = TokenBucket(rate=2, capacity=4)
+        for _ in range(4):
+            await bucket.acquire()
+        assert clock.sleeps == []
+        # The fifth request waits for half a second's refill
+        await bucket.acquire()
+        assert clock.sleeps == [pytest.approx(0.5)]
+
+    asyncio.run(main())
+
+def test_token_bucket_refills_at_its_rate_up_to_capacity(clock):
+    async def main():
+        bucket = TokenBucket(rate=2, capacity=4)
+        for _ in range(4):
+            await bucket.acquire()
+        clock.now += 1
+        await bucket.acquire(2)
+        assert clock.sleeps == []
+
+        # A long idle period refills no more than the capacity
+        clock.now += 60
+        await bucket.acquire(4)
+        assert clock.sleeps == []
+        await bucket.acquire()
+        assert clock.sleeps == [pytest.approx(0.5)]
+
+    asyncio.run(main())
+
+def test_token_bucket_rejects_non_positive_rates():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+def test_limiter_halves_on_throttle_down_to_its_minimum(clock):
+    limiter = AdaptiveConcurrencyLimiter(max_limit=16, min_limit=3, initial_limit=16)
+    limiter.record_throttle()
+    assert limiter.current_limit == 8
+    clock.now += 1
+    limiter.record_throttle()
+    clock.now += 1
+    limiter.record_throttle()
+    assert limiter.current_limit == 3
+    assert limiter.throttled == 3
+
+def test_limiter_decreases_once_per_round_of_throttled_requests(clock):
+    limiter = AdaptiveConcurrencyLimiter(max_limit=16, initial_limit=16)
+    started_at = clock.now
+    clock.now += 1
+    limiter.record_throttle(started_at=started_at)
+    # Requests sent before that decrease were throttled by the same overload
+    limiter.record_throttle(started_at=started_at)
+    assert limiter.current_limit == 8
+    clock.now += 1
+    limiter.record_throttle(started_at=clock.now)
+    assert limiter.current_limit == 4
+
+def test_limiter_grows_on_success_up_to_its_maximum():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=4, initial_limit=2)
+    limiter.record_success()
+    assert limiter.limit == pytest.approx(2.5)
+    for _ in range(20):
+        limiter.record_success()
+    assert limiter.limit == 4
+
+def test_limiter_retry_after_pauses_new_requests(clock):
+    async def main():
+        limiter = AdaptiveConcurrencyLimiter(max_limit=4)
+        limiter.record_throttle(retry_after=3)
+        async with limiter.slot():
+            pass
+        assert clock.sleeps == [pytest.approx(3)]
+
+    asyncio.run(main())
+
+def test_limiter_hands_free_slots_to_waiters_in_order():
+    async def main():
+        limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+        order = []
+
+        async def request(name: str):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(request("a"), request("b"), request("c"))
+        assert order == ["a", "b", "c"]
+        assert limiter.in_flight == 0
+
+    asyncio.run(main())
+
+@pytest.mark.parametrize("headers, delay", [
+    ({"retry-after": "2"}, 2.0),
+    ({"retry-after": "0.5"}, 0.5),
+    ({"retry-after": "1m30s"}, 90.0),
+    ({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "250ms"}, 0.25),
+    ({"ratelimit-remaining": "0", "ratelimit-reset": "7"}, 7.0),
+    ({"x-ratelimit-remaining-requests": "3", "x-ratelimit-reset-requests": "250ms"}, None),
+    ({"retry-after": "soon"}, None),
+    ({}, None),
+])
+def test_rate_limit_delay(headers, delay):
+    assert rate_limit_delay(headers) == delay
+
+def test_rate_limit_delay_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert rate_limit_delay({"retry-after": format_datetime(retry_at, usegmt=True)}) == pytest.approx(30, abs=2)
+    # Dates in the past mean no wait
+    past = datetime.now(timezone.utc) - timedelta(seconds=30)
+    assert rate_limit_delay({"retry-after": format_datetime(past, usegmt=True)}) == 0.0
+
+def test_scheduler_slot_is_released_during_backoff():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.content.decode())
+        # The first request fails once with a Retry-After of half a second (a 503, as a 429
+        # would also pause the client's adaptive limiter for everyone)
+        if "first" in requests[-1] and sum("first" in body for body in requests) == 1:
+            return httpx.Response(503, headers={"retry-after": "0.5"}, json={})
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    async def main():
+        client = LLMClient("http://test/v1", transport=httpx.MockTransport(handler), max_retries=2,
+                           retry_base_delay=0.01)
+        scheduler = LLMScheduler(rate=1000, max_in_flight=1)
+        started_at = time.monotonic()
+        finished = {}
+
+        async def request(name: str, delay: float):
+            await asyncio.sleep(delay)
+            async with scheduler.slot():
+                await client.generate_response(name, use_cache=False)
+            finished[name] = time.monotonic() - started_at
+
+        await asyncio.gather(request("first", 0), request("second", 0.05))
+        await client.aclose()
+        return scheduler, client, finished
+
+    scheduler, client, finished = asyncio.run(main())
+    # With a single slot, the second request only gets through while the first one backs off
+    assert finished["second"] < 0.4 < finished["first"]
+    assert (scheduler.calls, scheduler.attempts, client.retries) == (2, 3, 1)
+    assert scheduler.in_flight == 0
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.ai.client import LLMUnavailableError
+from app.ai.simulation import ParliamentSimulation
+
+MEMBERS = [
+    {
+        "id": i, "name": f"Member {i}", "role": "Member", "bio": "A member of parliament.",
+        "economic_leaning": 50.0, "social_leaning": 50.0, "eu_stance": 50.0,
+        "party": {"name": "Party", "abbreviation": "P", "ideology": "Centre"},
+    }
+    for i in range(1, 6)
+]
+PROPOSAL = {"title": "Test proposal", "content": "Make every Friday a public holiday."}
+
+class FailingDebateAgent:
+    """
+    The first speaker's request fails; the others would take a long time
+    """
+    def __init__(self):
+        self.stopped = set()
+
+    async def generate_debate_entry(self, member, proposal_data, max_tokens=None):
+        if member["id"] == MEMBERS[0]["id"]:
+            # Fail once the other speeches are underway
+            await asyncio.sleep(0.05)
+            raise LLMUnavailableError("Service unavailable", 503)
+        try:
+            await asyncio.sleep(10)
+        finally:
+            self.stopped.add(member["id"])
+        return "Speech"
+
+def test_failed_debate_stops_and_awaits_the_other_speeches():
+    agent = FailingDebateAgent()
+    simulation = ParliamentSimulation(agent=agent, debate_concurrency=5, stream_debate=False)
+    simulation.plan["speakers"] = len(MEMBERS)
+
+    async def main():
+        with pytest.raises(LLMUnavailableError):
+            await simulation.simulate_debate(PROPOSAL, MEMBERS, debate_id=1, db_crud=None)
+        # Every other speech has finished by the time the error reaches the caller
+        assert agent.stopped == {member["id"] for member in MEMBERS[1:]}
+
+    asyncio.run(main())
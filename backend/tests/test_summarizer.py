@@ -0,0 +1,120 @@
+import asyncio
+import re
+from contextlib import asynccontextmanager
+
+from app.ai.agents import ParliamentaryAgent
+from app.ai.client import create_client
+from app.ai.fake_llm import FakeLLM, FakeLLMTransport
+from app.ai.summarizer import DebateSummarizer
+from app.ai.usage import track_usage
+
+class RecordingFakeLLM(FakeLLM):
+    def __init__(self):
+        super().__init__(latency=0, error_rate=0, rate_limit_rate=0, seed=1)
+        self.prompts = []
+
+    def complete(self, prompt: str, max_tokens: int = 500) -> str:
+        self.prompts.append(prompt)
+        return super().complete(prompt, max_tokens)
+
+    def of_kind(self, kind: str):
+        markers = {
+            "direct": "Below is a transcript",
+            "part": "Below are speeches by",
+            "merge": "single neutral, factual summary of the debate in one or two paragraphs",
+            "final": "single neutral, factual summary of the debate in 3-4 paragraphs",
+        }
+        return [prompt for prompt in self.prompts if markers[kind] in prompt]
+
+def _entries(parties: int, per_party: int):
+    return [
+        {
+            "member": {"name": f"Member {party}-{i}", "party": {"name": f"Party {party}", "abbreviation": f"P{party}"}},
+            "content": f"Speech {i} of party {party}.",
+        }
+        for i in range(per_party) for party in range(parties)
+    ]
+
+def _summarize(entries, **options):
+    fake = RecordingFakeLLM()
+    in_flight = max_in_flight = 0
+
+    @asynccontextmanager
+    async def slot():
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            yield
+        finally:
+            in_flight -= 1
+
+    async def main():
+        client = create_client("fake", transport=FakeLLMTransport(fake))
+        summarizer = DebateSummarizer(ParliamentaryAgent(client=client, use_cache=False), slot, **options)
+        with track_usage() as usage:
+            for entry in entries:
+                summarizer.add(entry)
+            # Full chunks are summarized while the debate goes on
+            await asyncio.sleep(0.05)
+            requests_before_finish = len(fake.prompts)
+            summary = await summarizer.finish()
+        await client.aclose()
+        return summary, requests_before_finish, usage
+
+    summary, requests_before_finish, usage = asyncio.run(main())
+    return fake, summary, requests_before_finish, usage, max_in_flight
+
+def test_short_debate_is_summarized_in_one_request():
+    fake, summary, _, usage, _ = _summarize(_entries(2, 2), direct_max_entries=5)
+    assert summary
+    assert len(fake.prompts) == len(fake.of_kind("direct")) == 1
+    assert set(usage.stages) == {"summary"}
+
+def test_long_debate_is_summarized_per_party_and_merged():
+    # 3 parties of 10 speeches in chunks of 4: 3 partial summaries per party
+    fake, summary, requests_before_finish, usage, max_in_flight = _summarize(
+        _entries(3, 10), chunk_size=4, fan_in=2, direct_max_entries=5
+    )
+    assert summary
+    parts = fake.of_kind("part")
+    assert len(parts) == 9
+    # Each part has the speeches of a single party
+    for prompt in parts:
+        assert len(set(re.findall(r"\((P\d)\):", prompt))) == 1
+    assert sorted(len(re.findall(r"Speech \d+ of party", prompt)) for prompt in parts) == [2, 2, 2] + [4] * 6
+    # The two full chunks of each party were done before finish(); the remainders after
+    assert requests_before_finish == 6
+
+    # 9 summaries are merged two at a time into 5, 3 and 2, then into the final summary
+    assert len(fake.of_kind("merge")) == 5 + 3 + 2
+    assert len(fake.of_kind("final")) == 1
+    assert not fake.of_kind("direct")
+    assert len(fake.prompts) == 20
+    assert usage.stages["summary"].requests == 20
+    assert max_in_flight > 1
+
+def test_cancel_stops_and_awaits_partial_summaries():
+    stopped = []
+
+    class SlowAgent:
+        async def summarize_debate_part(self, entries, label):
+            try:
+                await asyncio.sleep(10)
+            finally:
+                stopped.append(label)
+
+    @asynccontextmanager
+    async def slot():
+        yield
+
+    async def main():
+        summarizer = DebateSummarizer(SlowAgent(), slot, chunk_size=2, direct_max_entries=0)
+        for entry in _entries(2, 2):
+            summarizer.add(entry)
+        await asyncio.sleep(0)
+        await summarizer.cancel()
+        assert len(stopped) == 2
+        assert not summarizer._parts
+
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+from app.ai.budget import TokenBudget
+from app.ai.simulation import ParliamentSimulation
+from app.ai.usage import TokenUsage
+from app.config import settings
+from app.models.checkpoint import SimulationStage
+
+MEMBERS = [
+    {
+        "id": i, "name": f"Member {i}", "role": "Member", "bio": "A member of parliament.",
+        "economic_leaning": 10.0 * i, "social_leaning": 50.0, "eu_stance": 100.0 - 10.0 * i,
+        "party": {"name": f"Party {i % 3}", "abbreviation": f"P{i % 3}", "ideology": "Centre"},
+    }
+    for i in range(1, 11)
+]
+PROPOSAL = {"title": "Test proposal", "content": "Make every Friday a public holiday."}
+MODES = ("member", "batch", "local")
+
+def test_budget_reserves_and_releases():
+    usage = TokenUsage()
+    budget = TokenBudget(1000, usage, spent=100)
+    assert budget.remaining == 900
+
+    assert budget.reserve(500)
+    assert budget.remaining == 400
+    # A reservation must leave `keep` tokens for later stages
+    assert not budget.reserve(300, keep=200)
+    assert budget.reserve(300, keep=100)
+    assert budget.remaining == 100
+
+    # Once a request is done its tokens count as used and the reservation is released
+    usage.add(400, 50)
+    budget.release(500)
+    assert budget.remaining == 1000 - 100 - 450 - 300
+    budget.release(300)
+    assert budget.remaining == 450
+    assert budget.reserved == 0
+
+def test_budget_without_limit_allows_everything():
+    budget = TokenBudget(0, TokenUsage())
+    assert not budget.enabled
+    assert budget.reserve(10 ** 9)
+    budget.release(10 ** 9)
+    assert budget.reserved == 0
+
+def _plan(limit: int, stage: SimulationStage = SimulationStage.DEBATE) -> dict:
+    simulation = ParliamentSimulation(agent=object(), voting_mode="member", vote_batch_size=5, token_budget=limit)
+    simulation.debate_max_speakers = 6
+    simulation.budget = TokenBudget(limit, TokenUsage())
+    return simulation._plan_budget(PROPOSAL, MEMBERS, stage, [], None)
+
+def test_no_budget_keeps_the_full_plan():
+    plan = _plan(0)
+    assert (plan["speakers"], plan["speech_tokens"], plan["voting_mode"]) == (6, settings.DEBATE_MAX_TOKENS, "member")
+    assert not plan["degraded"]
+
+def test_budget_falls_back_in_order():
+    full = _plan(10 ** 9)
+    assert not full["degraded"]
+    assert full["estimated_tokens"] <= 10 ** 9
+
+    # Every distinct plan that fits, from the full budget down to the cheapest run
+    plans = []
+    for limit in range(full["estimated_tokens"], 0, -50):
+        plan = _plan(limit)
+        if plan["estimated_tokens"] > limit:
+            break
+        if not plans or plan["estimated_tokens"] != plans[-1]["estimated_tokens"]:
+            plans.append(plan)
+    steps = [(MODES.index(plan["voting_mode"]), plan["speakers"], plan["speech_tokens"]) for plan in plans]
+    assert steps[0] == (0, 6, settings.DEBATE_MAX_TOKENS)
+    min_speech = settings.BUDGET_MIN_SPEECH_TOKENS
+
+    # The voting mode only gets cheaper: member, then batch, then local
+    assert [mode for mode, _, _ in steps] == sorted(mode for mode, _, _ in steps)
+    assert {mode for mode, _, _ in steps} == {0, 1, 2}
+    for mode in range(len(MODES)):
+        levels = [(speakers, speech) for step_mode, speakers, speech in steps if step_mode == mode]
+        # Within a mode speeches get shorter first, all members still speaking...
+        shorter = [level for level in levels if level[0] == 6]
+        assert [speech for _, speech in shorter] == sorted((speech for _, speech in shorter), reverse=True)
+        # ...and only then do fewer members speak, with the shortest speeches
+        fewer = levels[len(shorter):]
+        assert all(speech == min_speech for _, speech in fewer)
+        assert [speakers for speakers, _ in fewer] == sorted((speakers for speakers, _ in fewer), reverse=True)
+        assert all(speakers >= settings.BUDGET_MIN_SPEAKERS for speakers, _ in levels)
+
+    # A cheaper voting mode is only taken when the cheapest debate does not fit the previous one
+    for previous, plan in zip(plans, plans[1:]):
+        if plan["voting_mode"] != previous["voting_mode"]:
+            assert (previous["speakers"], previous["speech_tokens"]) == (settings.BUDGET_MIN_SPEAKERS, min_speech)
+
+def test_budget_too_small_for_the_cheapest_run(capsys):
+    plan = _plan(10)
+    assert (plan["voting_mode"], plan["speakers"], plan["speech_tokens"]) == (
+        "local", settings.BUDGET_MIN_SPEAKERS, settings.BUDGET_MIN_SPEECH_TOKENS
+    )
+    assert plan["degraded"]
+    assert plan["estimated_tokens"] > 10
+    assert "too small for the cheapest run" in capsys.readouterr().out
+
+def test_budget_of_the_voting_stage_only_counts_the_votes():
+    # With the debate done, only the cost of the votes decides the voting mode
+    full = _plan(10 ** 9, SimulationStage.VOTING)
+    assert full["voting_mode"] == "member"
+    assert _plan(full["estimated_tokens"] - 1, SimulationStage.VOTING)["voting_mode"] != "member"
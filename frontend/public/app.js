@@ -98,6 +98,84 @@ async function postData(endpoint, data) {
     }
 }
 
+// Simulation events
+let simulationEvents = null;
+
+function watchSimulation(proposalId) {
+    const live = document.getElementById('simulation-live');
+    if (!live) return;
+    if (simulationEvents) simulationEvents.close();
+    
+    live.classList.remove('d-none');
+    const progress = live.querySelector('.simulation-progress');
+    const log = live.querySelector('.simulation-log');
+    const tally = live.querySelector('.simulation-tally');
+    const votes = { for: 0, against: 0, abstain: 0, absent: 0 };
+    
+    // Event data (names, speeches, errors) is set as text, never parsed as HTML
+    const element = (tag, text) => {
+        const node = document.createElement(tag);
+        node.textContent = text;
+        return node;
+    };
+    const addLine = (...nodes) => {
+        const line = document.createElement('div');
+        line.append(...nodes);
+        log.appendChild(line);
+        return line;
+    };
+    
+    const events = new EventSource(`${API_URL}/simulation/${proposalId}/events`);
+    simulationEvents = events;
+    
+    events.addEventListener('status', (e) => {
+        const data = JSON.parse(e.data);
+        if (!data.job) {
+            events.close();
+            live.classList.add('d-none');
+        }
+    });
+    events.addEventListener('progress', (e) => {
+        const data = JSON.parse(e.data);
+        progress.style.width = `${Math.round(data.progress * 100)}%`;
+        progress.textContent = data.stage;
+    });
+    // Speeches arrive piece by piece while they are generated, then once complete
+    const speeches = {};
+    const speech = (data) => {
+        if (!speeches[data.member_id]) {
+            const text = element('span', '');
+            addLine(element('strong', `${data.member_name} (${data.party}):`), ' ', text);
+            speeches[data.member_id] = text;
+        }
+        return speeches[data.member_id];
+    };
+    events.addEventListener('debate_chunk', (e) => {
+        const data = JSON.parse(e.data);
+        speech(data).textContent += data.text;
+    });
+    events.addEventListener('debate_entry', (e) => {
+        const data = JSON.parse(e.data);
+        if (data.content !== null) speech(data).textContent = data.content;
+    });
+    events.addEventListener('summary', () => addLine(element('em', 'Debate summarised, voting has started.')));
+    events.addEventListener('vote', (e) => {
+        const data = JSON.parse(e.data);
+        votes[data.vote] += 1;
+        tally.textContent = `For: ${votes.for} | Against: ${votes.against} | Abstain: ${votes.abstain} | Absent: ${votes.absent}`;
+    });
+    events.addEventListener('job', (e) => {
+        const data = JSON.parse(e.data);
+        if (data.status === 'succeeded' || data.status === 'failed') {
+            events.close();
+            simulationEvents = null;
+            loadProposalDetail(proposalId);
+        } else if (data.error) {
+            addLine(element('em', `Attempt ${data.attempts} failed, retrying: ${data.error}`));
+        }
+    });
+}
+
 // Load Data Functions
 async function loadProposals() {
     const proposals = await fetchData('/proposals/');
@@ -264,17 +342,38 @@ async function loadProposalDetail(id) {
         </div>
         
         ${votesSection}
+        
+        <div id="simulation-live" class="card mb-3 d-none">
+            <div class="card-header">Simulation</div>
+            <div class="card-body">
+                <div class="progress mb-2">
+                    <div class="progress-bar simulation-progress" role="progressbar" style="width: 0%"></div>
+                </div>
+                <p class="simulation-tally"></p>
+                <div class="simulation-log"></div>
+            </div>
+        </div>
     `;
     
     showDetail(content);
     
+    // Follow a simulation that is already under way
+    if (simulationEvents) {
+        simulationEvents.close();
+        simulationEvents = null;
+    }
+    if (['submitted', 'debating', 'voting'].includes(proposal.status)) {
+        watchSimulation(proposal.id);
+    }
+    
     // Add event listener for simulation button
     const simBtn = document.querySelector('.start-simulation');
     if (simBtn) {
         simBtn.addEventListener('click', async () => {
             const response = await postData(`/simulation/${proposal.id}/start`, {});
             if (response) {
-                alert('Simulation started successfully! Check back later for results.');
+                simBtn.disabled = true;
+                watchSimulation(proposal.id);
                 loadProposals();
             }
         });